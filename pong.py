@@ -1,18 +1,30 @@
 import pygame
 import sys
+import argparse
+import atexit
 import random
 import time
 import math
 import os
+from collections import deque
+
+# The game rules live in the headless simulation; this file adds input, sound and drawing
+from pong_sim import (WIDTH, HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE, POWERUP_SIZE, FPS,
+                      WINNING_SCORE, TRAIL_LENGTH, PongSim)
+from pong_input import InputBuffer
+from pong_pacing import STRATEGIES, FramePacer, PowerMonitor
+from pong_alloc import GC_POLICIES, AllocationProfiler, GCMonitor
+from pong_audio import VoiceManager
+from pong_capture import CAPTURE_MODES, DEFAULT_ENCODER, FrameCapture
+from pong_bloom import BLOOM_METHODS, Bloom
+from pong_spectator import SPECTATE_PATH, SpectatorPublisher
+from pong_stats import CABINET, STATS_PATH, StatsStore
 
 # Initialize pygame
 pygame.init()
 pygame.mixer.init()  # Initialize sound mixer
 
 # Constants
-WIDTH, HEIGHT = 800, 600
-PADDLE_WIDTH, PADDLE_HEIGHT = 15, 100
-BALL_SIZE = 15
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 NEON_GREEN = (57, 255, 20)
@@ -21,29 +33,6 @@ NEON_PINK = (255, 20, 147)
 NEON_PURPLE = (138, 43, 226)
 NEON_RED = (255, 0, 60)
 NEON_YELLOW = (255, 255, 0)
-PADDLE_SPEED = 7
-
-# Ball speed settings for different difficulty levels
-DIFFICULTY_SETTINGS = {
-    'Easy': {
-        'INITIAL_BALL_SPEED': 4,
-        'MAX_BALL_SPEED': 8,
-        'BALL_ACCELERATION': 0.00002,
-        'AI_SPEED': 5
-    },
-    'Medium': {
-        'INITIAL_BALL_SPEED': 5,
-        'MAX_BALL_SPEED': 10,
-        'BALL_ACCELERATION': 0.00002,
-        'AI_SPEED': 6
-    },
-    'Hard': {
-        'INITIAL_BALL_SPEED': 6,
-        'MAX_BALL_SPEED': 12,
-        'BALL_ACCELERATION': 0.00002,
-        'AI_SPEED': 7
-    }
-}
 
 # Create sounds directory if it doesn't exist
 sounds_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sounds")
@@ -66,62 +55,199 @@ except:
     powerup_sound = pygame.mixer.Sound(pygame.sndarray.array([0] * 44100))
     print("Sound files not found. Using silent placeholders.")
 
+# Voice manager: reserved channels per sound, duplicate triggers merged, score and win before bounces
+voices = VoiceManager({'bounce': bounce_sound, 'hit': hit_sound, 'score': score_sound, 'win': win_sound,
+                       'powerup': powerup_sound})
+
 # Default to Medium difficulty
 current_difficulty = 'Medium'
-INITIAL_BALL_SPEED = DIFFICULTY_SETTINGS[current_difficulty]['INITIAL_BALL_SPEED']
-MAX_BALL_SPEED = DIFFICULTY_SETTINGS[current_difficulty]['MAX_BALL_SPEED']
-BALL_ACCELERATION = DIFFICULTY_SETTINGS[current_difficulty]['BALL_ACCELERATION']
-AI_SPEED = DIFFICULTY_SETTINGS[current_difficulty]['AI_SPEED']
-FPS = 60
-WINNING_SCORE = 10
-TRAIL_LENGTH = 10  # Number of positions to remember for the trail
-
-# Power-up settings
-POWERUP_TYPES = ['speed_boost', 'paddle_grow', 'paddle_shrink', 'ball_size']
-POWERUP_DURATION = 5  # seconds
-POWERUP_SPAWN_CHANCE = 0.002  # Chance per frame to spawn a powerup
-MAX_POWERUPS = 1  # Maximum number of powerups on screen at once
-
-# Create the screen
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+# Command-line options
+SCALE_MODES = ('smooth', 'nearest', 'integer')
+parser = argparse.ArgumentParser(description="Neon Retro Pong")
+parser.add_argument('--window', default=f"{WIDTH}x{HEIGHT}", help="window size as WIDTHxHEIGHT")
+parser.add_argument('--fullscreen', action='store_true', help="fill the display at its native resolution")
+parser.add_argument('--scale', choices=SCALE_MODES, default='smooth',
+                    help="how the 800x600 canvas is scaled to the window; integer falls back to a "
+                         "fractional letterbox when the window is smaller than 800x600")
+parser.add_argument('--measure-latency', action='store_true',
+                    help="record input-to-present latency and report percentiles")
+parser.add_argument('--input-latch', choices=('late', 'early'), default='late',
+                    help="sample paddle input just before the paddle update (late) or at the top "
+                         "of the frame (early, for comparison)")
+parser.add_argument('--pacing', choices=('auto',) + STRATEGIES, default='auto',
+                    help="how each frame waits for the next one; auto tries them all and keeps the "
+                         "cheapest that meets --target-jitter")
+parser.add_argument('--target-jitter', type=float, default=1.0,
+                    help="p95 frame-interval jitter in ms that auto pacing has to meet")
+parser.add_argument('--vsync', action='store_true',
+                    help="create a vsync display (SDL does the window scaling); implied by --pacing vsync")
+parser.add_argument('--pacing-report', action='store_true',
+                    help="print per-strategy jitter and CPU usage on exit")
+parser.add_argument('--power', choices=('idle', 'full'), default='idle',
+                    help="slow down or block in paused, game-over and unfocused states (idle), or "
+                         "always run at full rate (full, for comparison)")
+parser.add_argument('--power-report', action='store_true',
+                    help="print CPU usage per power state on exit")
+parser.add_argument('--alloc-profile', action='store_true',
+                    help="record per-frame allocations (tracemalloc) and GC pauses, report them on exit")
+parser.add_argument('--alloc-budget', type=float, default=64,
+                    help="KiB a frame may allocate before it is flagged")
+parser.add_argument('--alloc-snapshot-every', type=int, default=300,
+                    help="take tracemalloc snapshots of the frame phases every N frames (0 = never)")
+parser.add_argument('--gc-policy', choices=GC_POLICIES, default='default',
+                    help="after startup, freeze the startup objects (freeze) and also raise the "
+                         "collection thresholds (tuned)")
+parser.add_argument('--gc-policy-delay', type=float, default=0,
+                    help="seconds to run with the default collector before applying --gc-policy, "
+                         "to measure before and after in one run")
+parser.add_argument('--bloom', choices=BLOOM_METHODS,
+                    help="replace the per-object glow surfaces with a bloom post-process, blurred with "
+                         "smoothscale passes or a NumPy box blur")
+parser.add_argument('--capture', choices=CAPTURE_MODES,
+                    help="capture frames to a PNG sequence (png), into a local encoder (pipe), or keep "
+                         "the last --capture-seconds in memory and save them with F9 (ring)")
+parser.add_argument('--capture-out', help="output directory, or the video file for pipe "
+                                          "(default capture/ or capture.mp4)")
+parser.add_argument('--capture-every', type=int, default=1, help="capture every Nth frame")
+parser.add_argument('--capture-workers', type=int, default=2, help="encoding threads (pipe uses one)")
+parser.add_argument('--capture-queue', type=int, default=8,
+                    help="frames waiting for the encoder before new frames are dropped")
+parser.add_argument('--capture-seconds', type=float, default=30, help="length of the ring buffer")
+parser.add_argument('--capture-encoder', default=DEFAULT_ENCODER,
+                    help="encoder command for pipe mode; {width}, {height}, {fps} and {out} are filled in")
+parser.add_argument('--spectate', nargs='?', const=SPECTATE_PATH, metavar='PATH',
+                    help="publish every tick to a shared-memory ring that pong_spectator.py viewers "
+                         f"render from (default {SPECTATE_PATH})")
+parser.add_argument('--stats', nargs='?', const=STATS_PATH, metavar='PATH',
+                    help="record matches, rallies and power-ups to a SQLite database in the background "
+                         f"(default {STATS_PATH}); query it with pong_stats.py")
+parser.add_argument('--stats-cabinet', default=CABINET, help="cabinet name stored with each match")
+options, _ = parser.parse_known_args()
+scale_mode = options.scale
+
+# Create the window; everything is drawn on a fixed-size logical canvas and scaled on present()
+if options.fullscreen:
+    window_size, window_flags = (0, 0), pygame.FULLSCREEN
+else:
+    window_size = tuple(int(n) for n in options.window.lower().split('x'))
+    window_flags = pygame.RESIZABLE
+vsync = options.vsync or options.pacing == 'vsync'
+if vsync:
+    # pygame only honours vsync on renderer-backed (SCALED) displays
+    try:
+        window = pygame.display.set_mode(window_size, window_flags | pygame.SCALED, vsync=1)
+    except pygame.error as error:
+        print(f"Vsync unavailable ({error}); using a regular display.")
+        vsync = False
+if not vsync:
+    window = pygame.display.set_mode(window_size, window_flags)
 pygame.display.set_caption("Neon Retro Pong")
-clock = pygame.time.Clock()
+screen = pygame.Surface((WIDTH, HEIGHT)).convert()
+
+# Frame pacing; every loop ends with pacer.tick() instead of clock.tick(FPS)
+pacing = options.pacing if vsync or options.pacing != 'vsync' else 'hybrid'
+pacer = FramePacer(FPS, pacing, options.target_jitter, vsync=vsync)
+if options.pacing_report:
+    atexit.register(lambda: print(pacer.summary()))
+
+# Power management: static and unfocused states redraw at a low rate and wake on input,
+# a minimized window blocks on pygame.event.wait until SDL has an event
+IDLE_FPS = {'paused': 10, 'game_over': 10, 'unfocused': 5}
+power_monitor = PowerMonitor()
+if options.power_report:
+    atexit.register(lambda: print(power_monitor.report()))
+window_focused = True
+window_visible = True
+
+# Allocation and GC instrumentation; the GC monitor also runs alone when a GC policy is chosen
+gc_monitor = None
+alloc_profiler = None
+if options.alloc_profile or options.gc_policy != 'default':
+    gc_monitor = GCMonitor()
+    atexit.register(lambda: print(gc_monitor.report()))
+if options.alloc_profile:
+    alloc_profiler = AllocationProfiler(gc_monitor, options.alloc_budget, options.alloc_snapshot_every)
+    atexit.register(lambda: print(alloc_profiler.report()))
+
+# Bloom post-process; it follows the quality tiers' glow setting
+bloom = Bloom((WIDTH, HEIGHT), options.bloom) if options.bloom else None
+
+# Frame capture: the loop only copies the canvas, encoding happens on worker threads
+capture = None
+if options.capture:
+    try:
+        capture = FrameCapture(screen, options.capture, options.capture_out, options.capture_every,
+                               options.capture_workers, options.capture_queue, FPS, options.capture_seconds,
+                               options.capture_encoder)
+        atexit.register(capture.close)
+    except OSError as error:
+        print(f"Capture disabled: {error}")
+
+# Spectator fan-out: viewer processes read each tick from a shared-memory ring
+spectator = None
+if options.spectate:
+    spectator = SpectatorPublisher(options.spectate)
+    atexit.register(spectator.close)
+
+# Match statistics: the game only queues events, a writer thread commits them in batches
+match_stats = None
+if options.stats:
+    match_stats = StatsStore(options.stats, options.stats_cabinet)
+    atexit.register(lambda: match_stats.close(game_time))
+
+# Buffered, timestamped input; paddle state is latched just before the paddle update
+input_buffer = InputBuffer(measure=options.measure_latency)
+if options.measure_latency:
+    atexit.register(lambda: print(input_buffer.latency_report()))
+
+# Presentation layouts cached per window size: (canvas area, letterbox bars)
+presentation_layouts = {}
+presentation_target = None  # (window size, window subsurface the canvas is scaled into)
+present_ms = 0.0
+flip_ms = 0.0  # Time blocked in display.flip(), i.e. waiting for vsync on a vsync display
+
+# Game state: a PongSim holds the rules and the match (float positions, so movement
+# smaller than a pixel per tick is kept); reset_game() starts a new one
+sim = PongSim(current_difficulty, visual=True)
+game_time = 0.0  # Simulated seconds of play; timers use it instead of the wall clock
 
-# Create game objects
+# Create game objects (only for drawing; sync_rects() derives them from the simulation)
 player1_paddle = pygame.Rect(50, HEIGHT // 2 - PADDLE_HEIGHT // 2, PADDLE_WIDTH, PADDLE_HEIGHT)
 player2_paddle = pygame.Rect(WIDTH - 50 - PADDLE_WIDTH, HEIGHT // 2 - PADDLE_HEIGHT // 2, PADDLE_WIDTH, PADDLE_HEIGHT)
 ball = pygame.Rect(WIDTH // 2 - BALL_SIZE // 2, HEIGHT // 2 - BALL_SIZE // 2, BALL_SIZE, BALL_SIZE)
 
 # Game variables
-ball_speed_x = INITIAL_BALL_SPEED * random.choice((1, -1))
-ball_speed_y = INITIAL_BALL_SPEED * random.choice((1, -1))
-current_ball_speed = INITIAL_BALL_SPEED
-player1_score = 0
-player2_score = 0
-last_score_time = time.time()
 two_player_mode = False  # Default to AI opponent
-game_over = False
-winner = 0
 control_type = "keyboard"  # Default control type: keyboard or mouse
 game_paused = False
 show_fps = False  # FPS counter toggle
-last_frame_time = time.time()
 delta_time = 0
 
-# Power-up variables
-active_powerups = []  # List to store active powerups
-powerup_effects = {
-    'player1': {'paddle_grow': 0, 'paddle_shrink': 0, 'speed_boost': 0},
-    'player2': {'paddle_grow': 0, 'paddle_shrink': 0, 'speed_boost': 0},
-    'ball': {'size': 0, 'speed': 0}
-}
-powerup_timers = []  # List to track active powerup timers
-
 # Animation variables
-ball_trail = []  # Store previous ball positions for trail effect
-hit_animations = []  # Store hit animation data
 stars = []  # Background stars
 
+# Adaptive quality tiers, from full effects down to the cheapest frame
+QUALITY_TIERS = [
+    {'name': 'High', 'glow': True, 'trail': TRAIL_LENGTH, 'stars': True, 'text_glow': True},
+    {'name': 'No Glow', 'glow': False, 'trail': TRAIL_LENGTH, 'stars': True, 'text_glow': True},
+    {'name': 'Short Trail', 'glow': False, 'trail': 4, 'stars': True, 'text_glow': True},
+    {'name': 'No Stars', 'glow': False, 'trail': 4, 'stars': False, 'text_glow': True},
+    {'name': 'Minimal', 'glow': False, 'trail': 4, 'stars': False, 'text_glow': False}
+]
+FRAME_BUDGET_MS = 1000 / FPS
+QUALITY_WINDOW = 60  # Frames per measurement window
+QUALITY_PERCENTILE = 0.95  # Frame-time percentile compared against the budget
+QUALITY_HEADROOM = 0.6  # Step back up only when the percentile is below this share of the budget
+quality_level = 0
+quality = QUALITY_TIERS[0]
+quality_switches = 0
+quality_last_switch = ""
+quality_frame_times = deque(maxlen=QUALITY_WINDOW)  # Work time per frame, excluding the tick sleep
+quality_percentile_ms = 0.0
+quality_upgrade_windows = 1  # Good windows needed before stepping up; doubles after a failed upgrade
+quality_good_windows = 0
+
 # Create stars for background
 for _ in range(100):
     x = random.randint(0, WIDTH)
@@ -143,142 +269,50 @@ except:
     small_font = pygame.font.Font(None, 36)
     tiny_font = pygame.font.Font(None, 24)
 
-def reset_ball():
-    """Reset the ball to the center of the screen with random direction."""
-    global ball_speed_x, ball_speed_y, current_ball_speed, last_score_time, ball_trail
-    ball.center = (WIDTH // 2, HEIGHT // 2)
-    
-    # Reset ball speed to initial value after scoring
-    current_ball_speed = DIFFICULTY_SETTINGS[current_difficulty]['INITIAL_BALL_SPEED']
-    
-    # Randomize direction but ensure it's not too vertical
-    angle = random.uniform(-0.5, 0.5)  # Limit the angle
-    ball_speed_x = current_ball_speed * random.choice((1, -1))
-    ball_speed_y = current_ball_speed * random.choice((0.7, -0.7))
-    
-    # Update the last score time
-    last_score_time = time.time()
-    
-    # Clear the ball trail
-    ball_trail = []
-
 def reset_game():
-    """Reset the entire game state."""
-    global player1_score, player2_score, game_over, winner, hit_animations, active_powerups, powerup_timers
-    global powerup_effects
-    
-    player1_score = 0
-    player2_score = 0
-    game_over = False
-    winner = 0
-    hit_animations = []
-    active_powerups = []
-    powerup_timers = []
-    
-    # Reset powerup effects
-    powerup_effects = {
-        'player1': {'paddle_grow': 0, 'paddle_shrink': 0, 'speed_boost': 0},
-        'player2': {'paddle_grow': 0, 'paddle_shrink': 0, 'speed_boost': 0},
-        'ball': {'size': 0, 'speed': 0}
-    }
-    
-    # Reset paddle sizes
-    player1_paddle.height = PADDLE_HEIGHT
-    player2_paddle.height = PADDLE_HEIGHT
-    
-    reset_ball()
-    player1_paddle.centery = HEIGHT // 2
-    player2_paddle.centery = HEIGHT // 2
-
-def move_paddle(paddle, up=True, player='player1'):
-    """Move the paddle up or down within screen boundaries."""
-    # Apply speed boost if active
-    speed_boost = 1
-    if player == 'player1' and powerup_effects['player1']['speed_boost'] > 0:
-        speed_boost = 1.5
-    elif player == 'player2' and powerup_effects['player2']['speed_boost'] > 0:
-        speed_boost = 1.5
-        
-    speed = PADDLE_SPEED * speed_boost * (delta_time * 60)  # Scale by delta time for consistent speed
-    
-    if up and paddle.top > 0:
-        paddle.y -= speed
-    if not up and paddle.bottom < HEIGHT:
-        paddle.y += speed
+    """Start a new match at the current difficulty."""
+    global sim, game_paused
+    sim = PongSim(current_difficulty, visual=True)
+    game_paused = False
+
+    # Start recording the new match (one left unfinished is recorded as abandoned)
+    if match_stats:
+        match_stats.start_match('two_player' if two_player_mode else 'ai', control_type, current_difficulty,
+                                game_time)
 
-def move_paddle_mouse(paddle, mouse_y):
-    """Move the paddle to follow mouse position."""
+def sync_rects():
+    """Derive the drawing Rects from the simulation's float state."""
+    player1_paddle.update(sim.paddle_x[0], round(sim.paddle_y[0]), PADDLE_WIDTH, sim.paddle_h[0])
+    player2_paddle.update(sim.paddle_x[1], round(sim.paddle_y[1]), PADDLE_WIDTH, sim.paddle_h[1])
+    ball.update(round(sim.ball_x), round(sim.ball_y), sim.ball_size, sim.ball_size)
+
+def paddle_action(up, down):
+    """Turn the state of a player's up and down keys into a simulation action (-1 up, 0 stay, 1 down)."""
+    return int(down) - int(up)
+
+def move_paddle_mouse(side, mouse_y):
+    """Move a paddle to follow mouse position."""
     # Ensure paddle stays within screen boundaries
-    if mouse_y - paddle.height // 2 > 0 and mouse_y + paddle.height // 2 < HEIGHT:
-        paddle.centery = mouse_y
-
-def move_ai_opponent():
-    """AI to move the opponent paddle towards the ball with some imperfection."""
-    # Add some "thinking" delay and imperfection to make the AI beatable
-    if ball_speed_x > 0:  # Only move if ball is coming towards the AI
-        # Predict where the ball will be
-        target_y = ball.centery
-        
-        # Add some randomness to make the AI imperfect
-        # More randomness on Easy, less on Hard
-        if current_difficulty == 'Easy':
-            mistake_chance = 0.2
-            mistake_amount = random.randint(-70, 70)
-        elif current_difficulty == 'Medium':
-            mistake_chance = 0.1
-            mistake_amount = random.randint(-50, 50)
-        else:  # Hard
-            mistake_chance = 0.05
-            mistake_amount = random.randint(-30, 30)
-            
-        if random.random() < mistake_chance:
-            target_y += mistake_amount
-        
-        # Apply speed boost if active
-        speed = AI_SPEED
-        if powerup_effects['player2']['speed_boost'] > 0:
-            speed *= 1.5
-            
-        speed *= (delta_time * 60)  # Scale by delta time
-        
-        # Move towards the predicted position
-        if player2_paddle.centery < target_y and player2_paddle.bottom < HEIGHT:
-            player2_paddle.y += min(speed, target_y - player2_paddle.centery)
-        elif player2_paddle.centery > target_y and player2_paddle.top > 0:
-            player2_paddle.y -= min(speed, player2_paddle.centery - target_y)
-    else:
-        # When ball is moving away, return slowly to center
-        if abs(player2_paddle.centery - HEIGHT // 2) > 10:
-            speed = 2 * (delta_time * 60)
-            if player2_paddle.centery > HEIGHT // 2:
-                player2_paddle.y -= speed
-            else:
-                player2_paddle.y += speed
-
-def create_hit_animation(x, y):
-    """Create a new hit animation at the specified position."""
-    hit_animations.append({
-        'x': x,
-        'y': y,
-        'radius': 5,
-        'max_radius': 30,
-        'alpha': 255,
-        'color': NEON_PINK
-    })
-
-def update_hit_animations():
-    """Update all active hit animations."""
-    global hit_animations
-    new_animations = []
-    
-    for anim in hit_animations:
-        anim['radius'] += 2 * (delta_time * 60)
-        anim['alpha'] -= 10 * (delta_time * 60)
-        
-        if anim['alpha'] > 0:
-            new_animations.append(anim)
-    
-    hit_animations = new_animations
+    half = sim.paddle_h[side] / 2
+    if mouse_y - half > 0 and mouse_y + half < HEIGHT:
+        sim.paddle_y[side] = mouse_y - half
+
+def update_game(action1, action2):
+    """Advance the match by delta_time, then play sounds and record statistics for what happened."""
+    sim.tick(action1, action2, delta_time)
+    for event in sim.events:
+        kind = event[0]
+        play_sound(kind)  # Every event has a sound of the same name
+        if not match_stats:
+            continue
+        if kind == 'hit':
+            match_stats.hit()
+        elif kind == 'score':
+            match_stats.point(game_time, event[1], event[2])
+        elif kind == 'win':
+            match_stats.end_match(game_time, event[1])
+        elif kind == 'powerup':
+            match_stats.powerup(game_time, event[1], event[2])
 
 def update_stars():
     """Update the twinkling stars in the background."""
@@ -289,220 +323,110 @@ def update_stars():
         pulse_factor = (math.sin(star[5]) + 1) / 2  # Range 0 to 1
         star[3] = int(100 + 155 * pulse_factor)  # Range 100-255
 
-def spawn_powerup():
-    """Randomly spawn a powerup on the screen."""
-    if len(active_powerups) < MAX_POWERUPS and random.random() < POWERUP_SPAWN_CHANCE:
-        powerup_type = random.choice(POWERUP_TYPES)
-        x = random.randint(WIDTH // 4, 3 * WIDTH // 4)
-        y = random.randint(HEIGHT // 4, 3 * HEIGHT // 4)
-        size = 20
-        active_powerups.append({
-            'rect': pygame.Rect(x - size // 2, y - size // 2, size, size),
-            'type': powerup_type,
-            'color': NEON_YELLOW,
-            'pulse': 0
-        })
-
-def check_powerup_collision():
-    """Check if the ball collides with any powerups."""
-    global active_powerups, powerup_timers
-    
-    for powerup in active_powerups[:]:
-        if ball.colliderect(powerup['rect']):
-            # Determine which player gets the powerup based on ball direction
-            player = 'player1' if ball_speed_x < 0 else 'player2'
-            
-            # Apply powerup effect
-            apply_powerup(powerup['type'], player)
-            
-            # Remove the powerup
-            active_powerups.remove(powerup)
-            
-            # Play powerup sound
-            play_sound("powerup")
+def set_quality(level, reason):
+    """Switch to another quality tier and record the switch for the FPS overlay."""
+    global quality_level, quality, quality_switches, quality_last_switch
+    quality_last_switch = f"{quality['name']} -> {QUALITY_TIERS[level]['name']} ({reason})"
+    quality_level = level
+    quality = QUALITY_TIERS[level]
+    quality_switches += 1
+    quality_frame_times.clear()  # Judge the new tier on its own frames
 
-def apply_powerup(powerup_type, player):
-    """Apply the effect of a powerup to the specified player."""
-    global powerup_effects, powerup_timers, player1_paddle, player2_paddle
-    
-    # Add timer for the powerup
-    powerup_timers.append({
-        'type': powerup_type,
-        'player': player,
-        'time': time.time() + POWERUP_DURATION
-    })
+def update_quality(frame_ms):
+    """Step quality down when frames run over budget and back up when there is headroom."""
+    global quality_percentile_ms, quality_upgrade_windows, quality_good_windows
+    quality_frame_times.append(frame_ms)
+    if len(quality_frame_times) < QUALITY_WINDOW:
+        return
+    quality_percentile_ms = sorted(quality_frame_times)[int(QUALITY_PERCENTILE * (QUALITY_WINDOW - 1))]
     
-    # Apply immediate effects
-    if powerup_type == 'paddle_grow':
-        if player == 'player1':
-            player1_paddle.height = int(PADDLE_HEIGHT * 1.5)
-            powerup_effects['player1']['paddle_grow'] = POWERUP_DURATION
+    if quality_percentile_ms > FRAME_BUDGET_MS:
+        if quality_level < len(QUALITY_TIERS) - 1:
+            # A tier we just stepped up to is too slow: wait longer before trying it again
+            if quality_good_windows == 0 and quality_last_switch.endswith("headroom)"):
+                quality_upgrade_windows = min(quality_upgrade_windows * 2, 32)
+            quality_good_windows = 0
+            set_quality(quality_level + 1, f"p95 {quality_percentile_ms:.1f} ms")
         else:
-            player2_paddle.height = int(PADDLE_HEIGHT * 1.5)
-            powerup_effects['player2']['paddle_grow'] = POWERUP_DURATION
-    
-    elif powerup_type == 'paddle_shrink':
-        # Apply to opponent
-        opponent = 'player2' if player == 'player1' else 'player1'
-        if opponent == 'player1':
-            player1_paddle.height = int(PADDLE_HEIGHT * 0.7)
-            powerup_effects['player1']['paddle_shrink'] = POWERUP_DURATION
-        else:
-            player2_paddle.height = int(PADDLE_HEIGHT * 0.7)
-            powerup_effects['player2']['paddle_shrink'] = POWERUP_DURATION
-    
-    elif powerup_type == 'speed_boost':
-        powerup_effects[player]['speed_boost'] = POWERUP_DURATION
-    
-    elif powerup_type == 'ball_size':
-        global ball, BALL_SIZE
-        ball.width = ball.height = int(BALL_SIZE * 1.5)
-        powerup_effects['ball']['size'] = POWERUP_DURATION
-
-def update_powerups():
-    """Update powerup timers and effects."""
-    global powerup_timers, powerup_effects, player1_paddle, player2_paddle, ball
-    
-    current_time = time.time()
-    
-    # Update powerup timers
-    for timer in powerup_timers[:]:
-        if current_time >= timer['time']:
-            # Remove expired powerup effect
-            powerup_type = timer['type']
-            player = timer['player']
-            
-            if powerup_type == 'paddle_grow':
-                if player == 'player1':
-                    player1_paddle.height = PADDLE_HEIGHT
-                    powerup_effects['player1']['paddle_grow'] = 0
-                else:
-                    player2_paddle.height = PADDLE_HEIGHT
-                    powerup_effects['player2']['paddle_grow'] = 0
-            
-            elif powerup_type == 'paddle_shrink':
-                opponent = 'player2' if player == 'player1' else 'player1'
-                if opponent == 'player1':
-                    player1_paddle.height = PADDLE_HEIGHT
-                    powerup_effects['player1']['paddle_shrink'] = 0
-                else:
-                    player2_paddle.height = PADDLE_HEIGHT
-                    powerup_effects['player2']['paddle_shrink'] = 0
-            
-            elif powerup_type == 'speed_boost':
-                powerup_effects[player]['speed_boost'] = 0
-            
-            elif powerup_type == 'ball_size':
-                ball.width = ball.height = BALL_SIZE
-                powerup_effects['ball']['size'] = 0
-            
-            # Remove the timer
-            powerup_timers.remove(timer)
-    
-    # Update active powerups animation
-    for powerup in active_powerups:
-        powerup['pulse'] += 0.1 * (delta_time * 60)
+            quality_frame_times.clear()
+    elif quality_percentile_ms < FRAME_BUDGET_MS * QUALITY_HEADROOM and quality_level > 0:
+        quality_good_windows += 1
+        quality_frame_times.clear()
+        if quality_good_windows >= quality_upgrade_windows:
+            quality_good_windows = 0
+            set_quality(quality_level - 1, "headroom")
+    else:
+        quality_frame_times.clear()
 
-def update_ball():
-    """Update ball position, handle collisions, and increase speed over time."""
-    global ball_speed_x, ball_speed_y, player1_score, player2_score, current_ball_speed, game_over, winner, ball_trail
-    
-    # Add current position to trail
-    ball_trail.append((ball.centerx, ball.centery))
-    
-    # Keep trail at fixed length
-    if len(ball_trail) > TRAIL_LENGTH:
-        ball_trail.pop(0)
-    
-    # Move the ball with delta time for consistent speed
-    ball.x += ball_speed_x * (delta_time * 60)
-    ball.y += ball_speed_y * (delta_time * 60)
-    
-    # Gradually increase ball speed over time (capped at maximum)
-    time_since_last_score = time.time() - last_score_time
-    if time_since_last_score > 3 and current_ball_speed < DIFFICULTY_SETTINGS[current_difficulty]['MAX_BALL_SPEED']:
-        speed_factor = abs(ball_speed_x) / current_ball_speed  # Preserve direction
-        current_ball_speed = min(DIFFICULTY_SETTINGS[current_difficulty]['MAX_BALL_SPEED'], 
-                                current_ball_speed + DIFFICULTY_SETTINGS[current_difficulty]['BALL_ACCELERATION'] * delta_time * 60)
-        ball_speed_x = current_ball_speed * speed_factor * (1 if ball_speed_x > 0 else -1)
-    
-    # Ball collision with top and bottom walls
-    if ball.top <= 0 or ball.bottom >= HEIGHT:
-        ball_speed_y *= -1
-        create_hit_animation(ball.centerx, ball.top if ball.top <= 0 else ball.bottom)
-        play_sound("bounce")
-    
-    # Ball collision with paddles
-    if ball.colliderect(player1_paddle):
-        # Prevent ball from getting stuck inside paddle
-        if ball.left < player1_paddle.right:
-            ball.left = player1_paddle.right
-            
-        ball_speed_x *= -1
-        create_hit_animation(player1_paddle.right, ball.centery)
-        
-        # Add a slight y-speed change based on where the ball hit the paddle
-        relative_intersect_y = (player1_paddle.centery - ball.centery) / (player1_paddle.height / 2)
-        ball_speed_y = -relative_intersect_y * (current_ball_speed * 0.75)
-        
-        play_sound("hit")
-    
-    elif ball.colliderect(player2_paddle):
-        # Prevent ball from getting stuck inside paddle
-        if ball.right > player2_paddle.left:
-            ball.right = player2_paddle.left
-            
-        ball_speed_x *= -1
-        create_hit_animation(player2_paddle.left, ball.centery)
-        
-        # Add a slight y-speed change based on where the ball hit the paddle
-        relative_intersect_y = (player2_paddle.centery - ball.centery) / (player2_paddle.height / 2)
-        ball_speed_y = -relative_intersect_y * (current_ball_speed * 0.75)
-        
-        play_sound("hit")
-    
-    # Ball out of bounds - scoring
-    if ball.left <= 0:
-        player2_score += 1
-        create_hit_animation(0, ball.centery)
-        play_sound("score")
-        
-        # Check for win condition
-        if player2_score >= WINNING_SCORE:
-            game_over = True
-            winner = 2
-            play_sound("win")
+def play_sound(sound_type):
+    """Play game sounds through the voice manager."""
+    voices.play(sound_type)
+
+def get_presentation_layout(size):
+    """Return the canvas area and letterbox bars for a window size, computing them once per size."""
+    layout = presentation_layouts.get(size)
+    if layout is None:
+        window_w, window_h = size
+        if scale_mode == 'integer' and window_w >= WIDTH and window_h >= HEIGHT:
+            factor = min(window_w // WIDTH, window_h // HEIGHT)
         else:
-            reset_ball()
+            # Integer scaling needs room for at least 1x; in a smaller window fall back to the
+            # fractional letterbox (downscaled, aspect ratio kept) rather than cropping or squashing
+            factor = min(window_w / WIDTH, window_h / HEIGHT)
+        area = pygame.Rect(0, 0, int(WIDTH * factor), int(HEIGHT * factor))
+        area.center = (window_w // 2, window_h // 2)
+        window_rect = pygame.Rect(0, 0, window_w, window_h)
+        area = area.clip(window_rect)
+        bars = [rect for rect in (
+            pygame.Rect(0, 0, window_w, area.top),
+            pygame.Rect(0, area.bottom, window_w, window_h - area.bottom),
+            pygame.Rect(0, area.top, area.left, area.height),
+            pygame.Rect(area.right, area.top, window_w - area.right, area.height)
+        ) if rect.width > 0 and rect.height > 0]
+        layout = presentation_layouts[size] = (area, bars)
+    return layout
+
+def present():
+    """Scale the logical canvas into the window with a single blit and show it."""
+    global presentation_target, present_ms, flip_ms
+    start = time.perf_counter()
+    window = pygame.display.get_surface()
+    size = window.get_size()
+    area, bars = get_presentation_layout(size)
+    if presentation_target is None or presentation_target[0] != size:
+        presentation_target = (size, window.subsurface(area))
+    target = presentation_target[1]
     
-    if ball.right >= WIDTH:
-        player1_score += 1
-        create_hit_animation(WIDTH, ball.centery)
-        play_sound("score")
-        
-        # Check for win condition
-        if player1_score >= WINNING_SCORE:
-            game_over = True
-            winner = 1
-            play_sound("win")
-        else:
-            reset_ball()
+    for bar in bars:
+        window.fill(BLACK, bar)
+    if area.size == (WIDTH, HEIGHT):
+        window.blit(screen, area)
+    elif scale_mode == 'smooth':
+        pygame.transform.smoothscale(screen, area.size, target)
+    else:
+        pygame.transform.scale(screen, area.size, target)
+    flip_start = time.perf_counter()
+    pygame.display.flip()
+    end = time.perf_counter()
+    flip_ms = (end - flip_start) * 1000
+    present_ms = (end - start) * 1000
 
-def play_sound(sound_type):
-    """Play game sounds."""
-    if sound_type == "bounce":
-        bounce_sound.play()
-    elif sound_type == "hit":
-        hit_sound.play()
-    elif sound_type == "score":
-        score_sound.play()
-    elif sound_type == "win":
-        win_sound.play()
-    elif sound_type == "powerup":
-        powerup_sound.play()
+def window_to_canvas(pos):
+    """Convert a window position (e.g. the mouse) to logical canvas coordinates."""
+    area, _ = get_presentation_layout(pygame.display.get_surface().get_size())
+    return ((pos[0] - area.x) * WIDTH / area.width, (pos[1] - area.y) * HEIGHT / area.height)
 
-def draw_background():
-    """Draw the game background with a gradient and stars."""
+def get_power_state():
+    """Classify the current frame for power management and CPU accounting."""
+    if not window_visible:
+        return 'minimized'
+    if not window_focused:
+        return 'unfocused'
+    return scene_stack[-1].power_state
+
+def create_background_layer():
+    """Render the static gradient background once onto its own surface."""
+    layer = pygame.Surface((WIDTH, HEIGHT)).convert()
     # Create a dark gradient background
     for y in range(0, HEIGHT, 2):
         # Calculate gradient color (dark blue to black)
@@ -510,65 +434,81 @@ def draw_background():
         r = int(0 * (1 - gradient_factor))
         g = int(10 * (1 - gradient_factor))
         b = int(30 * (1 - gradient_factor))
-        pygame.draw.line(screen, (r, g, b), (0, y), (WIDTH, y), 2)
+        pygame.draw.line(layer, (r, g, b), (0, y), (WIDTH, y), 2)
+    return layer
+
+background_layer = create_background_layer()
+
+def draw_background():
+    """Draw the game background with a gradient and stars."""
+    screen.blit(background_layer, (0, 0))
     
     # Draw twinkling stars
+    if quality['stars']:
+        draw_stars()
+
+def draw_stars():
+    """Draw the shared star field (menus draw it at every quality tier)."""
     for star in stars:
         x, y, size, brightness, _, _ = star
         color = (brightness, brightness, brightness)
         pygame.draw.circle(screen, color, (x, y), size)
 
 def draw_objects():
-    """Draw all game objects on the screen."""
-    # Draw background
-    draw_background()
-    
-    if not game_over and not game_paused:
+    """Draw all game objects on the screen (the background is drawn first, before input is latched)."""
+    # With bloom the post-process makes the glow, so the per-object glow surfaces are skipped
+    use_bloom = bloom is not None and quality['glow']
+    sync_rects()
+    if not sim.game_over and not game_paused:
         # Draw powerups
-        for powerup in active_powerups:
+        for powerup in sim.active_powerups:
+            rect = pygame.Rect(round(powerup['x']), round(powerup['y']), POWERUP_SIZE, POWERUP_SIZE)
             # Create pulsing effect
             pulse_factor = (math.sin(powerup['pulse']) + 1) / 2
             size_factor = 1 + 0.2 * pulse_factor
-            glow_size = int(powerup['rect'].width * size_factor)
+            glow_size = int(rect.width * size_factor)
             
             # Draw glow
-            glow_surface = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (*powerup['color'][:3], 100), 
-                              (glow_size, glow_size), glow_size)
-            screen.blit(glow_surface, (powerup['rect'].centerx - glow_size, powerup['rect'].centery - glow_size))
+            if quality['glow'] and not use_bloom:
+                glow_surface = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
+                pygame.draw.circle(glow_surface, (*NEON_YELLOW[:3], 100), 
+                                  (glow_size, glow_size), glow_size)
+                screen.blit(glow_surface, (rect.centerx - glow_size, rect.centery - glow_size))
             
             # Draw powerup
-            pygame.draw.circle(screen, powerup['color'], powerup['rect'].center, powerup['rect'].width // 2)
+            pygame.draw.circle(screen, NEON_YELLOW, rect.center, rect.width // 2)
             
             # Draw icon based on powerup type
             if powerup['type'] == 'speed_boost':
                 # Draw lightning bolt
                 points = [
-                    (powerup['rect'].centerx - 5, powerup['rect'].centery - 7),
-                    (powerup['rect'].centerx + 2, powerup['rect'].centery - 2),
-                    (powerup['rect'].centerx - 2, powerup['rect'].centery + 2),
-                    (powerup['rect'].centerx + 5, powerup['rect'].centery + 7)
+                    (rect.centerx - 5, rect.centery - 7),
+                    (rect.centerx + 2, rect.centery - 2),
+                    (rect.centerx - 2, rect.centery + 2),
+                    (rect.centerx + 5, rect.centery + 7)
                 ]
                 pygame.draw.lines(screen, BLACK, False, points, 2)
             elif powerup['type'] == 'paddle_grow':
                 # Draw plus sign
                 pygame.draw.line(screen, BLACK, 
-                                (powerup['rect'].centerx, powerup['rect'].centery - 5),
-                                (powerup['rect'].centerx, powerup['rect'].centery + 5), 2)
+                                (rect.centerx, rect.centery - 5),
+                                (rect.centerx, rect.centery + 5), 2)
                 pygame.draw.line(screen, BLACK, 
-                                (powerup['rect'].centerx - 5, powerup['rect'].centery),
-                                (powerup['rect'].centerx + 5, powerup['rect'].centery), 2)
+                                (rect.centerx - 5, rect.centery),
+                                (rect.centerx + 5, rect.centery), 2)
             elif powerup['type'] == 'paddle_shrink':
                 # Draw minus sign
                 pygame.draw.line(screen, BLACK, 
-                                (powerup['rect'].centerx - 5, powerup['rect'].centery),
-                                (powerup['rect'].centerx + 5, powerup['rect'].centery), 2)
+                                (rect.centerx - 5, rect.centery),
+                                (rect.centerx + 5, rect.centery), 2)
             elif powerup['type'] == 'ball_size':
                 # Draw circle
-                pygame.draw.circle(screen, BLACK, powerup['rect'].center, 3)
+                pygame.draw.circle(screen, BLACK, rect.center, 3)
         
-        # Draw ball trail
-        for i, (x, y) in enumerate(ball_trail):
+        # Draw ball trail (lower quality tiers keep only the newest positions)
+        ball_trail = sim.ball_trail
+        trail_start = max(0, len(ball_trail) - quality['trail'])
+        for i, (x, y) in enumerate(ball_trail[trail_start:], trail_start):
             # Calculate size and alpha based on position in trail
             size = int(BALL_SIZE * (i / TRAIL_LENGTH) * 0.8)
             alpha = int(200 * (i / TRAIL_LENGTH))
@@ -579,10 +519,10 @@ def draw_objects():
             screen.blit(trail_surface, (x - size, y - size))
         
         # Draw hit animations
-        for anim in hit_animations:
+        for anim in sim.hit_animations:
             # Create a surface for the hit animation with transparency
             anim_surface = pygame.Surface((anim['radius'] * 2, anim['radius'] * 2), pygame.SRCALPHA)
-            pygame.draw.circle(anim_surface, (*anim['color'][:3], anim['alpha']), 
+            pygame.draw.circle(anim_surface, (*NEON_PINK[:3], anim['alpha']), 
                               (anim['radius'], anim['radius']), anim['radius'])
             screen.blit(anim_surface, (anim['x'] - anim['radius'], anim['y'] - anim['radius']))
         
@@ -592,31 +532,33 @@ def draw_objects():
             paddle_color = NEON_GREEN
             
             # Change color based on active powerups
-            if powerup_effects[player_key]['paddle_grow'] > 0:
+            if sim.powerup_effects[player_key]['paddle_grow'] > 0:
                 paddle_color = NEON_BLUE
-            elif powerup_effects[player_key]['paddle_shrink'] > 0:
+            elif sim.powerup_effects[player_key]['paddle_shrink'] > 0:
                 paddle_color = NEON_RED
-            elif powerup_effects[player_key]['speed_boost'] > 0:
+            elif sim.powerup_effects[player_key]['speed_boost'] > 0:
                 paddle_color = NEON_YELLOW
             
             # Draw glow
-            glow_surface = pygame.Surface((paddle.width + 10, paddle.height + 10), pygame.SRCALPHA)
-            pygame.draw.rect(glow_surface, (*paddle_color[:3], 100), 
-                            pygame.Rect(5, 5, paddle.width, paddle.height), 
-                            border_radius=3)
-            screen.blit(glow_surface, (paddle.x - 5, paddle.y - 5))
+            if quality['glow'] and not use_bloom:
+                glow_surface = pygame.Surface((paddle.width + 10, paddle.height + 10), pygame.SRCALPHA)
+                pygame.draw.rect(glow_surface, (*paddle_color[:3], 100), 
+                                pygame.Rect(5, 5, paddle.width, paddle.height), 
+                                border_radius=3)
+                screen.blit(glow_surface, (paddle.x - 5, paddle.y - 5))
             
             # Draw paddle
             pygame.draw.rect(screen, paddle_color, paddle, border_radius=3)
         
         # Draw ball with glow
         ball_color = NEON_PINK
-        if powerup_effects['ball']['size'] > 0:
+        if sim.powerup_effects['ball']['size'] > 0:
             ball_color = NEON_PURPLE
             
-        glow_surface = pygame.Surface((ball.width * 2 + 10, ball.height * 2 + 10), pygame.SRCALPHA)
-        pygame.draw.circle(glow_surface, (*ball_color[:3], 100), (ball.width + 5, ball.height + 5), ball.width + 5)
-        screen.blit(glow_surface, (ball.x - 5, ball.y - 5))
+        if quality['glow'] and not use_bloom:
+            glow_surface = pygame.Surface((ball.width * 2 + 10, ball.height * 2 + 10), pygame.SRCALPHA)
+            pygame.draw.circle(glow_surface, (*ball_color[:3], 100), (ball.width + 5, ball.height + 5), ball.width + 5)
+            screen.blit(glow_surface, (ball.x - 5, ball.y - 5))
         pygame.draw.ellipse(screen, ball_color, ball)
         
         # Draw the center line (dashed)
@@ -624,31 +566,32 @@ def draw_objects():
             pygame.draw.rect(screen, NEON_PURPLE, (WIDTH // 2 - 1, y, 2, 10))
         
         # Draw scores with glow effect
-        player1_text = font.render(str(player1_score), True, NEON_BLUE)
-        player2_text = font.render(str(player2_score), True, NEON_BLUE)
-        
-        # Create glow surfaces
-        glow_surface1 = pygame.Surface((player1_text.get_width() + 10, player1_text.get_height() + 10), pygame.SRCALPHA)
-        glow_surface2 = pygame.Surface((player2_text.get_width() + 10, player2_text.get_height() + 10), pygame.SRCALPHA)
-        
-        # Render text on glow surfaces with alpha
-        glow_text1 = font.render(str(player1_score), True, (*NEON_BLUE[:3], 100))
-        glow_text2 = font.render(str(player2_score), True, (*NEON_BLUE[:3], 100))
-        
-        # Position and blit glow text
-        glow_surface1.blit(glow_text1, (5, 5))
-        glow_surface2.blit(glow_text2, (5, 5))
+        player1_text = font.render(str(sim.player1_score), True, NEON_BLUE)
+        player2_text = font.render(str(sim.player2_score), True, NEON_BLUE)
         
-        # Blit glow surfaces
-        screen.blit(glow_surface1, (WIDTH // 4 - 5, 20 - 5))
-        screen.blit(glow_surface2, (3 * WIDTH // 4 - 5, 20 - 5))
+        if quality['text_glow'] and not use_bloom:
+            # Create glow surfaces
+            glow_surface1 = pygame.Surface((player1_text.get_width() + 10, player1_text.get_height() + 10), pygame.SRCALPHA)
+            glow_surface2 = pygame.Surface((player2_text.get_width() + 10, player2_text.get_height() + 10), pygame.SRCALPHA)
+            
+            # Render text on glow surfaces with alpha
+            glow_text1 = font.render(str(sim.player1_score), True, (*NEON_BLUE[:3], 100))
+            glow_text2 = font.render(str(sim.player2_score), True, (*NEON_BLUE[:3], 100))
+            
+            # Position and blit glow text
+            glow_surface1.blit(glow_text1, (5, 5))
+            glow_surface2.blit(glow_text2, (5, 5))
+            
+            # Blit glow surfaces
+            screen.blit(glow_surface1, (WIDTH // 4 - 5, 20 - 5))
+            screen.blit(glow_surface2, (3 * WIDTH // 4 - 5, 20 - 5))
         
         # Blit actual text
         screen.blit(player1_text, (WIDTH // 4, 20))
         screen.blit(player2_text, (3 * WIDTH // 4, 20))
         
         # Draw ball speed indicator
-        speed_text = small_font.render(f"Ball Speed: {current_ball_speed:.2f}", True, NEON_GREEN)
+        speed_text = small_font.render(f"Ball Speed: {sim.current_ball_speed:.2f}", True, NEON_GREEN)
         screen.blit(speed_text, (WIDTH // 2 - 80, 20))
         
         # Draw game mode and difficulty indicators
@@ -660,13 +603,7 @@ def draw_objects():
         screen.blit(diff_text, (WIDTH // 2 - 80, HEIGHT - 30))
         if not two_player_mode:
             screen.blit(control_text, (WIDTH // 2 - 80, HEIGHT - 90))
-            
-        # Draw FPS counter if enabled
-        if show_fps:
-            fps = int(clock.get_fps())
-            fps_text = tiny_font.render(f"FPS: {fps}", True, WHITE)
-            screen.blit(fps_text, (10, 10))
-            
+    
     elif game_paused:
         # Draw paused screen
         paused_text = font.render("PAUSED", True, NEON_GREEN)
@@ -674,38 +611,40 @@ def draw_objects():
         menu_text = small_font.render("Press M for menu", True, NEON_PINK)
         
         # Create glow effect
-        glow_surface = pygame.Surface((paused_text.get_width() + 20, paused_text.get_height() + 20), pygame.SRCALPHA)
-        glow_paused = font.render("PAUSED", True, (*NEON_GREEN[:3], 100))
-        glow_surface.blit(glow_paused, (10, 10))
+        if quality['text_glow'] and not use_bloom:
+            glow_surface = pygame.Surface((paused_text.get_width() + 20, paused_text.get_height() + 20), pygame.SRCALPHA)
+            glow_paused = font.render("PAUSED", True, (*NEON_GREEN[:3], 100))
+            glow_surface.blit(glow_paused, (10, 10))
+            screen.blit(glow_surface, (WIDTH // 2 - paused_text.get_width() // 2 - 10, HEIGHT // 2 - 100 - 10))
         
         # Position and blit
-        screen.blit(glow_surface, (WIDTH // 2 - paused_text.get_width() // 2 - 10, HEIGHT // 2 - 100 - 10))
         screen.blit(paused_text, (WIDTH // 2 - paused_text.get_width() // 2, HEIGHT // 2 - 100))
         screen.blit(resume_text, (WIDTH // 2 - resume_text.get_width() // 2, HEIGHT // 2))
         screen.blit(menu_text, (WIDTH // 2 - menu_text.get_width() // 2, HEIGHT // 2 + 50))
         
     else:
         # Draw game over screen with neon effect
-        winner_text = font.render(f"Player {winner} Wins!", True, NEON_GREEN)
-        score_text = font.render(f"{player1_score} - {player2_score}", True, NEON_BLUE)
+        winner_text = font.render(f"Player {sim.winner} Wins!", True, NEON_GREEN)
+        score_text = font.render(f"{sim.player1_score} - {sim.player2_score}", True, NEON_BLUE)
         restart_text = small_font.render("Press SPACE to play again", True, NEON_PINK)
         menu_text = small_font.render("Press M to return to menu", True, NEON_PINK)
         
-        # Create glow surfaces
-        glow_surface1 = pygame.Surface((winner_text.get_width() + 10, winner_text.get_height() + 10), pygame.SRCALPHA)
-        glow_surface2 = pygame.Surface((score_text.get_width() + 10, score_text.get_height() + 10), pygame.SRCALPHA)
-        
-        # Render text on glow surfaces with alpha
-        glow_winner = font.render(f"Player {winner} Wins!", True, (*NEON_GREEN[:3], 100))
-        glow_score = font.render(f"{player1_score} - {player2_score}", True, (*NEON_BLUE[:3], 100))
-        
-        # Position and blit glow text
-        glow_surface1.blit(glow_winner, (5, 5))
-        glow_surface2.blit(glow_score, (5, 5))
-        
-        # Blit glow surfaces
-        screen.blit(glow_surface1, (WIDTH // 2 - winner_text.get_width() // 2 - 5, HEIGHT // 2 - 100 - 5))
-        screen.blit(glow_surface2, (WIDTH // 2 - score_text.get_width() // 2 - 5, HEIGHT // 2 - 5))
+        if quality['text_glow'] and not use_bloom:
+            # Create glow surfaces
+            glow_surface1 = pygame.Surface((winner_text.get_width() + 10, winner_text.get_height() + 10), pygame.SRCALPHA)
+            glow_surface2 = pygame.Surface((score_text.get_width() + 10, score_text.get_height() + 10), pygame.SRCALPHA)
+            
+            # Render text on glow surfaces with alpha
+            glow_winner = font.render(f"Player {sim.winner} Wins!", True, (*NEON_GREEN[:3], 100))
+            glow_score = font.render(f"{sim.player1_score} - {sim.player2_score}", True, (*NEON_BLUE[:3], 100))
+            
+            # Position and blit glow text
+            glow_surface1.blit(glow_winner, (5, 5))
+            glow_surface2.blit(glow_score, (5, 5))
+            
+            # Blit glow surfaces
+            screen.blit(glow_surface1, (WIDTH // 2 - winner_text.get_width() // 2 - 5, HEIGHT // 2 - 100 - 5))
+            screen.blit(glow_surface2, (WIDTH // 2 - score_text.get_width() // 2 - 5, HEIGHT // 2 - 5))
         
         # Blit actual text
         screen.blit(winner_text, (WIDTH // 2 - winner_text.get_width() // 2, HEIGHT // 2 - 100))
@@ -713,357 +652,432 @@ def draw_objects():
         screen.blit(restart_text, (WIDTH // 2 - restart_text.get_width() // 2, HEIGHT // 2 + 100))
         screen.blit(menu_text, (WIDTH // 2 - menu_text.get_width() // 2, HEIGHT // 2 + 150))
 
-def show_control_type_menu():
-    """Display the control type selection menu for single player mode."""
-    global control_type
-    
-    menu_active = True
-    menu_stars = stars.copy()  # Copy stars for menu background
-    
-    while menu_active:
-        # Update star animation
-        for star in menu_stars:
-            star[5] += star[4]
-            pulse_factor = (math.sin(star[5]) + 1) / 2
-            star[3] = int(100 + 155 * pulse_factor)
-        
-        # Draw background
-        screen.fill(BLACK)
-        
-        # Draw stars
-        for star in menu_stars:
-            x, y, size, brightness, _, _ = star
-            color = (brightness, brightness, brightness)
-            pygame.draw.circle(screen, color, (x, y), size)
-        
-        # Draw title with glow effect
-        title_text = font.render("SELECT CONTROL TYPE", True, NEON_BLUE)
+def publish_spectator_frame():
+    """Publish this tick's game state to the spectator ring."""
+    sync_rects()
+    spectator.publish(scene_stack[-1].power_state, game_time, sim.winner, two_player_mode, current_difficulty,
+                      (sim.player1_score, sim.player2_score), sim.current_ball_speed, ball,
+                      (player1_paddle, player2_paddle), sim.powerup_effects, sim.active_powerups,
+                      sim.hit_animations)
+
+def draw_fps_overlay():
+    """Draw the FPS counter and profiling lines (after the bloom, so they stay sharp)."""
+    fps = int(pacer.fps())
+    window_w, window_h = pygame.display.get_surface().get_size()
+    overlay_lines = [
+        f"FPS: {fps}",
+        f"Present: {present_ms:.2f} ms  {scale_mode} to {window_w}x{window_h}",
+        f"Quality: {quality['name']}  p95 {quality_percentile_ms:.1f} ms  switches: {quality_switches}",
+        f"Last: {quality_last_switch}" if quality_last_switch else "",
+        pacer.report()
+    ]
+    if options.measure_latency:
+        overlay_lines.append(input_buffer.latency_report())
+    overlay_lines.append(voices.report())
+    if bloom is not None:
+        overlay_lines.append(f"Bloom: {bloom.method} {bloom.last_ms:.2f} ms"
+                             + ("" if quality['glow'] else " (off at this quality tier)"))
+    if capture:
+        overlay_lines.append(capture.report())
+    if spectator:
+        overlay_lines.append(spectator.report())
+    if match_stats:
+        overlay_lines.append(match_stats.report())
+    if alloc_profiler:
+        overlay_lines.append(alloc_profiler.overlay())
+    for i, line in enumerate(overlay_lines):
+        if line:
+            screen.blit(tiny_font.render(line, True, WHITE), (10, 10 + 20 * i))
+
+# Rendered menu text, shared by every menu scene for the whole session
+text_cache = {}
+
+def render_text(text_font, text, color):
+    """Render text once and reuse the surface while the text and color stay the same."""
+    key = (text_font, text, color)
+    surface = text_cache.get(key)
+    if surface is None:
+        surface = text_cache[key] = text_font.render(text, True, color)
+    return surface
+
+def render_title(text, color):
+    """Return a menu title and its glow surface, rendered once."""
+    key = ('title', text, color)
+    title = text_cache.get(key)
+    if title is None:
+        title_text = font.render(text, True, color)
         glow_surface = pygame.Surface((title_text.get_width() + 20, title_text.get_height() + 20), pygame.SRCALPHA)
-        glow_title = font.render("SELECT CONTROL TYPE", True, (*NEON_BLUE[:3], 100))
-        glow_surface.blit(glow_title, (10, 10))
-        screen.blit(glow_surface, (WIDTH // 2 - title_text.get_width() // 2 - 10, 100 - 10))
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 100))
-        
-        # Draw options with neon effect
-        option1_text = small_font.render("1. Keyboard (W/S or Up/Down)", True, NEON_GREEN)
-        option2_text = small_font.render("2. Mouse", True, NEON_GREEN)
-        instructions_text = small_font.render("Press 1 or 2 to select control type", True, NEON_BLUE)
-        
-        screen.blit(option1_text, (WIDTH // 2 - option1_text.get_width() // 2, 220))
-        screen.blit(option2_text, (WIDTH // 2 - option2_text.get_width() // 2, 270))
-        screen.blit(instructions_text, (WIDTH // 2 - instructions_text.get_width() // 2, 350))
-        
-        pygame.display.flip()
-        
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_1:
-                    control_type = "keyboard"
-                    menu_active = False
-                elif event.key == pygame.K_2:
-                    control_type = "mouse"
-                    menu_active = False
-                elif event.key == pygame.K_ESCAPE:
-                    menu_active = False
-        
-        clock.tick(FPS)
+        glow_surface.blit(font.render(text, True, (*color[:3], 100)), (10, 10))
+        title = text_cache[key] = (title_text, glow_surface)
+    return title
+
+# Scene stack: the main loop drives the scene on top; menus and pause screens are pushed over
+# what they return to, so moving between menus and the game never nests loops or calls
+scene_stack = []
+
+def push_scene(scene):
+    """Show a scene on top of the current one."""
+    scene_stack.append(scene)
+
+def pop_scene():
+    """Return to the scene below the top one."""
+    scene_stack.pop()
+
+def replace_scene(scene):
+    """Swap the top scene for another one at the same depth."""
+    scene_stack[-1] = scene
+
+def switch_scene(scene):
+    """Drop the whole stack and start over from a single scene (a new game, or back to the main menu)."""
+    scene_stack.clear()
+    scene_stack.append(scene)
+
+def start_game():
+    """Reset the game state and make the game the only scene."""
+    reset_game()
+    switch_scene(GameScene())
 
-def show_difficulty_menu():
-    """Display the difficulty selection menu."""
-    global current_difficulty, INITIAL_BALL_SPEED, MAX_BALL_SPEED, BALL_ACCELERATION, AI_SPEED
+def set_difficulty(level):
+    """Select the difficulty level (ball and AI settings) used from the next match on."""
+    global current_difficulty
+    current_difficulty = level
+
+class Scene:
+    """One entry on the scene stack."""
+    power_state = 'menu'
     
-    menu_active = True
-    menu_stars = stars.copy()  # Copy stars for menu background
+    def handle_event(self, event):
+        """React to one buffered event."""
     
-    while menu_active:
-        # Update star animation
-        for star in menu_stars:
-            star[5] += star[4]
-            pulse_factor = (math.sin(star[5]) + 1) / 2
-            star[3] = int(100 + 155 * pulse_factor)
-        
-        # Draw background
-        screen.fill(BLACK)
-        
-        # Draw stars
-        for star in menu_stars:
-            x, y, size, brightness, _, _ = star
-            color = (brightness, brightness, brightness)
-            pygame.draw.circle(screen, color, (x, y), size)
-        
-        # Draw title with glow effect
-        title_text = font.render("SELECT DIFFICULTY", True, NEON_BLUE)
-        glow_surface = pygame.Surface((title_text.get_width() + 20, title_text.get_height() + 20), pygame.SRCALPHA)
-        glow_title = font.render("SELECT DIFFICULTY", True, (*NEON_BLUE[:3], 100))
-        glow_surface.blit(glow_title, (10, 10))
-        screen.blit(glow_surface, (WIDTH // 2 - title_text.get_width() // 2 - 10, 100 - 10))
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 100))
-        
-        # Draw options with neon effect
-        option1_text = small_font.render("1. Easy", True, NEON_GREEN)
-        option2_text = small_font.render("2. Medium", True, NEON_GREEN)
-        option3_text = small_font.render("3. Hard", True, NEON_GREEN)
-        instructions_text = small_font.render("Press 1, 2, or 3 to select difficulty", True, NEON_BLUE)
-        
-        # Draw difficulty descriptions
-        easy_desc = small_font.render("Slower ball, more forgiving AI", True, NEON_PINK)
-        medium_desc = small_font.render("Balanced gameplay", True, NEON_PINK)
-        hard_desc = small_font.render("Faster ball, smarter AI", True, NEON_PINK)
-        
-        screen.blit(option1_text, (WIDTH // 2 - option1_text.get_width() // 2, 220))
-        screen.blit(easy_desc, (WIDTH // 2 - easy_desc.get_width() // 2, 250))
-        
-        screen.blit(option2_text, (WIDTH // 2 - option2_text.get_width() // 2, 300))
-        screen.blit(medium_desc, (WIDTH // 2 - medium_desc.get_width() // 2, 330))
-        
-        screen.blit(option3_text, (WIDTH // 2 - option3_text.get_width() // 2, 380))
-        screen.blit(hard_desc, (WIDTH // 2 - hard_desc.get_width() // 2, 410))
-        
-        screen.blit(instructions_text, (WIDTH // 2 - instructions_text.get_width() // 2, 480))
-        
-        pygame.display.flip()
-        
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_1:
-                    current_difficulty = 'Easy'
-                    menu_active = False
-                elif event.key == pygame.K_2:
-                    current_difficulty = 'Medium'
-                    menu_active = False
-                elif event.key == pygame.K_3:
-                    current_difficulty = 'Hard'
-                    menu_active = False
-                elif event.key == pygame.K_ESCAPE:
-                    menu_active = False
-        
-        clock.tick(FPS)
+    def prepare(self):
+        """Per-frame work that does not depend on paddle input (runs before the input latch)."""
     
-    # Update game settings based on difficulty
-    INITIAL_BALL_SPEED = DIFFICULTY_SETTINGS[current_difficulty]['INITIAL_BALL_SPEED']
-    MAX_BALL_SPEED = DIFFICULTY_SETTINGS[current_difficulty]['MAX_BALL_SPEED']
-    BALL_ACCELERATION = DIFFICULTY_SETTINGS[current_difficulty]['BALL_ACCELERATION']
-    AI_SPEED = DIFFICULTY_SETTINGS[current_difficulty]['AI_SPEED']
-
-def show_main_menu():
-    """Display the main menu with options: Start Game, Difficulty, Quit."""
-    menu_active = True
-    menu_stars = stars.copy()  # Copy stars for menu background
+    def update(self):
+        """Advance the scene by delta_time."""
     
-    while menu_active:
-        # Update star animation
-        for star in menu_stars:
-            star[5] += star[4]
-            pulse_factor = (math.sin(star[5]) + 1) / 2
-            star[3] = int(100 + 155 * pulse_factor)
-        
-        # Draw background
-        screen.fill(BLACK)
-        
-        # Draw stars
-        for star in menu_stars:
-            x, y, size, brightness, _, _ = star
-            color = (brightness, brightness, brightness)
-            pygame.draw.circle(screen, color, (x, y), size)
-        
-        # Draw title with glow effect
-        title_text = font.render("NEON PONG", True, NEON_PINK)
-        glow_surface = pygame.Surface((title_text.get_width() + 20, title_text.get_height() + 20), pygame.SRCALPHA)
-        glow_title = font.render("NEON PONG", True, (*NEON_PINK[:3], 100))
-        glow_surface.blit(glow_title, (10, 10))
-        screen.blit(glow_surface, (WIDTH // 2 - title_text.get_width() // 2 - 10, 100 - 10))
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 100))
-        
-        # Draw options with neon effect
-        option1_text = small_font.render("1. Start Game", True, NEON_GREEN)
-        option2_text = small_font.render("2. Change Difficulty", True, NEON_GREEN)
-        option3_text = small_font.render("3. Toggle FPS Display", True, NEON_GREEN)
-        option4_text = small_font.render("4. Quit", True, NEON_GREEN)
-        instructions_text = small_font.render("Press 1-4 to select an option", True, NEON_BLUE)
-        difficulty_text = small_font.render(f"Current Difficulty: {current_difficulty}", True, NEON_BLUE)
-        
-        screen.blit(option1_text, (WIDTH // 2 - option1_text.get_width() // 2, 220))
-        screen.blit(option2_text, (WIDTH // 2 - option2_text.get_width() // 2, 270))
-        screen.blit(option3_text, (WIDTH // 2 - option3_text.get_width() // 2, 320))
-        screen.blit(option4_text, (WIDTH // 2 - option4_text.get_width() // 2, 370))
-        screen.blit(instructions_text, (WIDTH // 2 - instructions_text.get_width() // 2, 450))
-        screen.blit(difficulty_text, (WIDTH // 2 - difficulty_text.get_width() // 2, 500))
-        
-        pygame.display.flip()
-        
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_1:
-                    show_game_mode_menu()
-                    menu_active = False
-                elif event.key == pygame.K_2:
-                    show_difficulty_menu()
-                elif event.key == pygame.K_3:
-                    global show_fps
-                    show_fps = not show_fps
-                elif event.key == pygame.K_4 or event.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
-        
-        clock.tick(FPS)
+    def draw(self):
+        """Draw the scene on top of what prepare() drew."""
 
-def show_game_mode_menu():
-    """Display the game mode selection menu."""
-    global two_player_mode
+class MenuScene(Scene):
+    """A static text menu over the shared star field."""
+    title = ""
+    title_color = NEON_PINK
     
-    menu_active = True
-    menu_stars = stars.copy()  # Copy stars for menu background
+    def lines(self):
+        """Return the menu's text lines as (text, font, color, y)."""
+        return []
     
-    while menu_active:
-        # Update star animation
-        for star in menu_stars:
-            star[5] += star[4]
-            pulse_factor = (math.sin(star[5]) + 1) / 2
-            star[3] = int(100 + 155 * pulse_factor)
-        
-        # Draw background
+    def handle_key(self, key):
+        """React to a key press."""
+    
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            self.handle_key(event.key)
+    
+    def prepare(self):
+        update_stars()
         screen.fill(BLACK)
-        
-        # Draw stars
-        for star in menu_stars:
-            x, y, size, brightness, _, _ = star
-            color = (brightness, brightness, brightness)
-            pygame.draw.circle(screen, color, (x, y), size)
-        
+        draw_stars()
+    
+    def draw(self):
         # Draw title with glow effect
-        title_text = font.render("SELECT GAME MODE", True, NEON_PINK)
-        glow_surface = pygame.Surface((title_text.get_width() + 20, title_text.get_height() + 20), pygame.SRCALPHA)
-        glow_title = font.render("SELECT GAME MODE", True, (*NEON_PINK[:3], 100))
-        glow_surface.blit(glow_title, (10, 10))
+        title_text, glow_surface = render_title(self.title, self.title_color)
         screen.blit(glow_surface, (WIDTH // 2 - title_text.get_width() // 2 - 10, 100 - 10))
         screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 100))
         
         # Draw options with neon effect
-        option1_text = small_font.render("1. Single Player (vs AI)", True, NEON_GREEN)
-        option2_text = small_font.render("2. Two Players", True, NEON_GREEN)
-        option3_text = small_font.render("B. Back to Main Menu", True, NEON_GREEN)
-        instructions_text = small_font.render("Press 1 or 2 to select mode, B for main menu", True, NEON_BLUE)
-        win_condition_text = small_font.render(f"First to {WINNING_SCORE} points wins!", True, NEON_BLUE)
-        difficulty_text = small_font.render(f"Current Difficulty: {current_difficulty}", True, NEON_BLUE)
-        
-        screen.blit(option1_text, (WIDTH // 2 - option1_text.get_width() // 2, 220))
-        screen.blit(option2_text, (WIDTH // 2 - option2_text.get_width() // 2, 270))
-        screen.blit(option3_text, (WIDTH // 2 - option3_text.get_width() // 2, 320))
-        screen.blit(instructions_text, (WIDTH // 2 - instructions_text.get_width() // 2, 400))
-        screen.blit(win_condition_text, (WIDTH // 2 - win_condition_text.get_width() // 2, 450))
-        screen.blit(difficulty_text, (WIDTH // 2 - difficulty_text.get_width() // 2, 500))
-        
-        pygame.display.flip()
-        
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_1:
-                    two_player_mode = False
-                    show_control_type_menu()  # Ask for control type in single player mode
-                    menu_active = False
-                    reset_game()  # Reset game state
-                elif event.key == pygame.K_2:
-                    two_player_mode = True
-                    menu_active = False
-                    reset_game()  # Reset game state
-                elif event.key == pygame.K_b:
-                    show_main_menu()
-                    menu_active = False
-                elif event.key == pygame.K_ESCAPE:
-                    show_main_menu()
-                    menu_active = False
-        
-        clock.tick(FPS)
-
-# Show main menu before starting the game
-show_main_menu()
+        for text, text_font, color, y in self.lines():
+            surface = render_text(text_font, text, color)
+            screen.blit(surface, (WIDTH // 2 - surface.get_width() // 2, y))
 
-# Main game loop
-while True:
-    # Calculate delta time for frame-rate independent movement
-    current_time = time.time()
-    delta_time = current_time - last_frame_time
-    last_frame_time = current_time
+class MainMenuScene(MenuScene):
+    """Main menu with options: Start Game, Difficulty, FPS display, Quit."""
+    title = "NEON PONG"
     
-    # Cap delta time to prevent large jumps
-    if delta_time > 0.05:
-        delta_time = 0.05
+    def lines(self):
+        return [
+            ("1. Start Game", small_font, NEON_GREEN, 220),
+            ("2. Change Difficulty", small_font, NEON_GREEN, 270),
+            ("3. Toggle FPS Display", small_font, NEON_GREEN, 320),
+            ("4. Quit", small_font, NEON_GREEN, 370),
+            ("Press 1-4 to select an option", small_font, NEON_BLUE, 450),
+            (f"Current Difficulty: {current_difficulty}", small_font, NEON_BLUE, 500)
+        ]
     
-    # Event handling
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
+    def handle_key(self, key):
+        global show_fps
+        if key == pygame.K_1:
+            push_scene(GameModeMenuScene())
+        elif key == pygame.K_2:
+            push_scene(DifficultyMenuScene())
+        elif key == pygame.K_3:
+            show_fps = not show_fps
+        elif key == pygame.K_4 or key == pygame.K_ESCAPE:
             pygame.quit()
             sys.exit()
-        elif event.type == pygame.KEYDOWN:
+
+class GameModeMenuScene(MenuScene):
+    """Game mode selection: single player against the AI or two players."""
+    title = "SELECT GAME MODE"
+    
+    def lines(self):
+        return [
+            ("1. Single Player (vs AI)", small_font, NEON_GREEN, 220),
+            ("2. Two Players", small_font, NEON_GREEN, 270),
+            ("B. Back to Main Menu", small_font, NEON_GREEN, 320),
+            ("Press 1 or 2 to select mode, B for main menu", small_font, NEON_BLUE, 400),
+            (f"First to {WINNING_SCORE} points wins!", small_font, NEON_BLUE, 450),
+            (f"Current Difficulty: {current_difficulty}", small_font, NEON_BLUE, 500)
+        ]
+    
+    def handle_key(self, key):
+        global two_player_mode
+        if key == pygame.K_1:
+            two_player_mode = False
+            replace_scene(ControlTypeMenuScene())  # Ask for control type in single player mode
+        elif key == pygame.K_2:
+            two_player_mode = True
+            start_game()
+        elif key == pygame.K_b or key == pygame.K_ESCAPE:
+            pop_scene()
+
+class ControlTypeMenuScene(MenuScene):
+    """Control type selection for single player mode; any choice starts the game."""
+    title = "SELECT CONTROL TYPE"
+    title_color = NEON_BLUE
+    
+    def lines(self):
+        return [
+            ("1. Keyboard (W/S or Up/Down)", small_font, NEON_GREEN, 220),
+            ("2. Mouse", small_font, NEON_GREEN, 270),
+            ("Press 1 or 2 to select control type", small_font, NEON_BLUE, 350)
+        ]
+    
+    def handle_key(self, key):
+        global control_type
+        if key == pygame.K_1:
+            control_type = "keyboard"
+            start_game()
+        elif key == pygame.K_2:
+            control_type = "mouse"
+            start_game()
+        elif key == pygame.K_ESCAPE:
+            start_game()  # Keep the current control type
+
+class DifficultyMenuScene(MenuScene):
+    """Difficulty selection; returns to the menu below it."""
+    title = "SELECT DIFFICULTY"
+    title_color = NEON_BLUE
+    
+    def lines(self):
+        return [
+            ("1. Easy", small_font, NEON_GREEN, 220),
+            ("Slower ball, more forgiving AI", small_font, NEON_PINK, 250),
+            ("2. Medium", small_font, NEON_GREEN, 300),
+            ("Balanced gameplay", small_font, NEON_PINK, 330),
+            ("3. Hard", small_font, NEON_GREEN, 380),
+            ("Faster ball, smarter AI", small_font, NEON_PINK, 410),
+            ("Press 1, 2, or 3 to select difficulty", small_font, NEON_BLUE, 480)
+        ]
+    
+    def handle_key(self, key):
+        levels = {pygame.K_1: 'Easy', pygame.K_2: 'Medium', pygame.K_3: 'Hard'}
+        if key in levels:
+            set_difficulty(levels[key])
+            pop_scene()
+        elif key == pygame.K_ESCAPE:
+            pop_scene()
+
+class PlayScene(Scene):
+    """Shared behaviour of the game and the screens shown over it (pause, game over)."""
+    
+    def handle_event(self, event):
+        global show_fps
+        if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_m:  # Press M to return to menu
-                show_main_menu()
-            elif event.key == pygame.K_p:  # Press P to pause/unpause
-                game_paused = not game_paused
-            elif event.key == pygame.K_SPACE and game_over:  # Press SPACE to restart after game over
-                reset_game()
+                switch_scene(MainMenuScene())
             elif event.key == pygame.K_f:  # Toggle FPS display
                 show_fps = not show_fps
+            else:
+                self.handle_key(event.key)
+    
+    def handle_key(self, key):
+        """React to a key press other than M and F."""
+    
+    def prepare(self):
+        update_stars()
+        draw_background()
     
-    if not game_over and not game_paused:
-        # Get keyboard input for Player 1 (left paddle)
-        keys = pygame.key.get_pressed()
+    def draw(self):
+        draw_objects()
+        if bloom is not None and quality['glow']:
+            bloom.apply(screen)
+        if show_fps and self.power_state == 'playing':
+            draw_fps_overlay()
+
+class GameScene(PlayScene):
+    """The match itself."""
+    power_state = 'playing'
+    
+    def __init__(self):
+        self.keys = pygame.key.get_pressed()
+        self.mouse_pos = pygame.mouse.get_pos()
+    
+    def handle_event(self, event):
+        super().handle_event(event)
+        if event.type == pygame.WINDOWFOCUSLOST and scene_stack[-1] is self:
+            push_scene(PauseScene())  # Don't let the ball run while nobody is watching
+    
+    def handle_key(self, key):
+        if key == pygame.K_p:  # Press P to pause
+            push_scene(PauseScene())
+    
+    def prepare(self):
+        if options.input_latch == 'early':
+            self.keys, self.mouse_pos = input_buffer.latch()
+        super().prepare()
+    
+    def update(self):
+        global game_time
+        game_time += delta_time
+        
+        # Latch the newest keyboard and mouse state as late as possible
+        if options.input_latch == 'late':
+            self.keys, self.mouse_pos = input_buffer.latch()
+        keys = self.keys
         
         # Handle Player 1 controls based on control type
+        action1 = 0
         if control_type == "keyboard":
             # Allow both WASD and arrow keys for single player mode
-            if keys[pygame.K_w] or (not two_player_mode and keys[pygame.K_UP]):
-                move_paddle(player1_paddle, up=True, player='player1')
-            if keys[pygame.K_s] or (not two_player_mode and keys[pygame.K_DOWN]):
-                move_paddle(player1_paddle, up=False, player='player1')
+            action1 = paddle_action(keys[pygame.K_w] or (not two_player_mode and keys[pygame.K_UP]),
+                                    keys[pygame.K_s] or (not two_player_mode and keys[pygame.K_DOWN]))
         elif control_type == "mouse" and not two_player_mode:
             # Mouse control for Player 1
-            mouse_y = pygame.mouse.get_pos()[1]
-            move_paddle_mouse(player1_paddle, mouse_y)
+            mouse_y = window_to_canvas(self.mouse_pos)[1]
+            move_paddle_mouse(0, mouse_y)
         
-        # Handle Player 2 input or AI
+        # Handle Player 2 input, or let the simulation's AI control the right paddle
         if two_player_mode:
-            # Player 2 controls (right paddle)
-            if keys[pygame.K_UP]:
-                move_paddle(player2_paddle, up=True, player='player2')
-            if keys[pygame.K_DOWN]:
-                move_paddle(player2_paddle, up=False, player='player2')
+            action2 = paddle_action(keys[pygame.K_UP], keys[pygame.K_DOWN])
         else:
-            # AI controls the right paddle
-            move_ai_opponent()
+            action2 = None
         
         # Update game state
-        update_ball()
-        update_hit_animations()
-        update_powerups()
+        update_game(action1, action2)
         
-        # Chance to spawn powerups
-        spawn_powerup()
-        
-        # Check for powerup collisions
-        check_powerup_collision()
+        if sim.game_over:
+            push_scene(GameOverScene())
+
+class PauseScene(PlayScene):
+    """The paused game."""
+    power_state = 'paused'
     
-    # Update stars animation
-    update_stars()
+    def __init__(self):
+        global game_paused
+        game_paused = True
+    
+    def handle_key(self, key):
+        global game_paused
+        if key == pygame.K_p:  # Press P to resume
+            game_paused = False
+            pop_scene()
+
+class GameOverScene(PlayScene):
+    """The final score, until SPACE starts another match."""
+    power_state = 'game_over'
+    
+    def handle_key(self, key):
+        if key == pygame.K_SPACE:  # Press SPACE to play again
+            reset_game()
+            pop_scene()
+
+# Startup is done: apply the GC policy now, or after the default collector has been measured for a while
+gc_policy_at = time.perf_counter() + options.gc_policy_delay if gc_monitor else None
+if gc_policy_at is not None and options.gc_policy_delay <= 0:
+    gc_monitor.apply_policy(options.gc_policy)
+    gc_policy_at = None
+
+# Start at the main menu
+switch_scene(MainMenuScene())
+
+# Main loop: one frame of the scene on top of the stack per iteration
+while True:
+    frame_start = time.perf_counter()
+    if alloc_profiler:
+        alloc_profiler.phase('input')
+    if gc_policy_at is not None and frame_start >= gc_policy_at:
+        gc_monitor.apply_policy(options.gc_policy)
+        gc_policy_at = None
+    
+    # Delta time for frame-rate independent movement, measured by the pacer with perf_counter_ns
+    # and capped to prevent large jumps
+    delta_time = min(pacer.delta, 0.05)
+    
+    # Event handling (commands only; paddle input is latched later)
+    for event in input_buffer.get():
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            window_focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            window_focused = True
+        elif event.type in (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN):
+            window_visible = False
+        elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWSHOWN, pygame.WINDOWEXPOSED):
+            window_visible = True
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F9 and capture and capture.ring:
+            print(f"Saving the last {options.capture_seconds:g} seconds to {capture.save_ring()}")
+        scene_stack[-1].handle_event(event)
+    
+    scene = scene_stack[-1]
+    power_state = get_power_state()
+    power_monitor.enter(power_state)
+    if power_state == 'minimized' and options.power == 'idle':
+        # Nothing is visible: sleep in SDL until the window comes back (or any other event)
+        input_buffer.wait()
+        pacer.resync()
+        if alloc_profiler:
+            alloc_profiler.end_frame()
+        continue
+    
+    # Work that does not depend on paddle input comes before the latch
+    if alloc_profiler:
+        alloc_profiler.phase('background')
+    scene.prepare()
+    
+    if alloc_profiler:
+        alloc_profiler.phase('update')
+    scene.update()
     
     # Draw everything
-    draw_objects()
+    if alloc_profiler:
+        alloc_profiler.phase('draw')
+    scene.draw()
     
     # Update the display
-    pygame.display.flip()
-    clock.tick(FPS)
+    if alloc_profiler:
+        alloc_profiler.phase('present')
+    if capture:
+        capture.capture(screen)
+    if spectator:
+        publish_spectator_frame()
+    present()
+    input_buffer.presented()
+    voices.end_frame()
+    if alloc_profiler:
+        alloc_profiler.end_frame()
+    
+    frame_ms = (time.perf_counter() - frame_start) * 1000
+    idle_fps = IDLE_FPS.get(power_state) if options.power == 'idle' else None
+    if idle_fps is None:
+        if isinstance(scene, PlayScene):
+            # Adjust effect quality from the time spent on this frame (pacing wait and vsync wait excluded)
+            update_quality(frame_ms - flip_ms if vsync else frame_ms)
+        pacer.tick()
+    else:
+        # Static screen: wait out the rest of the frame (nothing once it is over budget), but wake up as
+        # soon as there is input
+        input_buffer.wait(int(1000 / idle_fps - frame_ms))
+        pacer.resync()
@@ -0,0 +1,175 @@
+"""Allocation and garbage-collection instrumentation for the game loop.
+
+AllocationProfiler splits every frame into named phases and records, per
+phase, the bytes and memory blocks it allocated according to tracemalloc:
+the net change, and the transient peak above the phase's starting point (a
+lower bound on what it allocated and freed again).  Every snapshot_every
+frames it also takes tracemalloc snapshots at the phase boundaries and keeps
+a running table of the source lines that allocated the most in each phase.
+Frames whose peak allocation exceeds the budget are flagged.
+
+GCMonitor times every collection through gc.callbacks and keeps the pause
+distribution per generation, labelled by the GC policy that was active, so
+the default collector and a tuned policy can be compared in the same run.
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+GC_POLICIES = ('default', 'freeze', 'tuned')
+GC_TUNED_THRESHOLD = (20_000, 20, 50)  # Default is (700, 10, 10)
+TOP_SITES = 8
+
+
+def percentile(values, p):
+    """Return the p-th percentile of values (nearest rank), or 0 for no values."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[round(p / 100 * (len(ordered) - 1))]
+
+
+class GCMonitor:
+    """Times garbage collections and groups the pauses by policy and generation."""
+
+    def __init__(self):
+        self.policy = 'default'
+        self.pauses = {}  # (policy, generation) -> pause durations in ms
+        self.frame_pause_ms = 0.0
+        self.start_ns = 0
+        gc.callbacks.append(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self.start_ns = time.perf_counter_ns()
+            return
+        pause_ms = (time.perf_counter_ns() - self.start_ns) / 1e6
+        self.pauses.setdefault((self.policy, info['generation']), []).append(pause_ms)
+        self.frame_pause_ms += pause_ms
+
+    def take_frame_pause(self):
+        """Return the total GC pause since the last call, in milliseconds."""
+        pause_ms = self.frame_pause_ms
+        self.frame_pause_ms = 0.0
+        return pause_ms
+
+    def apply_policy(self, policy):
+        """Switch GC policy; 'freeze' and 'tuned' move everything alive now out of the collector's way."""
+        if policy == 'default':
+            return
+        self.policy = 'switch'  # Keep the one-off full collection out of both distributions
+        gc.collect()
+        gc.freeze()  # Startup objects (fonts, sounds, surfaces, modules) are never traversed again
+        if policy == 'tuned':
+            gc.set_threshold(*GC_TUNED_THRESHOLD)
+        self.policy = policy
+
+    def report(self):
+        """Pause distribution per policy and generation."""
+        lines = ["GC pauses (ms):"]
+        for (policy, generation), pauses in sorted(self.pauses.items()):
+            lines.append(f"  {policy:>7} gen{generation}: {len(pauses):5d} collections, "
+                         f"p50 {percentile(pauses, 50):.3f}  p95 {percentile(pauses, 95):.3f}  "
+                         f"p99 {percentile(pauses, 99):.3f}  max {max(pauses):.3f}  "
+                         f"total {sum(pauses):.1f}")
+        if len(lines) == 1:
+            lines.append("  none recorded")
+        return "\n".join(lines)
+
+
+class AllocationProfiler:
+    """Per-frame, per-phase allocation counts and bytes with an allocation budget."""
+
+    def __init__(self, gc_monitor, budget_kib=64, snapshot_every=300, history=600):
+        self.gc_monitor = gc_monitor
+        self.budget = budget_kib * 1024
+        self.snapshot_every = snapshot_every
+        self.frames = deque(maxlen=history)  # (peak bytes, GC pause ms, {phase: (net, peak, blocks)})
+        self.frame_count = 0
+        self.flagged = 0
+        self.worst = []  # The largest flagged frames as (peak bytes, frame number, phases)
+        self.sites = {}  # (phase, "file:line") -> [bytes, count] from snapshot diffs
+        self.phase_name = None
+        self.phases = {}
+        self.snapshot = None
+        self.filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        tracemalloc.start()
+
+    def phase(self, name):
+        """End the current phase (if any) and start measuring the named one."""
+        current, peak = tracemalloc.get_traced_memory()
+        blocks = sys.getallocatedblocks()
+        if self.phase_name is not None:
+            net_bytes, peak_bytes, net_blocks = self.phases.get(self.phase_name, (0, 0, 0))
+            self.phases[self.phase_name] = (net_bytes + current - self.start_bytes,
+                                            peak_bytes + max(0, peak - self.start_bytes),
+                                            net_blocks + blocks - self.start_blocks)
+            if self.snapshot is not None:
+                self._record_sites(self.phase_name)
+        self.phase_name = name
+        if name is not None and self.snapshot_every and self.frame_count % self.snapshot_every == 0:
+            self.snapshot = tracemalloc.take_snapshot().filter_traces(self.filters)
+            current = tracemalloc.get_traced_memory()[0]
+            blocks = sys.getallocatedblocks()
+        tracemalloc.reset_peak()
+        self.start_bytes = current
+        self.start_blocks = blocks
+
+    def _record_sites(self, phase):
+        """Add the allocations that survived the phase to the per-line table."""
+        after = tracemalloc.take_snapshot().filter_traces(self.filters)
+        for stat in after.compare_to(self.snapshot, 'lineno'):
+            if stat.size_diff > 0:
+                frame = stat.traceback[0]
+                site = self.sites.setdefault((phase, f"{frame.filename}:{frame.lineno}"), [0, 0])
+                site[0] += stat.size_diff
+                site[1] += stat.count_diff
+        self.snapshot = None
+
+    def end_frame(self):
+        """Close the frame's last phase, flag it if it went over budget, and start the next frame."""
+        self.phase(None)
+        phases, self.phases = self.phases, {}
+        peak_bytes = sum(peak for _, peak, _ in phases.values())
+        self.frames.append((peak_bytes, self.gc_monitor.take_frame_pause(), phases))
+        if peak_bytes > self.budget:
+            self.flagged += 1
+            self.worst.append((peak_bytes, self.frame_count, phases))
+            self.worst = sorted(self.worst, key=lambda entry: entry[0], reverse=True)[:5]
+        self.frame_count += 1
+
+    def overlay(self):
+        """One-line summary of recent frames for the FPS overlay."""
+        if not self.frames:
+            return "Alloc: no frames yet"
+        peaks = [frame[0] for frame in self.frames]
+        over = sum(peak > self.budget for peak in peaks)
+        gc_pauses = [frame[1] for frame in self.frames if frame[1]]
+        return (f"Alloc: p50 {percentile(peaks, 50) / 1024:.1f} KiB/frame  over budget {over}/{len(peaks)}  "
+                f"GC max {max(gc_pauses, default=0):.2f} ms ({self.gc_monitor.policy})")
+
+    def report(self):
+        """Per-phase allocation statistics, flagged frames and top allocation sites."""
+        lines = [f"Allocations over the last {len(self.frames)} frames "
+                 f"(budget {self.budget / 1024:g} KiB peak per frame):"]
+        names = []
+        for _, _, phases in self.frames:
+            names.extend(name for name in phases if name not in names)
+        for name in names:
+            peaks = [phases[name][1] for _, _, phases in self.frames if name in phases]
+            blocks = [phases[name][2] for _, _, phases in self.frames if name in phases]
+            lines.append(f"  {name:>10}: peak p50 {percentile(peaks, 50) / 1024:7.1f}  "
+                         f"p95 {percentile(peaks, 95) / 1024:7.1f} KiB, "
+                         f"net blocks p50 {percentile(blocks, 50):+d}  p95 {percentile(blocks, 95):+d}")
+        lines.append(f"  {self.flagged} of {self.frame_count} frames over budget")
+        for peak_bytes, frame, phases in self.worst:
+            detail = ", ".join(f"{name} {peak / 1024:.1f}" for name, (_, peak, _) in phases.items())
+            lines.append(f"    frame {frame}: {peak_bytes / 1024:.1f} KiB ({detail})")
+        if self.sites:
+            lines.append("Top allocation sites surviving their phase (sampled frames):")
+            top = sorted(self.sites.items(), key=lambda item: item[1][0], reverse=True)[:TOP_SITES]
+            for (phase, site), (size, count) in top:
+                lines.append(f"  {phase:>10} {size / 1024:8.1f} KiB {count:6d} blocks  {site}")
+        return "\n".join(lines)
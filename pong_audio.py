@@ -0,0 +1,85 @@
+"""Sound voice manager for the game.
+
+Each sound category gets its own reserved mixer channels, so a burst of
+bounces can never take the channel a score sound needs.  A trigger that
+repeats the same category within its coalescing window is merged into the
+sound already playing.  When all of a category's channels are busy, a
+higher-priority sound takes over the channel of the lowest-priority sound
+playing; anything else is dropped.  Trigger, merge, steal and drop counts
+are kept for the last frame and for the whole session.
+"""
+import time
+
+import pygame
+
+# Category: (priority, reserved channels, coalescing window in ms)
+SOUND_CATEGORIES = {
+    'win': (3, 1, 250),
+    'score': (2, 1, 100),
+    'powerup': (1, 1, 50),
+    'hit': (1, 2, 30),
+    'bounce': (0, 2, 30),
+}
+COUNTERS = ('triggers', 'coalesced', 'stolen', 'dropped')
+
+
+class VoiceManager:
+    """Plays sounds on per-category channel pools with coalescing and priorities."""
+
+    def __init__(self, sounds, categories=SOUND_CATEGORIES):
+        self.sounds = sounds
+        self.categories = categories
+        reserved = sum(channels for _, channels, _ in categories.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved))
+        pygame.mixer.set_reserved(reserved)  # Sound.play() elsewhere can't take these
+        self.pools = {}
+        index = 0
+        for name, (_, channels, _) in categories.items():
+            self.pools[name] = [pygame.mixer.Channel(i) for i in range(index, index + channels)]
+            index += channels
+        self.channel_priority = {}  # Channel -> priority of the sound last started on it
+        self.last_played_ns = dict.fromkeys(categories, 0)
+        self.frame = dict.fromkeys(COUNTERS, 0)
+        self.last_frame = dict(self.frame)
+        self.totals = {name: dict.fromkeys(COUNTERS, 0) for name in categories}
+
+    def _count(self, name, counter):
+        self.frame[counter] += 1
+        self.totals[name][counter] += 1
+
+    def play(self, name):
+        """Trigger a sound; returns the channel it plays on, or None if merged or dropped."""
+        self._count(name, 'triggers')
+        priority, _, window_ms = self.categories[name]
+        now = time.perf_counter_ns()
+        if now - self.last_played_ns[name] < window_ms * 1_000_000:
+            self._count(name, 'coalesced')
+            return None
+
+        channel = next((channel for channel in self.pools[name] if not channel.get_busy()), None)
+        if channel is None:
+            # Take over the lowest-priority voice that is still playing, if it matters less
+            busy = [channel for pool in self.pools.values() for channel in pool if channel.get_busy()]
+            victim = min(busy, key=lambda channel: self.channel_priority.get(channel, 0), default=None)
+            if victim is None or self.channel_priority.get(victim, 0) >= priority:
+                self._count(name, 'dropped')
+                return None
+            self._count(name, 'stolen')
+            channel = victim
+        channel.play(self.sounds[name])
+        self.channel_priority[channel] = priority
+        self.last_played_ns[name] = now
+        return channel
+
+    def end_frame(self):
+        """Keep this frame's counts for the overlay and start counting the next frame."""
+        self.last_frame = self.frame
+        self.frame = dict.fromkeys(COUNTERS, 0)
+
+    def report(self):
+        """One-line summary: last frame's counts and the session totals."""
+        totals = {counter: sum(counts[counter] for counts in self.totals.values()) for counter in COUNTERS}
+        frame = self.last_frame
+        return (f"Sound: {frame['triggers']} trig {frame['coalesced']} merged {frame['dropped']} dropped  "
+                f"(total {totals['triggers']}/{totals['coalesced']}/{totals['stolen']}/{totals['dropped']} "
+                f"trig/merged/stolen/dropped)")
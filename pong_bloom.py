@@ -0,0 +1,91 @@
+"""Single-pass bloom post-process for the neon look.
+
+Instead of giving every paddle, ball, power-up and score digit its own
+translucent glow surface, the composed frame is processed once:
+
+    1. smoothscale the frame down by `factor` into a small buffer
+    2. keep only what is brighter than `threshold` (and rescale it)
+    3. blur the small buffer
+    4. smoothscale it back up and add it onto the frame
+
+The cost depends only on the canvas size, not on how many objects glow.
+Two blur implementations are available: 'smoothscale' blurs by scaling the
+small buffer down and up again (no NumPy needed); 'numpy' runs a separable
+box blur (two passes, close to a Gaussian) on a surfarray view and applies
+a proper gain after the threshold.
+"""
+import time
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # Only the 'numpy' method needs it
+    np = None
+
+BLOOM_METHODS = ('smoothscale', 'numpy')
+
+
+def box_blur(values, radius, axis):
+    """Box-blur an array along one axis by summing shifted slices; edges are treated as black."""
+    blurred = np.zeros_like(values)
+    length = values.shape[axis]
+    for shift in range(-radius, radius + 1):
+        source = [slice(None)] * values.ndim
+        target = [slice(None)] * values.ndim
+        source[axis] = slice(max(shift, 0), length + min(shift, 0))
+        target[axis] = slice(max(-shift, 0), length - max(shift, 0))
+        blurred[tuple(target)] += values[tuple(source)]
+    blurred *= 1 / (2 * radius + 1)
+    return blurred
+
+
+class Bloom:
+    """Adds a blurred copy of the frame's bright parts back onto the frame."""
+
+    def __init__(self, size, method='smoothscale', factor=4, threshold=110, radius=3, strength=1.5):
+        if method == 'numpy' and np is None:
+            raise ImportError("the numpy bloom method needs NumPy")
+        self.method = method
+        self.size = size
+        self.threshold = threshold
+        self.radius = radius
+        self.strength = strength
+        self.small_size = (size[0] // factor, size[1] // factor)
+        self.small = pygame.Surface(self.small_size).convert()
+        self.copy = pygame.Surface(self.small_size).convert()
+        self.tiny = pygame.Surface((self.small_size[0] // 4, self.small_size[1] // 4)).convert()
+        self.full = pygame.Surface(size).convert()
+        self.last_ms = 0.0
+
+    def apply(self, surface):
+        """Bloom the frame in place."""
+        start = time.perf_counter()
+        pygame.transform.smoothscale(surface, self.small_size, self.small)
+        # Saturating subtract: only the part above the threshold is left
+        self.small.fill((self.threshold,) * 3, special_flags=pygame.BLEND_RGB_SUB)
+        if self.method == 'numpy':
+            self._blur_numpy()
+        else:
+            self._blur_smoothscale()
+        pygame.transform.smoothscale(self.small, self.size, self.full)
+        surface.blit(self.full, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+        self.last_ms = (time.perf_counter() - start) * 1000
+
+    def _blur_smoothscale(self):
+        """Blur by scaling down and up again, then mix the sharp and wide versions."""
+        self.copy.blit(self.small, (0, 0))
+        pygame.transform.smoothscale(self.small, self.tiny.get_size(), self.tiny)
+        pygame.transform.smoothscale(self.tiny, self.small_size, self.small)
+        self.small.blit(self.copy, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+
+    def _blur_numpy(self):
+        """Two separable box-blur passes with the gain applied on the way back to 8 bits."""
+        view = pygame.surfarray.pixels3d(self.small)
+        values = view.astype(np.float32)
+        for _ in range(2):
+            values = box_blur(box_blur(values, self.radius, 0), self.radius, 1)
+        gain = self.strength * 255 / (255 - self.threshold)
+        np.minimum(values * gain, 255, out=values)
+        view[...] = values
+        del view  # Release the surface lock
@@ -0,0 +1,176 @@
+"""Background-threaded gameplay capture.
+
+The game loop only copies the raw pixels of the canvas (a single memcpy of
+the 800x600 surface) and offers them to a bounded queue; when the queue is
+full the frame is dropped and counted instead of blocking the loop.  Worker
+threads do the rest:
+
+    png   encode every captured frame to a numbered PNG file
+    pipe  convert to RGB24 and pipe raw frames into a local encoder such as
+          ffmpeg (one writer, to keep the frames in order)
+    ring  keep the last N seconds as compressed PNG image data in memory;
+          save_ring() writes them out as a PNG sequence
+
+PNG data is compressed with zlib, which releases the GIL, so encoding runs
+in parallel with the game.  Capturing every Nth frame (every > 1) lowers the
+encoding load and the ring buffer's memory.
+"""
+import os
+import queue
+import shlex
+import struct
+import subprocess
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+CAPTURE_MODES = ('png', 'pipe', 'ring')
+WORKER_NICENESS = 10
+DEFAULT_ENCODER = ("ffmpeg -loglevel error -y -f rawvideo -pix_fmt rgb24 -s {width}x{height} -r {fps} -i - "
+                   "-c:v libx264 -preset ultrafast -pix_fmt yuv420p {out}")
+
+
+def png_chunk(kind, data):
+    """Return one PNG chunk with its length and CRC."""
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def write_png(path, image_data, width, height):
+    """Write an 8-bit RGB PNG from already compressed, filtered scanlines."""
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header) + png_chunk(b'IDAT', image_data)
+                + png_chunk(b'IEND', b''))
+
+
+class FrameCapture:
+    """Copies frames on the game thread and encodes them on a worker pool."""
+
+    def __init__(self, surface, mode='png', out=None, every=1, workers=2, queue_size=8, fps=60,
+                 ring_seconds=30, encoder=DEFAULT_ENCODER, level=1):
+        self.mode = mode
+        self.every = max(1, every)
+        self.level = level
+        self.width, self.height = surface.get_size()
+        self.pitch = surface.get_pitch()
+        # Byte offset of R, G and B within a pixel of the 32-bit canvas
+        self.channels = [shift // 8 if sys.byteorder == 'little' else 3 - shift // 8
+                         for shift in surface.get_shifts()[:3]]
+        self.queue = queue.Queue(queue_size)
+        self.lock = threading.Lock()
+        self.frames_seen = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.savers = []
+        self.encoder = None
+        self.ring = None
+
+        if mode == 'pipe':
+            self.out = out or 'capture.mp4'
+            command = encoder.format(width=self.width, height=self.height, fps=fps / self.every, out=self.out)
+            self.encoder = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE)
+            workers = 1  # Frames must reach the encoder in order
+        else:
+            self.out = out or 'capture'
+            os.makedirs(self.out, exist_ok=True)
+            if mode == 'ring':
+                self.ring = [None] * max(1, round(ring_seconds * fps / self.every))
+        self.workers = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def capture(self, surface):
+        """Queue a copy of this frame for the workers; drops it instead of waiting if they are behind."""
+        self.frames_seen += 1
+        if (self.frames_seen - 1) % self.every:
+            return
+        # PNG files are numbered by frame, so gaps show the drops; the ring counts only queued
+        # frames, so a dropped frame can't leave a slot holding one from a full ring length earlier
+        index = self.captured if self.ring is not None else self.captured + self.dropped
+        try:
+            self.queue.put_nowait((index, surface.get_buffer().raw))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.captured += 1
+
+    def _rgb(self, raw):
+        """Return the frame as a (height, width, 3) RGB array."""
+        pixels = np.frombuffer(raw, np.uint8).reshape(self.height, self.pitch)[:, :self.width * 4]
+        return pixels.reshape(self.height, self.width, 4)[..., self.channels]
+
+    def _scanlines(self, raw):
+        """Return the frame as PNG scanlines, each prefixed with filter type 0."""
+        lines = np.zeros((self.height, 1 + self.width * 3), np.uint8)
+        rgb = self._rgb(raw)  # Gather into a contiguous array first; a fancy-indexed assignment is much slower
+        lines[:, 1:] = rgb.reshape(self.height, self.width * 3)
+        return lines.tobytes()
+
+    def _work(self):
+        if hasattr(os, 'setpriority') and hasattr(threading, 'get_native_id'):
+            try:
+                # Linux schedules threads individually: let the game thread win when cores are scarce
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), WORKER_NICENESS)
+            except OSError:
+                pass
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            index, raw = item
+            if self.mode == 'pipe':
+                try:
+                    self.encoder.stdin.write(self._rgb(raw).tobytes())
+                except (BrokenPipeError, ValueError):
+                    continue  # Encoder exited; keep draining so the game never blocks
+            else:
+                image_data = zlib.compress(self._scanlines(raw), self.level)
+                if self.ring is not None:
+                    self.ring[index % len(self.ring)] = (index, image_data)
+                else:
+                    write_png(os.path.join(self.out, f"frame_{index:06d}.png"), image_data,
+                              self.width, self.height)
+            with self.lock:
+                self.written += 1
+
+    def save_ring(self):
+        """Write the ring buffer's frames as a PNG sequence in the background; returns the directory."""
+        frames = sorted(frame for frame in self.ring if frame is not None)
+        directory = os.path.join(self.out, time.strftime("ring-%Y%m%d-%H%M%S"))
+        saver = threading.Thread(target=self._write_frames, args=(directory, frames), daemon=True)
+        saver.start()
+        self.savers.append(saver)
+        return directory
+
+    def _write_frames(self, directory, frames):
+        os.makedirs(directory, exist_ok=True)
+        for number, (_, image_data) in enumerate(frames):
+            write_png(os.path.join(directory, f"frame_{number:06d}.png"), image_data, self.width, self.height)
+
+    def memory_bytes(self):
+        """Return the compressed size of the frames held in the ring buffer."""
+        return sum(len(frame[1]) for frame in self.ring if frame is not None) if self.ring else 0
+
+    def report(self):
+        """One-line summary for the FPS overlay."""
+        line = (f"Capture: {self.mode}  {self.written}/{self.captured} written  {self.dropped} dropped  "
+                f"queue {self.queue.qsize()}/{self.queue.maxsize}")
+        if self.ring is not None:
+            line += f"  ring {self.memory_bytes() / 2**20:.1f} MiB"
+        return line
+
+    def close(self):
+        """Finish the queued frames, close the encoder and wait for ring saves."""
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        if self.encoder is not None:
+            self.encoder.stdin.close()
+            self.encoder.wait()
+        for saver in self.savers:
+            saver.join()
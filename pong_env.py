@@ -0,0 +1,145 @@
+"""Gym-style reinforcement-learning environment around the headless Pong rules.
+
+The agent plays the left paddle against the built-in AI at one of the
+DIFFICULTY_SETTINGS levels.  The API follows gymnasium's reset()/step()
+conventions but has no dependency on it.
+
+Run this file directly for a quick throughput benchmark.
+"""
+import random
+import sys
+import time
+
+from pong_sim import (WIDTH, HEIGHT, DIFFICULTY_SETTINGS, POWERUP_DURATION, PongSim)
+
+# Discrete actions: stay, up, down
+ACTIONS = (0, -1, 1)
+
+OBSERVATION_SIZE = 13
+
+
+class PongEnv:
+    """Headless Pong environment returning compact vector observations.
+
+    Observation (all floats, roughly within [-1, 1]):
+        ball x, ball y, ball velocity x, ball velocity y (positions are
+        centres divided by the field size, velocities by MAX_BALL_SPEED),
+        left and right paddle centre y, then the remaining time fraction of
+        each power-up effect: player1 grow/shrink/speed, player2
+        grow/shrink/speed, ball size.
+
+    frame_skip is the number of game ticks each step advances with the
+    chosen action held; rewards are summed over those ticks.
+    repeat_action_probability is the chance, checked every tick, that the
+    previously executed action is repeated instead (ALE-style sticky actions).
+    """
+
+    def __init__(self, difficulty='Medium', frame_skip=1, repeat_action_probability=0.0,
+                 max_episode_steps=None, powerups=True, seed=None, visual=False):
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be at least 1")
+        if not 0.0 <= repeat_action_probability < 1.0:
+            raise ValueError("repeat_action_probability must be in [0, 1)")
+        self.difficulty = difficulty
+        self.frame_skip = frame_skip
+        self.repeat_action_probability = repeat_action_probability
+        self.max_episode_steps = max_episode_steps
+        self.action_count = len(ACTIONS)
+        self.observation_size = OBSERVATION_SIZE
+        self.sim = PongSim(difficulty, powerups=powerups, visual=visual)
+        self._action_rng = random.Random()
+        self._max_speed = DIFFICULTY_SETTINGS[difficulty]['MAX_BALL_SPEED']
+        self._last_action = 0
+        self._steps = 0
+        if seed is not None:
+            self.seed(seed)
+
+    def seed(self, seed):
+        """Seed the game and the sticky-action generator for reproducible episodes."""
+        self.sim.seed(seed)
+        self._action_rng.seed(seed + 1 if isinstance(seed, int) else repr(seed) + ':actions')
+
+    def reset(self, seed=None):
+        """Start a new episode and return (observation, info)."""
+        if seed is not None:
+            self.seed(seed)
+        self.sim.reset()
+        self._last_action = 0
+        self._steps = 0
+        return self.observe(), self.info()
+
+    def step(self, action):
+        """Apply an action index and return (obs, reward, terminated, truncated, info)."""
+        sim = self.sim
+        chosen = ACTIONS[action]
+        sticky = self.repeat_action_probability
+        reward = 0
+        for _ in range(self.frame_skip):
+            # A repeat lasts one tick; the next tick goes back to the chosen action
+            move = chosen
+            if sticky and self._action_rng.random() < sticky:
+                move = self._last_action
+            self._last_action = move
+            scorer = sim.tick(move, None)
+            if scorer == 1:
+                reward += 1
+            elif scorer == 2:
+                reward -= 1
+            if sim.game_over:
+                break
+        self._steps += 1
+        truncated = (self.max_episode_steps is not None and self._steps >= self.max_episode_steps
+                     and not sim.game_over)
+        return self.observe(), reward, sim.game_over, truncated, self.info()
+
+    def observe(self):
+        """Return the current observation vector."""
+        sim = self.sim
+        half_ball = sim.ball_size / 2
+        max_speed = self._max_speed
+        p1 = sim.powerup_effects['player1']
+        p2 = sim.powerup_effects['player2']
+        return [
+            (sim.ball_x + half_ball) / WIDTH,
+            (sim.ball_y + half_ball) / HEIGHT,
+            sim.ball_speed_x / max_speed,
+            sim.ball_speed_y / max_speed,
+            (sim.paddle_y[0] + sim.paddle_h[0] / 2) / HEIGHT,
+            (sim.paddle_y[1] + sim.paddle_h[1] / 2) / HEIGHT,
+            p1['paddle_grow'] / POWERUP_DURATION,
+            p1['paddle_shrink'] / POWERUP_DURATION,
+            p1['speed_boost'] / POWERUP_DURATION,
+            p2['paddle_grow'] / POWERUP_DURATION,
+            p2['paddle_shrink'] / POWERUP_DURATION,
+            p2['speed_boost'] / POWERUP_DURATION,
+            sim.powerup_effects['ball']['size'] / POWERUP_DURATION,
+        ]
+
+    def info(self):
+        """Return auxiliary episode information."""
+        sim = self.sim
+        return {
+            'score': (sim.player1_score, sim.player2_score),
+            'ball_speed': sim.current_ball_speed,
+            'ticks': sim.ticks,
+        }
+
+
+def benchmark(steps=200000, difficulty='Medium', frame_skip=1):
+    """Run random actions for a number of steps and return env steps per second."""
+    env = PongEnv(difficulty, frame_skip=frame_skip, seed=0)
+    env.reset()
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, terminated, truncated, _ = env.step(rng.randrange(env.action_count))
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    frame_skip = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    for level in DIFFICULTY_SETTINGS:
+        print(f"{level}: {benchmark(difficulty=level, frame_skip=frame_skip):,.0f} env steps/sec "
+              f"(frame_skip={frame_skip})")
@@ -0,0 +1,106 @@
+"""Low-latency input handling for the game loop.
+
+Events are drained from SDL into a buffer with a perf_counter_ns timestamp.
+The game reads discrete commands (pause, menu, ...) from the buffer at the
+top of the frame, but samples the keyboard and mouse state for the paddles
+with latch(), as late as possible before the paddle update.
+
+With measurement enabled, the time from each paddle input event being
+drained to the present() of the first frame that used it is recorded.
+SDL events carry no timestamp in pygame, so time spent in SDL's queue before
+the drain is not included; draining often keeps that share small.
+"""
+import time
+from collections import deque
+
+import pygame
+
+PADDLE_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEMOTION)
+
+
+class InputBuffer:
+    """Timestamped event buffer with late-latched keyboard and mouse state."""
+
+    def __init__(self, measure=False, history=2000):
+        self.events = deque()
+        self.measure = measure
+        self.keys = pygame.key.get_pressed()
+        self.mouse_pos = pygame.mouse.get_pos()
+        self.latched = False
+        self.unlatched = []  # Drain times of paddle input not yet used by a frame
+        self.applied = []  # Drain times of paddle input used by the frame being built
+        self.latencies_ms = deque(maxlen=history)
+
+    def pump(self):
+        """Drain SDL's queue into the buffer, timestamping each event."""
+        now = time.perf_counter_ns()
+        for event in pygame.event.get():
+            self.events.append((now, event))
+            if self.measure and event.type in PADDLE_EVENTS:
+                self.unlatched.append(now)
+
+    def wait(self, timeout_ms=None):
+        """Block until SDL has an event or timeout_ms passes, then drain the queue into the buffer.
+
+        A timeout of 0 or less only drains the queue (pygame.event.wait(0) would block with no timeout).
+        """
+        if timeout_ms is not None and timeout_ms <= 0:
+            self.pump()
+            return
+        event = pygame.event.wait() if timeout_ms is None else pygame.event.wait(timeout_ms)
+        if event.type != pygame.NOEVENT:
+            now = time.perf_counter_ns()
+            self.events.append((now, event))
+            if self.measure and event.type in PADDLE_EVENTS:
+                self.unlatched.append(now)
+        self.pump()
+
+    def get(self):
+        """Return and clear the buffered events, oldest first, like pygame.event.get()."""
+        self.pump()
+        events = [event for _, event in self.events]
+        self.events.clear()
+        return events
+
+    def latch(self):
+        """Drain once more and capture the newest keyboard and mouse state.
+
+        Returns (keys, mouse_pos) as pygame.key.get_pressed() and
+        pygame.mouse.get_pos() would.  Events drained here stay buffered for
+        the next get().
+        """
+        self.pump()
+        self.keys = pygame.key.get_pressed()
+        self.mouse_pos = pygame.mouse.get_pos()
+        self.latched = True
+        if self.measure:
+            self.applied.extend(self.unlatched)
+            self.unlatched.clear()
+        return self.keys, self.mouse_pos
+
+    def presented(self):
+        """Record input-to-present latency for the input used by the frame just shown."""
+        if self.measure:
+            if self.applied:
+                now = time.perf_counter_ns()
+                self.latencies_ms.extend((now - t) / 1e6 for t in self.applied)
+                self.applied.clear()
+            if not self.latched:
+                self.unlatched.clear()  # Paused or in a menu: the input never reached a paddle
+        self.latched = False
+
+    def latency_percentiles(self, percentiles=(50, 95, 99)):
+        """Return {percentile: milliseconds} over the recorded latencies, or {} if none."""
+        if not self.latencies_ms:
+            return {}
+        ordered = sorted(self.latencies_ms)
+        last = len(ordered) - 1
+        return {p: ordered[round(p / 100 * last)] for p in percentiles}
+
+    def latency_report(self):
+        """One-line summary of the recorded latencies."""
+        stats = self.latency_percentiles()
+        if not stats:
+            return "Input latency: no samples"
+        return ("Input latency " + "  ".join(f"p{p} {ms:.1f}" for p, ms in stats.items())
+                + f" ms ({len(self.latencies_ms)} events)")
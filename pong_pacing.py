@@ -0,0 +1,240 @@
+"""Frame pacing for the game loop.
+
+FramePacer ends every frame by waiting for the next frame deadline, timed
+with time.perf_counter_ns, using one of these strategies:
+
+    sleep   time.sleep() until the deadline; cheapest, but wakes up late by
+            the OS timer granularity (anywhere from ~0.1 to 15 ms)
+    hybrid  sleep until shortly before the deadline, then spin; the spin
+            margin follows how late recent sleeps woke up
+    busy    pygame.time.Clock.tick_busy_loop(); spins for most of the frame
+            and is accurate to SDL's 1 ms tick
+    vsync   no waiting here: display.flip() blocks until the vertical blank
+            (needs a display created with vsync)
+
+For each strategy the pacer keeps the frame-interval jitter (how far each
+interval is from the target period) and the process CPU time per second of
+wall time.  In 'auto' mode every candidate is tried for a short window and
+the one that meets the target jitter with the lowest CPU usage is kept.
+CPU time is for the whole process, so SDL's audio thread is included; it is
+the same for every strategy and only shifts the numbers.
+
+PowerMonitor accounts CPU time per power state (playing, paused, ...), to
+show what idling in the static states saves.
+"""
+import time
+from collections import deque
+
+import pygame
+
+STRATEGIES = ('sleep', 'hybrid', 'busy', 'vsync')
+WARMUP_FRAMES = 10  # Frames ignored after switching strategy
+MIN_SPIN_NS = 300_000
+MAX_SPIN_NS = 4_000_000
+
+
+class PacingStats:
+    """Frame intervals and CPU time over a sliding window of frames."""
+
+    def __init__(self, period_ns, window):
+        self.period_ns = period_ns
+        self.intervals = deque(maxlen=window)
+        self.cpu = deque(maxlen=window)
+
+    def add(self, interval_ns, cpu_ns):
+        self.intervals.append(interval_ns)
+        self.cpu.append(cpu_ns)
+
+    def clear(self):
+        self.intervals.clear()
+        self.cpu.clear()
+
+    def jitter_ms(self, percentile=95):
+        """Return the percentile of |interval - period| in milliseconds."""
+        if not self.intervals:
+            return 0.0
+        deviations = sorted(abs(interval - self.period_ns) for interval in self.intervals)
+        return deviations[round(percentile / 100 * (len(deviations) - 1))] / 1e6
+
+    def cpu_share(self):
+        """Return the process CPU time per second of wall time (1.0 = one core)."""
+        wall = sum(self.intervals)
+        return sum(self.cpu) / wall if wall else 0.0
+
+    def fps(self):
+        wall = sum(self.intervals)
+        return len(self.intervals) * 1e9 / wall if wall else 0.0
+
+
+class FramePacer:
+    """Waits out each frame with the selected strategy and measures the result."""
+
+    def __init__(self, fps, strategy='auto', target_jitter_ms=1.0, vsync=False, window=120,
+                 trial_frames=120):
+        self.fps_target = fps
+        self.period_ns = round(1e9 / fps)
+        self.target_jitter_ms = target_jitter_ms
+        self.window = window
+        self.trial_frames = trial_frames
+        # Without a vsync display flip() does not block, so the vsync strategy would run uncapped
+        self.candidates = [name for name in STRATEGIES if vsync or name != 'vsync']
+        self.auto = strategy == 'auto'
+        self.trial = 0 if self.auto else None  # Frames spent on the candidate being tried
+        self.strategy = self.candidates[0] if self.auto else strategy
+        self.stats = {name: PacingStats(self.period_ns, window) for name in STRATEGIES}
+        self.choice = "" if self.auto else "fixed"
+        self.clock = pygame.time.Clock()
+        self.spin_margin_ns = 2_000_000
+        self.oversleeps = deque(maxlen=32)
+        self.last_ns = time.perf_counter_ns()
+        self.last_cpu_ns = time.process_time_ns()
+        self.deadline_ns = self.last_ns + self.period_ns
+        self.delta = 1 / fps
+
+    def tick(self):
+        """Wait for the next frame deadline and return the seconds since the previous tick."""
+        strategy = self.strategy
+        if strategy == 'sleep':
+            self._sleep_until(self.deadline_ns)
+        elif strategy == 'hybrid':
+            self._sleep_until(self.deadline_ns - self.spin_margin_ns)
+            while time.perf_counter_ns() < self.deadline_ns:
+                pass
+        elif strategy == 'busy':
+            self.clock.tick_busy_loop(self.fps_target)
+
+        now = time.perf_counter_ns()
+        cpu = time.process_time_ns()
+        interval = now - self.last_ns
+        self.stats[strategy].add(interval, cpu - self.last_cpu_ns)
+        self.last_ns = now
+        self.last_cpu_ns = cpu
+        self.delta = interval / 1e9
+
+        # Fixed deadlines keep the average rate exact; after a stall of more than a
+        # frame, start again from now rather than rushing frames to catch up
+        self.deadline_ns += self.period_ns
+        if now >= self.deadline_ns or strategy in ('busy', 'vsync'):
+            self.deadline_ns = now + self.period_ns
+
+        if self.trial is not None:
+            self._advance_trial()
+        elif strategy == 'vsync':
+            self._check_vsync()
+        return self.delta
+
+    def resync(self):
+        """Restart frame timing after an idle wait, which is left out of the statistics."""
+        now = time.perf_counter_ns()
+        self.delta = (now - self.last_ns) / 1e9
+        self.last_ns = now
+        self.last_cpu_ns = time.process_time_ns()
+        self.deadline_ns = now + self.period_ns
+        self.clock.tick()
+        return self.delta
+
+    def _sleep_until(self, wake_ns):
+        """Sleep until wake_ns and record how late the OS woke us up."""
+        remaining = wake_ns - time.perf_counter_ns()
+        if remaining <= 0:
+            return
+        time.sleep(remaining / 1e9)
+        self.oversleeps.append(max(0, time.perf_counter_ns() - wake_ns))
+        margin = max(self.oversleeps) + MIN_SPIN_NS
+        self.spin_margin_ns = min(margin, MAX_SPIN_NS, self.period_ns // 2)
+
+    def switch(self, strategy):
+        """Change strategy; its statistics restart after a few warm-up frames."""
+        self.strategy = strategy
+        self.deadline_ns = time.perf_counter_ns() + self.period_ns
+        self.clock.tick()  # Restart tick_busy_loop's reference point
+
+    def _advance_trial(self):
+        """Move through the candidates in auto mode, then keep the best one."""
+        self.trial += 1
+        if self.trial == WARMUP_FRAMES:
+            self.stats[self.strategy].clear()
+        elif self.trial >= WARMUP_FRAMES + self.trial_frames:
+            index = self.candidates.index(self.strategy) + 1
+            if index < len(self.candidates):
+                self.trial = 0
+                self.switch(self.candidates[index])
+            else:
+                self.trial = None
+                self.switch(self._choose())
+
+    def _choose(self):
+        """Return the cheapest candidate that met the target jitter, or the steadiest one."""
+        results = {name: (self.stats[name].jitter_ms(), self.stats[name].cpu_share())
+                   for name in self.candidates}
+        meeting = [name for name in self.candidates if results[name][0] <= self.target_jitter_ms]
+        if meeting:
+            best = min(meeting, key=lambda name: results[name][1])
+            self.choice = f"auto: met {self.target_jitter_ms:g} ms"
+        else:
+            best = min(self.candidates, key=lambda name: results[name][0])
+            self.choice = f"auto: none met {self.target_jitter_ms:g} ms, steadiest"
+        return best
+
+    def _check_vsync(self):
+        """Fall back to hybrid if flip() turns out not to wait for the vertical blank."""
+        stats = self.stats['vsync']
+        if len(stats.intervals) == self.window and stats.fps() > 1.5 * self.fps_target:
+            self.choice = "vsync not blocking, fell back"
+            self.switch('hybrid')
+
+    def fps(self):
+        return self.stats[self.strategy].fps()
+
+    def report(self):
+        """One-line summary of the active strategy's jitter and CPU usage."""
+        stats = self.stats[self.strategy]
+        if self.trial is not None:
+            state = f"trying {self.candidates.index(self.strategy) + 1}/{len(self.candidates)}"
+        else:
+            state = self.choice
+        return (f"Pacing: {self.strategy} ({state})  jitter p95 {stats.jitter_ms():.2f} ms  "
+                f"CPU {stats.cpu_share():.0%}")
+
+    def summary(self):
+        """Per-strategy jitter and CPU usage for every strategy that has measurements."""
+        lines = []
+        for name in STRATEGIES:
+            stats = self.stats[name]
+            if stats.intervals:
+                lines.append(f"{name:>6}: jitter p50 {stats.jitter_ms(50):.2f} / p95 {stats.jitter_ms(95):.2f} / "
+                             f"p99 {stats.jitter_ms(99):.2f} ms, CPU {stats.cpu_share():.0%}, "
+                             f"{stats.fps():.1f} fps")
+        return "\n".join(lines)
+
+
+class PowerMonitor:
+    """CPU time per second of wall time, accumulated separately for each power state."""
+
+    def __init__(self):
+        self.wall_ns = {}
+        self.cpu_ns = {}
+        self.state = None
+        self.mark_ns = time.perf_counter_ns()
+        self.mark_cpu_ns = time.process_time_ns()
+
+    def enter(self, state):
+        """Charge the time since the previous call to the previous state and switch to state."""
+        now = time.perf_counter_ns()
+        cpu = time.process_time_ns()
+        if self.state is not None:
+            self.wall_ns[self.state] = self.wall_ns.get(self.state, 0) + now - self.mark_ns
+            self.cpu_ns[self.state] = self.cpu_ns.get(self.state, 0) + cpu - self.mark_cpu_ns
+        self.state = state
+        self.mark_ns = now
+        self.mark_cpu_ns = cpu
+
+    def cpu_share(self, state):
+        wall = self.wall_ns.get(state, 0)
+        return self.cpu_ns.get(state, 0) / wall if wall else 0.0
+
+    def report(self):
+        """One line per state: wall time spent in it and its CPU usage."""
+        self.enter(self.state)
+        return "\n".join(f"{state:>10}: {self.wall_ns[state] / 1e9:7.1f} s, CPU {self.cpu_share(state):.1%}"
+                         for state in self.wall_ns)
@@ -0,0 +1,333 @@
+"""Pixel observations for vision-based agents.
+
+PongRenderer draws a PongSim the way draw_objects in pong.py draws the game,
+onto an offscreen Surface.  Frames are grayscaled and downsampled straight
+from a pygame.surfarray.pixels3d view into a caller-supplied uint8 array, so
+no intermediate copy of the full frame is made.
+
+PixelVecEnv runs many environments across worker processes.  Each worker
+has its own headless renderer under the dummy SDL driver and writes its
+observations directly into a shared-memory batch that the trainer reads.
+"""
+import math
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pong_sim import WIDTH, HEIGHT, PADDLE_WIDTH, BALL_SIZE, POWERUP_SIZE, TRAIL_LENGTH
+from pong_env import PongEnv
+
+# Colors (same palette as pong.py)
+BLACK = (0, 0, 0)
+NEON_GREEN = (57, 255, 20)
+NEON_BLUE = (30, 144, 255)
+NEON_PINK = (255, 20, 147)
+NEON_PURPLE = (138, 43, 226)
+NEON_RED = (255, 0, 60)
+NEON_YELLOW = (255, 255, 0)
+
+# Integer luma weights (ITU-R BT.601, scaled to sum to 256)
+GRAY_WEIGHTS = (77, 150, 29)
+
+
+def use_dummy_video():
+    """Select the dummy SDL drivers; must run before pygame is initialised."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+class PongRenderer:
+    """Draws PongSim state onto an offscreen Surface.
+
+    Background stars and the HUD text lines are left out: they carry no game
+    state.  The gradient background is drawn once and cached.
+    """
+
+    def __init__(self):
+        import pygame
+        pygame.font.init()
+        self.pygame = pygame
+        self.surface = pygame.Surface((WIDTH, HEIGHT), 0, 32)
+        self.font = pygame.font.Font(None, 74)
+        self.background = pygame.Surface((WIDTH, HEIGHT), 0, 32)
+        for y in range(0, HEIGHT, 2):
+            gradient_factor = y / HEIGHT
+            color = (0, int(10 * (1 - gradient_factor)), int(30 * (1 - gradient_factor)))
+            pygame.draw.line(self.background, color, (0, y), (WIDTH, y), 2)
+        for y in range(0, HEIGHT, 20):
+            pygame.draw.rect(self.background, NEON_PURPLE, (WIDTH // 2 - 1, y, 2, 10))
+        self._score_cache = {}
+
+    def draw(self, sim):
+        """Render the current frame of a simulation and return the surface."""
+        pygame = self.pygame
+        screen = self.surface
+        screen.blit(self.background, (0, 0))
+
+        for powerup in sim.active_powerups:
+            cx, cy = powerup['x'] + POWERUP_SIZE // 2, powerup['y'] + POWERUP_SIZE // 2
+            pulse_factor = (math.sin(powerup['pulse']) + 1) / 2
+            glow_size = int(POWERUP_SIZE * (1 + 0.2 * pulse_factor))
+            glow_surface = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
+            pygame.draw.circle(glow_surface, (*NEON_YELLOW, 100), (glow_size, glow_size), glow_size)
+            screen.blit(glow_surface, (cx - glow_size, cy - glow_size))
+            pygame.draw.circle(screen, NEON_YELLOW, (cx, cy), POWERUP_SIZE // 2)
+
+        for i, (x, y) in enumerate(sim.ball_trail):
+            size = int(BALL_SIZE * (i / TRAIL_LENGTH) * 0.8)
+            if size:
+                trail_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+                pygame.draw.circle(trail_surface, (*NEON_BLUE, int(200 * (i / TRAIL_LENGTH))),
+                                   (size, size), size)
+                screen.blit(trail_surface, (x - size, y - size))
+
+        for anim in sim.hit_animations:
+            radius = int(anim['radius'])
+            anim_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(anim_surface, (*NEON_PINK, int(anim['alpha'])), (radius, radius), radius)
+            screen.blit(anim_surface, (anim['x'] - radius, anim['y'] - radius))
+
+        for side, key in ((0, 'player1'), (1, 'player2')):
+            effects = sim.powerup_effects[key]
+            paddle_color = NEON_GREEN
+            if effects['paddle_grow'] > 0:
+                paddle_color = NEON_BLUE
+            elif effects['paddle_shrink'] > 0:
+                paddle_color = NEON_RED
+            elif effects['speed_boost'] > 0:
+                paddle_color = NEON_YELLOW
+            paddle = pygame.Rect(sim.paddle_x[side], sim.paddle_y[side], PADDLE_WIDTH, sim.paddle_h[side])
+            glow_surface = pygame.Surface((paddle.width + 10, paddle.height + 10), pygame.SRCALPHA)
+            pygame.draw.rect(glow_surface, (*paddle_color, 100),
+                             pygame.Rect(5, 5, paddle.width, paddle.height), border_radius=3)
+            screen.blit(glow_surface, (paddle.x - 5, paddle.y - 5))
+            pygame.draw.rect(screen, paddle_color, paddle, border_radius=3)
+
+        ball_color = NEON_PURPLE if sim.powerup_effects['ball']['size'] > 0 else NEON_PINK
+        ball = pygame.Rect(sim.ball_x, sim.ball_y, sim.ball_size, sim.ball_size)
+        glow_surface = pygame.Surface((ball.width * 2 + 10, ball.height * 2 + 10), pygame.SRCALPHA)
+        pygame.draw.circle(glow_surface, (*ball_color, 100), (ball.width + 5, ball.height + 5), ball.width + 5)
+        screen.blit(glow_surface, (ball.x - 5, ball.y - 5))
+        pygame.draw.ellipse(screen, ball_color, ball)
+
+        screen.blit(self._score(sim.player1_score), (WIDTH // 4, 20))
+        screen.blit(self._score(sim.player2_score), (3 * WIDTH // 4, 20))
+        return screen
+
+    def _score(self, value):
+        """Return the rendered score text, rendering each value only once."""
+        text = self._score_cache.get(value)
+        if text is None:
+            text = self._score_cache[value] = self.font.render(str(value), True, NEON_BLUE)
+        return text
+
+
+def grayscale_downsample(surface, out, factor, mode='nearest', scratch=None):
+    """Write a grayscale, downsampled copy of a 32-bit surface into ``out``.
+
+    ``out`` is a uint8 array of shape (height // factor, width // factor).
+    Pixels are read through a surfarray.pixels3d view; ``mode`` is 'nearest'
+    (one sample per block) or 'area' (box filter over each factor x factor
+    block, about ten times slower).  ``scratch`` may be a preallocated uint32 array of shape
+    (2, width // factor, height // factor) so nothing is allocated per call.
+    """
+    import pygame
+    out_h, out_w = out.shape
+    if scratch is None:
+        scratch = np.empty((2, out_w, out_h), dtype=np.uint32)
+    total, term = scratch[0], scratch[1]
+    w, h = out_w * factor, out_h * factor
+    offsets = range(factor) if mode == 'area' else (0,)
+    view = block = pygame.surfarray.pixels3d(surface)  # (width, height, 3), no copy
+    try:
+        total.fill(0)
+        for dx in offsets:
+            for dy in offsets:
+                block = view[dx:w:factor, dy:h:factor]
+                for channel, weight in enumerate(GRAY_WEIGHTS):
+                    np.multiply(block[..., channel], weight, out=term, dtype=np.uint32)
+                    np.add(total, term, out=total)
+    finally:
+        del view, block  # Release the surface lock
+    samples = len(offsets) ** 2
+    if samples > 1:
+        np.floor_divide(total, samples, out=total)
+    # Weights sum to 256; the transposed view writes straight into out's (row, column) layout
+    np.right_shift(total, 8, out=out.T, casting='unsafe')
+    return out
+
+
+def _worker(conn, shm_name, shapes, first_env, env_count, config):
+    """Worker process: steps its slice of environments and renders into shared memory."""
+    use_dummy_video()
+    import pygame
+    pygame.display.init()
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = _batch_views(shm.buf, shapes)
+    obs = arrays['obs'][first_env:first_env + env_count]
+    actions = arrays['actions'][first_env:first_env + env_count]
+    rewards = arrays['rewards'][first_env:first_env + env_count]
+    terminated = arrays['terminated'][first_env:first_env + env_count]
+    truncated = arrays['truncated'][first_env:first_env + env_count]
+
+    factor, mode = config['downsample'], config['mode']
+    renderer = PongRenderer()
+    scratch = np.empty((2,) + obs.shape[2:0:-1], dtype=np.uint32)
+    envs = [PongEnv(config['difficulty'], frame_skip=config['frame_skip'],
+                    max_episode_steps=config['max_episode_steps'], visual=True)
+            for _ in range(env_count)]
+
+    def observe(i):
+        grayscale_downsample(renderer.draw(envs[i].sim), obs[i], factor, mode, scratch)
+
+    try:
+        while True:
+            command, arg = conn.recv()
+            if command == 'step':
+                for i, env in enumerate(envs):
+                    _, reward, term, trunc, _ = env.step(int(actions[i]))
+                    rewards[i] = reward
+                    terminated[i] = term
+                    truncated[i] = trunc
+                    if term or trunc:
+                        env.reset()  # Auto-reset; the returned frame is the new episode's first
+                    observe(i)
+            elif command == 'reset':
+                for i, env in enumerate(envs):
+                    env.reset(seed=None if arg is None else arg + first_env + i)
+                    observe(i)
+            elif command == 'close':
+                break
+            conn.send(True)
+    finally:
+        del obs, actions, rewards, terminated, truncated, arrays
+        shm.close()
+        conn.close()
+
+
+def _batch_layout(num_envs, obs_shape):
+    """Return the (name, dtype, shape) layout of the shared observation batch."""
+    return [
+        ('obs', 'uint8', (num_envs,) + obs_shape),
+        ('actions', 'int64', (num_envs,)),
+        ('rewards', 'float32', (num_envs,)),
+        ('terminated', 'bool', (num_envs,)),
+        ('truncated', 'bool', (num_envs,)),
+    ]
+
+
+def _batch_views(buf, layout):
+    """Create NumPy views for each field of the shared batch."""
+    arrays = {}
+    offset = 0
+    for name, dtype, shape in layout:
+        array = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        arrays[name] = array
+        offset += (array.nbytes + 63) // 64 * 64  # Keep fields cache-line aligned
+    return arrays
+
+
+def _batch_size(layout):
+    """Return the number of bytes needed for the shared batch."""
+    return sum((int(np.prod(shape)) * np.dtype(dtype).itemsize + 63) // 64 * 64
+               for _, dtype, shape in layout)
+
+
+class PixelVecEnv:
+    """Vector of pixel-observation Pong environments spread over worker processes.
+
+    reset() and step() return NumPy arrays that are views into shared memory;
+    they are overwritten by the next call, so copy them if they must be kept.
+    Observations have shape (num_envs, HEIGHT // downsample, WIDTH // downsample).
+    Environments reset automatically when an episode ends.
+    """
+
+    def __init__(self, num_envs, num_workers=None, downsample=4, mode='nearest', difficulty='Medium',
+                 frame_skip=4, max_episode_steps=None):
+        num_workers = min(num_workers or os.cpu_count() or 1, num_envs)
+        self.num_envs = num_envs
+        self.observation_shape = (HEIGHT // downsample, WIDTH // downsample)
+        layout = _batch_layout(num_envs, self.observation_shape)
+        self._shm = shared_memory.SharedMemory(create=True, size=_batch_size(layout))
+        arrays = _batch_views(self._shm.buf, layout)
+        self.observations = arrays['obs']
+        self.actions = arrays['actions']
+        self.rewards = arrays['rewards']
+        self.terminated = arrays['terminated']
+        self.truncated = arrays['truncated']
+
+        config = {'downsample': downsample, 'mode': mode, 'difficulty': difficulty,
+                  'frame_skip': frame_skip, 'max_episode_steps': max_episode_steps}
+        ctx = mp.get_context('spawn')
+        self._pipes = []
+        self._workers = []
+        per_worker, extra = divmod(num_envs, num_workers)
+        first = 0
+        for w in range(num_workers):
+            count = per_worker + (1 if w < extra else 0)
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_worker, daemon=True,
+                                  args=(child, self._shm.name, layout, first, count, config))
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._workers.append(process)
+            first += count
+        self._closed = False
+
+    def _broadcast(self, command, arg=None):
+        for pipe in self._pipes:
+            pipe.send((command, arg))
+        for pipe in self._pipes:
+            pipe.recv()
+
+    def reset(self, seed=None):
+        """Reset every environment; env i is seeded with seed + i when a seed is given."""
+        self._broadcast('reset', seed)
+        return self.observations
+
+    def step(self, actions):
+        """Step every environment and return (obs, rewards, terminated, truncated)."""
+        self.actions[:] = actions
+        self._broadcast('step')
+        return self.observations, self.rewards, self.terminated, self.truncated
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+        for pipe in self._pipes:
+            try:
+                pipe.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._workers:
+            process.join(timeout=5)
+        del self.observations, self.actions, self.rewards, self.terminated, self.truncated
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    import time
+
+    with PixelVecEnv(num_envs=16, downsample=4) as vec_env:
+        vec_env.reset(seed=0)
+        rng = np.random.default_rng(0)
+        steps = 500
+        start = time.perf_counter()
+        for _ in range(steps):
+            vec_env.step(rng.integers(0, 3, vec_env.num_envs))
+        elapsed = time.perf_counter() - start
+        print(f"{steps * vec_env.num_envs / elapsed:,.0f} pixel env steps/sec "
+              f"({vec_env.num_envs} envs, obs {vec_env.observation_shape})")
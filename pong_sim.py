@@ -0,0 +1,406 @@
+"""Headless Pong simulation.
+
+Holds the game rules (field size, difficulty tables, power-ups) and the one
+implementation of them.  pong.py drives a PongSim with its measured frame
+time; training, tournaments and parameter sweeps advance it in fixed ticks.
+Nothing here imports pygame, so it runs without a display.
+"""
+import random
+
+# Field and object sizes
+WIDTH, HEIGHT = 800, 600
+PADDLE_WIDTH, PADDLE_HEIGHT = 15, 100
+BALL_SIZE = 15
+PADDLE_SPEED = 7
+PADDLE_MARGIN = 50  # Distance from the side walls to each paddle
+
+# Ball speed settings for different difficulty levels
+DIFFICULTY_SETTINGS = {
+    'Easy': {
+        'INITIAL_BALL_SPEED': 4,
+        'MAX_BALL_SPEED': 8,
+        'BALL_ACCELERATION': 0.00002,
+        'AI_SPEED': 5
+    },
+    'Medium': {
+        'INITIAL_BALL_SPEED': 5,
+        'MAX_BALL_SPEED': 10,
+        'BALL_ACCELERATION': 0.00002,
+        'AI_SPEED': 6
+    },
+    'Hard': {
+        'INITIAL_BALL_SPEED': 6,
+        'MAX_BALL_SPEED': 12,
+        'BALL_ACCELERATION': 0.00002,
+        'AI_SPEED': 7
+    }
+}
+
+# AI imperfection per difficulty: (mistake_chance, mistake_amount)
+# More randomness on Easy, less on Hard
+AI_MISTAKES = {
+    'Easy': (0.2, 70),
+    'Medium': (0.1, 50),
+    'Hard': (0.05, 30)
+}
+
+FPS = 60
+WINNING_SCORE = 10
+ACCELERATION_DELAY = 3  # Seconds after a serve before the ball starts speeding up
+
+# Power-up settings
+POWERUP_TYPES = ['speed_boost', 'paddle_grow', 'paddle_shrink', 'ball_size']
+POWERUP_DURATION = 5  # seconds
+POWERUP_SPAWN_CHANCE = 0.002  # Chance per frame to spawn a powerup
+MAX_POWERUPS = 1  # Maximum number of powerups on screen at once
+POWERUP_SIZE = 20
+
+TRAIL_LENGTH = 10  # Ball positions kept for the trail effect
+
+
+def new_powerup_effects():
+    """Return a fresh power-up effect table with nothing active."""
+    return {
+        'player1': {'paddle_grow': 0, 'paddle_shrink': 0, 'speed_boost': 0},
+        'player2': {'paddle_grow': 0, 'paddle_shrink': 0, 'speed_boost': 0},
+        'ball': {'size': 0, 'speed': 0}
+    }
+
+
+def ai_profile(difficulty, settings=None, mistake_mode='frame'):
+    """Return the AI parameters (speed, mistake_chance, mistake_amount) for a difficulty.
+
+    mistake_mode 'frame' rolls for a mistake every frame, as pong.py does;
+    'approach' rolls once each time the ball starts heading towards the paddle
+    and keeps that aiming error for the whole approach.
+    """
+    settings = settings or DIFFICULTY_SETTINGS[difficulty]
+    mistake_chance, mistake_amount = AI_MISTAKES[difficulty]
+    return {
+        'speed': settings['AI_SPEED'],
+        'mistake_chance': mistake_chance,
+        'mistake_amount': mistake_amount,
+        'mistake_mode': mistake_mode
+    }
+
+
+class PongSim:
+    """One match of Pong advanced tick by tick, without pygame.
+
+    Positions are floats (top-left corners, like pygame.Rect) and time is
+    simulated, so a match depends only on the seed, the actions fed in and
+    the tick lengths (fixed at 1/fps unless tick() is given a dt).
+    Each paddle is driven either by an action (-1 up, 0 stay, 1 down) or, when
+    the action is None, by the built-in AI using ``ai[0]``/``ai[1]``.
+
+    What happened during the last tick is listed in ``events`` as tuples:
+    ('bounce',), ('hit', side), ('score', player, ball_speed), ('win', player)
+    and ('powerup', player_key, powerup_type), so a front end can play sounds
+    and record statistics without repeating the rules.
+    """
+
+    def __init__(self, difficulty='Medium', settings=None, ai=None, seed=None,
+                 fps=FPS, powerups=True, visual=False, winning_score=WINNING_SCORE):
+        self.difficulty = difficulty
+        self.settings = dict(settings or DIFFICULTY_SETTINGS[difficulty])
+        default_ai = ai_profile(difficulty, self.settings)
+        self.ai = list(ai) if ai is not None else [default_ai, default_ai]
+        self.fixed_dt = 1.0 / fps
+        self.dt = self.fixed_dt  # Length of the current tick
+        self.frame_scale = self.dt * 60  # Speeds are given in pixels per 60 Hz frame
+        self.events = []
+        self.powerups_enabled = powerups
+        self.visual = visual  # Keep ball trail and hit animations for rendering
+        self.winning_score = winning_score
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def seed(self, seed):
+        """Reseed the random generator used for serves, AI mistakes and power-ups."""
+        self.rng.seed(seed)
+
+    def reset(self):
+        """Start a new match with both paddles centred and a fresh serve."""
+        self.player1_score = 0
+        self.player2_score = 0
+        self.game_over = False
+        self.winner = 0
+        self.time = 0.0
+        self.ticks = 0
+        self.paddle_x = (PADDLE_MARGIN, WIDTH - PADDLE_MARGIN - PADDLE_WIDTH)
+        self.paddle_y = [HEIGHT / 2 - PADDLE_HEIGHT / 2, HEIGHT / 2 - PADDLE_HEIGHT / 2]
+        self.paddle_h = [PADDLE_HEIGHT, PADDLE_HEIGHT]
+        self.ball_size = BALL_SIZE
+        self.active_powerups = []
+        self.powerup_effects = new_powerup_effects()
+        self.powerups_collected = [0, 0]
+        self.ball_trail = []
+        self.hit_animations = []
+        # Match statistics
+        self.rally_hits = 0
+        self.rally_lengths = []
+        self.max_speed_times = []  # Seconds from serve until MAX_BALL_SPEED was reached
+        self.reset_ball()
+
+    def reset_ball(self):
+        """Serve from the centre at the initial speed."""
+        rng = self.rng
+        self.ball_x = WIDTH / 2 - self.ball_size / 2
+        self.ball_y = HEIGHT / 2 - self.ball_size / 2
+        self.current_ball_speed = self.settings['INITIAL_BALL_SPEED']
+        self.ball_speed_x = self.current_ball_speed * rng.choice((1, -1))
+        self.ball_speed_y = self.current_ball_speed * rng.choice((0.7, -0.7))
+        self.serve_time = self.time
+        self.reached_max_speed = False
+        self.ai_offset = [None, None]  # Aiming error held for the current approach
+        self.ball_trail = []
+
+    # Paddle control
+
+    def move_paddle(self, side, direction):
+        """Move a paddle up (-1) or down (1) at player speed."""
+        key = 'player1' if side == 0 else 'player2'
+        speed = PADDLE_SPEED * self.frame_scale
+        if self.powerup_effects[key]['speed_boost'] > 0:
+            speed *= 1.5
+        y = self.paddle_y[side] + direction * speed
+        self.paddle_y[side] = min(max(y, 0.0), HEIGHT - self.paddle_h[side])
+
+    def move_ai(self, side):
+        """Chase the ball with the configured AI, returning to centre otherwise."""
+        profile = self.ai[side]
+        h = self.paddle_h[side]
+        centery = self.paddle_y[side] + h / 2
+        incoming = self.ball_speed_x > 0 if side == 1 else self.ball_speed_x < 0
+        if incoming:
+            target_y = self.ball_y + self.ball_size / 2
+            if profile.get('mistake_mode', 'frame') == 'approach':
+                if self.ai_offset[side] is None:
+                    mistake_amount = self.rng.randint(-profile['mistake_amount'], profile['mistake_amount'])
+                    self.ai_offset[side] = mistake_amount if self.rng.random() < profile['mistake_chance'] else 0
+                target_y += self.ai_offset[side]
+            else:
+                mistake_amount = self.rng.randint(-profile['mistake_amount'], profile['mistake_amount'])
+                if self.rng.random() < profile['mistake_chance']:
+                    target_y += mistake_amount
+
+            speed = profile['speed']
+            if self.powerup_effects['player1' if side == 0 else 'player2']['speed_boost'] > 0:
+                speed *= 1.5
+            speed *= self.frame_scale
+
+            if centery < target_y:
+                centery += min(speed, target_y - centery)
+            elif centery > target_y:
+                centery -= min(speed, centery - target_y)
+        else:
+            self.ai_offset[side] = None
+            if abs(centery - HEIGHT / 2) <= 10:
+                return
+            speed = 2 * self.frame_scale
+            centery += -speed if centery > HEIGHT / 2 else speed
+        self.paddle_y[side] = min(max(centery - h / 2, 0.0), HEIGHT - h)
+
+    # Simulation
+
+    def tick(self, action1=0, action2=None, dt=None):
+        """Advance one frame and return the scoring player (1 or 2), or 0.
+
+        dt is the frame length in seconds; by default the fixed 1/fps tick.
+        """
+        self.events.clear()
+        if self.game_over:
+            return 0
+        self.dt = self.fixed_dt if dt is None else dt
+        self.frame_scale = self.dt * 60
+        if action1 is None:
+            self.move_ai(0)
+        elif action1:
+            self.move_paddle(0, action1)
+        if action2 is None:
+            self.move_ai(1)
+        elif action2:
+            self.move_paddle(1, action2)
+
+        scorer = self.update_ball()
+        if self.visual:
+            self.update_hit_animations()
+        if self.powerups_enabled:
+            self.update_powerups()
+            self.spawn_powerup()
+            self.check_powerup_collision()
+        self.time += self.dt
+        self.ticks += 1
+        return scorer
+
+    def update_ball(self):
+        """Move the ball, bounce it off walls and paddles, and handle scoring."""
+        size = self.ball_size
+        if self.visual:
+            self.ball_trail.append((self.ball_x + size / 2, self.ball_y + size / 2))
+            if len(self.ball_trail) > TRAIL_LENGTH:
+                self.ball_trail.pop(0)
+
+        self.ball_x += self.ball_speed_x * self.frame_scale
+        self.ball_y += self.ball_speed_y * self.frame_scale
+
+        # Gradually increase ball speed over time (capped at maximum)
+        max_speed = self.settings['MAX_BALL_SPEED']
+        if self.time - self.serve_time > ACCELERATION_DELAY and self.current_ball_speed < max_speed:
+            speed_factor = abs(self.ball_speed_x) / self.current_ball_speed
+            self.current_ball_speed = min(max_speed, self.current_ball_speed
+                                          + self.settings['BALL_ACCELERATION'] * self.frame_scale)
+            self.ball_speed_x = self.current_ball_speed * speed_factor * (1 if self.ball_speed_x > 0 else -1)
+            if self.current_ball_speed >= max_speed and not self.reached_max_speed:
+                self.reached_max_speed = True
+                self.max_speed_times.append(self.time - self.serve_time)
+
+        # Walls: reflect the ball back by as far as it went past the wall and send
+        # it away from it, so a step can't leave it there to bounce again next tick
+        if self.ball_y <= 0:
+            self.ball_y = -self.ball_y
+            self.ball_speed_y = abs(self.ball_speed_y)
+            self.create_hit_animation(self.ball_x + size / 2, 0)
+            self.events.append(('bounce',))
+        elif self.ball_y + size >= HEIGHT:
+            self.ball_y = 2 * (HEIGHT - size) - self.ball_y
+            self.ball_speed_y = -abs(self.ball_speed_y)
+            self.create_hit_animation(self.ball_x + size / 2, HEIGHT)
+            self.events.append(('bounce',))
+
+        # Paddles: the ball is pushed out in front of the paddle and always sent
+        # towards the other side, so an overlap on consecutive ticks can't turn it back
+        ball_cy = self.ball_y + size / 2
+        for side, direction in ((0, 1), (1, -1)):
+            px, py, ph = self.paddle_x[side], self.paddle_y[side], self.paddle_h[side]
+            if (self.ball_x < px + PADDLE_WIDTH and self.ball_x + size > px
+                    and self.ball_y < py + ph and self.ball_y + size > py):
+                # Step back to where the ball first touched the paddle (through its face
+                # or over an end), so the bounce angle doesn't depend on the tick length
+                face = px + PADDLE_WIDTH if side == 0 else px - size
+                frames = self.frame_scale
+                if self.ball_speed_x:
+                    frames = min(frames, (face - self.ball_x) * direction / abs(self.ball_speed_x))
+                if self.ball_speed_y:
+                    depth = self.ball_y + size - py if self.ball_speed_y > 0 else py + ph - self.ball_y
+                    frames = min(frames, depth / abs(self.ball_speed_y))
+                ball_cy -= self.ball_speed_y * frames
+                self.create_hit_animation(px + PADDLE_WIDTH if side == 0 else px, ball_cy)
+                self.ball_speed_x = direction * abs(self.ball_speed_x)
+                relative_intersect_y = (py + ph / 2 - ball_cy) / (ph / 2)
+                self.ball_speed_y = -relative_intersect_y * (self.current_ball_speed * 0.75)
+                self.ball_x = face + self.ball_speed_x * frames
+                self.ball_y = ball_cy - size / 2 + self.ball_speed_y * frames
+                self.rally_hits += 1
+                self.events.append(('hit', side))
+                break
+
+        # Scoring
+        if self.ball_x <= 0:
+            self.player2_score += 1
+            self.create_hit_animation(0, ball_cy)
+            return self.point_scored(2)
+        if self.ball_x + size >= WIDTH:
+            self.player1_score += 1
+            self.create_hit_animation(WIDTH, ball_cy)
+            return self.point_scored(1)
+        return 0
+
+    def point_scored(self, player):
+        """Record the finished rally and either end the match or serve again."""
+        self.rally_lengths.append(self.rally_hits)
+        self.rally_hits = 0
+        self.events.append(('score', player, self.current_ball_speed))
+        score = self.player1_score if player == 1 else self.player2_score
+        if score >= self.winning_score:
+            self.game_over = True
+            self.winner = player
+            self.events.append(('win', player))
+        else:
+            self.reset_ball()
+        return player
+
+    # Power-ups
+
+    def spawn_powerup(self):
+        """Randomly spawn a powerup on the field."""
+        rng = self.rng
+        # The chance is per 60 Hz frame, so scale it to the length of this one
+        if len(self.active_powerups) < MAX_POWERUPS and rng.random() < POWERUP_SPAWN_CHANCE * self.frame_scale:
+            powerup_type = rng.choice(POWERUP_TYPES)
+            x = rng.randint(WIDTH // 4, 3 * WIDTH // 4)
+            y = rng.randint(HEIGHT // 4, 3 * HEIGHT // 4)
+            self.active_powerups.append({
+                'x': x - POWERUP_SIZE // 2,
+                'y': y - POWERUP_SIZE // 2,
+                'type': powerup_type,
+                'pulse': 0
+            })
+
+    def check_powerup_collision(self):
+        """Give a powerup to the player the ball is travelling away from."""
+        size = self.ball_size
+        for powerup in self.active_powerups[:]:
+            if (self.ball_x < powerup['x'] + POWERUP_SIZE and self.ball_x + size > powerup['x']
+                    and self.ball_y < powerup['y'] + POWERUP_SIZE and self.ball_y + size > powerup['y']):
+                player = 'player1' if self.ball_speed_x < 0 else 'player2'
+                self.apply_powerup(powerup['type'], player)
+                self.active_powerups.remove(powerup)
+
+    def apply_powerup(self, powerup_type, player):
+        """Apply the effect of a powerup to the specified player."""
+        side = 0 if player == 'player1' else 1
+        self.powerups_collected[side] += 1
+        self.events.append(('powerup', player, powerup_type))
+        effects = self.powerup_effects
+        if powerup_type == 'paddle_grow':
+            self.paddle_h[side] = int(PADDLE_HEIGHT * 1.5)
+            effects[player]['paddle_grow'] = POWERUP_DURATION
+        elif powerup_type == 'paddle_shrink':
+            # Apply to opponent
+            opponent = 1 - side
+            self.paddle_h[opponent] = int(PADDLE_HEIGHT * 0.7)
+            effects['player2' if opponent else 'player1']['paddle_shrink'] = POWERUP_DURATION
+        elif powerup_type == 'speed_boost':
+            effects[player]['speed_boost'] = POWERUP_DURATION
+        elif powerup_type == 'ball_size':
+            self.ball_size = int(BALL_SIZE * 1.5)
+            effects['ball']['size'] = POWERUP_DURATION
+        # A paddle that grew at the bottom edge is pulled back onto the field
+        for s in (0, 1):
+            self.paddle_y[s] = min(self.paddle_y[s], HEIGHT - self.paddle_h[s])
+
+    def update_powerups(self):
+        """Count down active effects and undo them when they expire."""
+        dt = self.dt
+        effects = self.powerup_effects
+        for side, key in ((0, 'player1'), (1, 'player2')):
+            player_effects = effects[key]
+            for effect in ('paddle_grow', 'paddle_shrink', 'speed_boost'):
+                if player_effects[effect] > 0:
+                    player_effects[effect] = max(0, player_effects[effect] - dt)
+                    if player_effects[effect] == 0 and effect != 'speed_boost':
+                        self.paddle_h[side] = PADDLE_HEIGHT
+                        self.paddle_y[side] = min(self.paddle_y[side], HEIGHT - PADDLE_HEIGHT)
+        if effects['ball']['size'] > 0:
+            effects['ball']['size'] = max(0, effects['ball']['size'] - dt)
+            if effects['ball']['size'] == 0:
+                self.ball_size = BALL_SIZE
+
+        for powerup in self.active_powerups:
+            powerup['pulse'] += 0.1 * self.frame_scale
+
+    # Cosmetic effects (only tracked when visual=True)
+
+    def create_hit_animation(self, x, y):
+        """Start a hit ring at the given position."""
+        if self.visual:
+            self.hit_animations.append({'x': x, 'y': y, 'radius': 5, 'alpha': 255})
+
+    def update_hit_animations(self):
+        """Grow and fade the hit rings."""
+        scale = self.frame_scale
+        for anim in self.hit_animations:
+            anim['radius'] += 2 * scale
+            anim['alpha'] -= 10 * scale
+        self.hit_animations = [anim for anim in self.hit_animations if anim['alpha'] > 0]
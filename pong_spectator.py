@@ -0,0 +1,392 @@
+"""Shared-memory spectator fan-out.
+
+The running game (pong.py --spectate) publishes every tick's state into a
+ring of fixed-size slots in a memory-mapped file (on /dev/shm where there is
+one, so it never touches a disk).  Viewer processes map the same file
+read-only and render the newest tick on their own display.  There are no
+sockets and no per-viewer work in the game: publishing is a few
+struct.pack_into calls straight into the mapping, the same for one viewer as
+for thirty-two.  Viewers unpack straight from the mapping as well.
+
+Every slot starts with a sequence counter (a seqlock).  The publisher makes
+it odd, writes the state and makes it even again, then stores the tick
+number in the header.  A reader reads the counter, unpacks the slot, and
+reads the counter again; if it was odd or has changed, the slot was being
+rewritten and the reader starts over with the newest tick.  The ring gives a
+reader SLOTS - 1 ticks of slack before the slot it is reading is reused.
+CPython issues no memory barriers, so this relies on the stores becoming
+visible in program order, as they do on x86; the benchmark checks every
+read for torn data.
+
+Usage:
+    python pong.py --spectate                 # publish under the default path
+    python pong_spectator.py                  # watch in a window
+    python pong_spectator.py --benchmark --viewers 1 2 4 8 16 32
+"""
+import argparse
+import mmap
+import multiprocessing as mp
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections import deque
+
+from pong_alloc import percentile
+from pong_sim import WIDTH, HEIGHT, FPS, DIFFICULTY_SETTINGS, POWERUP_TYPES, POWERUP_SIZE
+
+SPECTATE_PATH = os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+                             'pong-spectate')
+MAGIC = b'PONGSPEC'
+VERSION = 1
+SLOTS = 8
+MAX_POWERUPS_SHOWN = 4
+MAX_HIT_ANIMATIONS = 32
+STATES = ('menu', 'playing', 'paused', 'game_over')
+DIFFICULTIES = tuple(DIFFICULTY_SETTINGS)
+PADDLE_EFFECTS = ('paddle_grow', 'paddle_shrink', 'speed_boost')
+BALL_EFFECTS = ('size', 'speed')
+
+# Magic, version, slots, slot size, 1 while a game is publishing, newest tick (0 = none yet)
+HEADER = struct.Struct('<8sIIIIQ')
+TICK = struct.Struct('<Q')
+TICK_OFFSET = HEADER.size - TICK.size
+OPEN = struct.Struct('<I')
+OPEN_OFFSET = TICK_OFFSET - OPEN.size
+SEQ = struct.Struct('<Q')
+# Tick, game time, state, winner, two-player mode, difficulty, scores, ball speed, ball rect,
+# paddle rects, powerup_effects (3 per player, then the ball's 2), power-up and hit animation counts
+STATE = struct.Struct('<QdBBBBHHf4h4h4h8fBB')
+POWERUP = struct.Struct('<4hBf')  # Rect, type, pulse
+HIT = struct.Struct('<4f3B')  # x, y, radius, alpha, color
+HIT_COLOR = (255, 20, 147)  # Hit rings are all drawn in neon pink
+POWERUPS_OFFSET = SEQ.size + STATE.size
+HITS_OFFSET = POWERUPS_OFFSET + MAX_POWERUPS_SHOWN * POWERUP.size
+SLOT_SIZE = -(-(HITS_OFFSET + MAX_HIT_ANIMATIONS * HIT.size) // 64) * 64  # Whole cache lines
+
+
+class SpectatorPublisher:
+    """Writes each tick's state into the shared ring; knows nothing about the viewers."""
+
+    def __init__(self, path=SPECTATE_PATH, slots=SLOTS, history=600):
+        self.path = path
+        self.slots = slots
+        size = HEADER.size + slots * SLOT_SIZE
+        # A new file each run: viewers of an old run notice it closed and reopen the path
+        if os.path.exists(path):
+            retire(path)
+            os.unlink(path)
+        with open(path, 'w+b') as f:
+            f.truncate(size)
+            self.map = mmap.mmap(f.fileno(), size)
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, slots, SLOT_SIZE, 1, 0)
+        self.tick = 0
+        self.costs_ns = deque(maxlen=history)
+
+    def publish(self, state, game_time, winner, two_player_mode, difficulty, scores, ball_speed, ball, paddles,
+                powerup_effects, active_powerups, hit_animations):
+        """Write one tick into the next slot under its sequence counter."""
+        start = time.perf_counter_ns()
+        buf = self.map
+        self.tick += 1
+        offset = HEADER.size + self.tick % self.slots * SLOT_SIZE
+        seq = SEQ.unpack_from(buf, offset)[0]
+        SEQ.pack_into(buf, offset, seq + 1)  # Odd: being written
+
+        powerups = active_powerups[:MAX_POWERUPS_SHOWN]
+        hits = hit_animations[-MAX_HIT_ANIMATIONS:]
+        player1, player2, ball_effects = (powerup_effects['player1'], powerup_effects['player2'],
+                                          powerup_effects['ball'])
+        STATE.pack_into(buf, offset + SEQ.size, self.tick, game_time, STATES.index(state), winner,
+                        two_player_mode, DIFFICULTIES.index(difficulty), scores[0], scores[1], ball_speed,
+                        *ball, *paddles[0], *paddles[1],
+                        *(player1[name] for name in PADDLE_EFFECTS), *(player2[name] for name in PADDLE_EFFECTS),
+                        *(ball_effects[name] for name in BALL_EFFECTS), len(powerups), len(hits))
+        at = offset + POWERUPS_OFFSET
+        for powerup in powerups:
+            POWERUP.pack_into(buf, at, round(powerup['x']), round(powerup['y']), POWERUP_SIZE, POWERUP_SIZE,
+                              POWERUP_TYPES.index(powerup['type']), powerup['pulse'])
+            at += POWERUP.size
+        at = offset + HITS_OFFSET
+        for anim in hits:
+            HIT.pack_into(buf, at, anim['x'], anim['y'], anim['radius'], anim['alpha'], *HIT_COLOR)
+            at += HIT.size
+
+        SEQ.pack_into(buf, offset, seq + 2)
+        TICK.pack_into(buf, TICK_OFFSET, self.tick)
+        self.costs_ns.append(time.perf_counter_ns() - start)
+
+    def report(self):
+        """One-line summary for the FPS overlay."""
+        costs = self.costs_ns
+        return (f"Spectate: tick {self.tick}  publish p50 {percentile(costs, 50) / 1000:.1f} "
+                f"p95 {percentile(costs, 95) / 1000:.1f} us")
+
+    def close(self):
+        """Tell the viewers the game has ended and remove the file (open mappings stay valid)."""
+        OPEN.pack_into(self.map, OPEN_OFFSET, 0)
+        self.map.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def retire(path):
+    """Mark a ring left behind by a game that did not exit cleanly as closed."""
+    try:
+        with open(path, 'r+b') as f, mmap.mmap(f.fileno(), HEADER.size) as old:
+            if old[:len(MAGIC)] == MAGIC:
+                OPEN.pack_into(old, OPEN_OFFSET, 0)
+    except (OSError, ValueError):
+        pass
+
+
+class SpectatorState:
+    """One published tick, with the attribute names PongRenderer draws from."""
+
+    def __init__(self, values, powerups, hits):
+        (self.tick, self.game_time, state, self.winner, two_player_mode, difficulty,
+         self.player1_score, self.player2_score, self.ball_speed) = values[:9]
+        self.state = STATES[state]
+        self.two_player_mode = bool(two_player_mode)
+        self.difficulty = DIFFICULTIES[difficulty]
+        self.ball_x, self.ball_y, self.ball_size, _ = values[9:13]
+        paddle1, paddle2 = values[13:17], values[17:21]
+        self.paddle_x = (paddle1[0], paddle2[0])
+        self.paddle_y = (paddle1[1], paddle2[1])
+        self.paddle_h = (paddle1[3], paddle2[3])
+        effects = values[21:29]
+        self.powerup_effects = {
+            'player1': dict(zip(PADDLE_EFFECTS, effects[0:3])),
+            'player2': dict(zip(PADDLE_EFFECTS, effects[3:6])),
+            'ball': dict(zip(BALL_EFFECTS, effects[6:8])),
+        }
+        self.active_powerups = [{'x': x, 'y': y, 'size': w, 'type': POWERUP_TYPES[kind], 'pulse': pulse}
+                                for x, y, w, _, kind, pulse in powerups]
+        self.hit_animations = [{'x': x, 'y': y, 'radius': radius, 'alpha': alpha, 'color': color}
+                               for x, y, radius, alpha, *color in hits]
+        self.ball_trail = []
+
+
+class SpectatorReader:
+    """Maps the shared ring read-only and returns consistent snapshots of the newest tick."""
+
+    def __init__(self, path=SPECTATE_PATH):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.slots, self.slot_size, _, _ = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {VERSION} spectator ring")
+        self.reads = 0
+        self.retries = 0
+
+    def is_open(self):
+        """Return whether a game is still publishing to this ring."""
+        return bool(OPEN.unpack_from(self.map, OPEN_OFFSET)[0])
+
+    def latest_tick(self):
+        return TICK.unpack_from(self.map, TICK_OFFSET)[0]
+
+    def read_raw(self):
+        """Return (state values, power-ups, hit animations) of the newest tick, or None before the first."""
+        buf = self.map
+        while True:
+            tick = TICK.unpack_from(buf, TICK_OFFSET)[0]
+            if tick == 0:
+                return None
+            offset = HEADER.size + tick % self.slots * self.slot_size
+            seq = SEQ.unpack_from(buf, offset)[0]
+            if not seq & 1:
+                values = STATE.unpack_from(buf, offset + SEQ.size)
+                powerups = [POWERUP.unpack_from(buf, offset + POWERUPS_OFFSET + i * POWERUP.size)
+                            for i in range(min(values[-2], MAX_POWERUPS_SHOWN))]
+                hits = [HIT.unpack_from(buf, offset + HITS_OFFSET + i * HIT.size)
+                        for i in range(min(values[-1], MAX_HIT_ANIMATIONS))]
+                if SEQ.unpack_from(buf, offset)[0] == seq:
+                    self.reads += 1
+                    return values, powerups, hits
+            self.retries += 1  # Overwritten while we read it: try the newest tick again
+
+    def read(self):
+        """Return the newest tick as a SpectatorState, or None before the first."""
+        raw = self.read_raw()
+        return SpectatorState(*raw) if raw is not None else None
+
+    def close(self):
+        self.map.close()
+
+
+def open_reader(path):
+    """Return a reader for a ring a game is publishing to, or None if there is none yet."""
+    try:
+        reader = SpectatorReader(path)
+    except (FileNotFoundError, ValueError):
+        return None
+    if not reader.is_open():
+        reader.close()
+        return None
+    return reader
+
+
+def watch(path, window_size, fullscreen):
+    """Show the published match in a window until it is closed."""
+    import pygame
+    from pong_pixels import PongRenderer, TRAIL_LENGTH
+
+    pygame.init()
+    flags = pygame.FULLSCREEN if fullscreen else pygame.RESIZABLE
+    window = pygame.display.set_mode((0, 0) if fullscreen else window_size, flags)
+    pygame.display.set_caption("Neon Retro Pong - Spectator")
+    renderer = PongRenderer()
+    small_font = pygame.font.Font(None, 36)
+    clock = pygame.time.Clock()
+    reader = None
+    last_tick = 0
+    trail = deque(maxlen=TRAIL_LENGTH)
+    state = None
+    next_attach = 0
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                return
+        now = time.perf_counter()
+        if reader is not None and not reader.is_open():
+            reader.close()
+            reader, state = None, None
+        if reader is None and now >= next_attach:
+            reader = open_reader(path)
+            next_attach = now + 1
+            last_tick = 0
+
+        if reader is not None:
+            state = reader.read()
+        if state is not None and state.tick != last_tick:
+            if state.state == 'playing':
+                trail.append((state.ball_x + state.ball_size / 2, state.ball_y + state.ball_size / 2))
+            last_tick = state.tick
+        if state is not None:
+            state.ball_trail = list(trail)
+
+        if state is None or state.state == 'menu':
+            frame = renderer.background.copy()
+            message = "Waiting for a match..." if reader is not None else "Waiting for the game..."
+        else:
+            frame = renderer.draw(state)
+            message = {'paused': "PAUSED", 'game_over': f"PLAYER {state.winner} WINS!"}.get(state.state)
+        if message:
+            text = small_font.render(message, True, (255, 255, 255))
+            frame.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2 - text.get_height() // 2))
+        if window.get_size() == frame.get_size():
+            window.blit(frame, (0, 0))
+        else:
+            pygame.transform.smoothscale(frame, window.get_size(), window)
+        pygame.display.flip()
+        clock.tick(FPS)
+
+
+def bench_state(tick):
+    """Synthetic publish() arguments whose fields all follow from the tick, so torn reads show up."""
+    hits = [{'x': float(tick % WIDTH), 'y': float(i), 'radius': 5.0 + i, 'alpha': 255.0} for i in range(8)]
+    return dict(state='playing', game_time=tick / FPS, winner=0, two_player_mode=False, difficulty='Medium',
+                scores=(tick & 0xFFFF, tick * 7 & 0xFFFF), ball_speed=5.0,
+                ball=(tick % WIDTH, tick % HEIGHT, 15, 15), paddles=((50, 250, 15, 100), (735, 250, 15, 100)),
+                powerup_effects={'player1': dict.fromkeys(PADDLE_EFFECTS, 0),
+                                 'player2': dict.fromkeys(PADDLE_EFFECTS, 0),
+                                 'ball': dict.fromkeys(BALL_EFFECTS, 0)},
+                active_powerups=[{'x': 400, 'y': 300, 'type': 'speed_boost', 'pulse': tick * 0.1}],
+                hit_animations=hits)
+
+
+def bench_viewer(path, poll_hz, stop, results):
+    """Benchmark viewer: read and decode the newest tick poll_hz times a second, checking every read."""
+    reader = SpectatorReader(path)
+    results.put('ready')
+    torn = 0
+    period = 1 / poll_hz if poll_hz else 0
+    while not stop.is_set():
+        raw = reader.read_raw()
+        if raw is not None:
+            values, _, hits = raw
+            tick = values[0]
+            if (values[1] != tick / FPS or values[6] != tick & 0xFFFF or values[7] != tick * 7 & 0xFFFF
+                    or values[9] != tick % WIDTH or hits[0][0] != tick % WIDTH):
+                torn += 1
+            SpectatorState(values, *raw[1:])
+        if period:
+            time.sleep(period)
+    results.put((reader.reads, reader.retries, torn))
+
+
+def benchmark(path, viewer_counts, seconds, poll_hz):
+    """Publish at FPS with 0..N viewers attached and report the publisher's per-tick cost."""
+    print(f"Publishing {seconds:g} s at {FPS} ticks/s per run, viewers polling at "
+          f"{poll_hz or 'max'} Hz, slot {SLOT_SIZE} bytes")
+    print(f"{'viewers':>7}  {'wall p50':>8}  {'p95':>6}  {'p99':>6}  {'CPU mean':>8} us   "
+          f"{'reads':>7}  {'retries':>7}  {'torn':>4}")
+    context = mp.get_context('spawn')
+    for count in viewer_counts:
+        publisher = SpectatorPublisher(path)
+        publisher.publish(**bench_state(1))
+        stop = context.Event()
+        results = context.Queue()
+        viewers = [context.Process(target=bench_viewer, args=(path, poll_hz, stop, results))
+                   for _ in range(count)]
+        for viewer in viewers:
+            viewer.start()
+        for _ in viewers:
+            results.get()  # Every viewer has attached
+
+        publisher.costs_ns = deque(maxlen=None)
+        cpu_ns = []
+        period_ns = round(1e9 / FPS)
+        deadline = time.perf_counter_ns()
+        for _ in range(round(seconds * FPS)):
+            arguments = bench_state(publisher.tick + 1)
+            cpu_start = time.thread_time_ns()
+            publisher.publish(**arguments)
+            cpu_ns.append(time.thread_time_ns() - cpu_start)
+            deadline += period_ns
+            time.sleep(max(0, deadline - time.perf_counter_ns()) / 1e9)
+
+        stop.set()
+        totals = [0, 0, 0]
+        for _ in viewers:
+            for i, value in enumerate(results.get()):
+                totals[i] += value
+        for viewer in viewers:
+            viewer.join()
+        costs = publisher.costs_ns
+        print(f"{count:7d}  {percentile(costs, 50) / 1000:8.1f}  {percentile(costs, 95) / 1000:6.1f}  "
+              f"{percentile(costs, 99) / 1000:6.1f}  {sum(cpu_ns) / len(cpu_ns) / 1000:8.1f}      "
+              f"{totals[0]:7d}  {totals[1]:7d}  {totals[2]:4d}", flush=True)
+        publisher.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a match published by pong.py --spectate.")
+    parser.add_argument('--path', default=SPECTATE_PATH, help="shared ring file the game publishes to")
+    parser.add_argument('--window', default=f"{WIDTH}x{HEIGHT}", help="window size as WIDTHxHEIGHT")
+    parser.add_argument('--fullscreen', action='store_true')
+    parser.add_argument('--benchmark', action='store_true',
+                        help="measure the publisher's per-tick cost with growing numbers of viewer processes")
+    parser.add_argument('--viewers', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32],
+                        help="viewer counts to benchmark")
+    parser.add_argument('--seconds', type=float, default=5, help="publishing time per benchmark run")
+    parser.add_argument('--poll-hz', type=float, default=FPS,
+                        help="how often each benchmark viewer reads the ring (0 = as fast as it can)")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.path + '-bench', args.viewers, args.seconds, args.poll_hz)
+    else:
+        window_size = tuple(int(n) for n in args.window.lower().split('x'))
+        watch(args.path, window_size, args.fullscreen)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
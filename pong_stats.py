@@ -0,0 +1,408 @@
+"""Persistent match statistics in a local SQLite database.
+
+The game thread only updates a few counters and puts event tuples on a
+queue; a background writer thread owns the database connection and commits
+whatever has arrived every flush_interval seconds as one transaction, so the
+game loop never waits on disk.  Recorded per match: cabinet, mode, control
+type, difficulty, scores, winner (0 when abandoned), game time played, rally
+count and lengths, peak ball speed and the power-ups collected; every rally
+and every power-up pick-up also gets its own row.
+
+Queries for operators run on their own connection and use the indexes on
+matches: a per-cabinet leaderboard (wins against the AI, by point margin,
+then by the shortest match) and per-difficulty aggregates.
+
+Usage:
+    python pong.py --stats                    # record to pong_stats.db
+    python pong_stats.py --leaderboard --difficulty Hard
+    python pong_stats.py --difficulties
+    python pong_stats.py --benchmark --events-per-second 1000
+"""
+import argparse
+import os
+import queue
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+from pong_alloc import percentile
+from pong_sim import FPS, DIFFICULTY_SETTINGS, POWERUP_TYPES
+
+STATS_PATH = 'pong_stats.db'
+CABINET = socket.gethostname()
+WRITER_NICENESS = 10
+MAX_BATCH = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    key TEXT PRIMARY KEY,
+    cabinet TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    mode TEXT NOT NULL,
+    control TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    player1_score INTEGER NOT NULL DEFAULT 0,
+    player2_score INTEGER NOT NULL DEFAULT 0,
+    winner INTEGER,
+    margin INTEGER,
+    seconds REAL,
+    rallies INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    longest_rally INTEGER NOT NULL DEFAULT 0,
+    peak_ball_speed REAL NOT NULL DEFAULT 0,
+    powerups INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS matches_leaderboard
+    ON matches (cabinet, difficulty, mode, winner, margin DESC, seconds);
+CREATE INDEX IF NOT EXISTS matches_difficulty ON matches (cabinet, difficulty, winner);
+CREATE TABLE IF NOT EXISTS rallies (
+    match_key TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    peak_ball_speed REAL NOT NULL,
+    scorer INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rallies_match ON rallies (match_key);
+CREATE TABLE IF NOT EXISTS powerups (
+    match_key TEXT NOT NULL,
+    game_seconds REAL NOT NULL,
+    player TEXT NOT NULL,
+    type TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS powerups_match ON powerups (match_key);
+"""
+
+# Event kind -> statement, in the order a batch applies them (a match row exists before its update)
+STATEMENTS = {
+    'match': "INSERT INTO matches (key, cabinet, started_at, mode, control, difficulty) VALUES (?, ?, ?, ?, ?, ?)",
+    'rally': "INSERT INTO rallies VALUES (?, ?, ?, ?, ?, ?)",
+    'powerup': "INSERT INTO powerups VALUES (?, ?, ?, ?)",
+    'end': ("UPDATE matches SET player1_score = ?, player2_score = ?, winner = ?, margin = ?, seconds = ?, "
+            "rallies = ?, hits = ?, longest_rally = ?, peak_ball_speed = ?, powerups = ? WHERE key = ?"),
+}
+
+LEADERBOARD = """
+SELECT started_at, difficulty, player1_score, player2_score, seconds, longest_rally, peak_ball_speed
+FROM matches
+WHERE cabinet = ? AND difficulty = ? AND mode = 'ai' AND winner = 1
+ORDER BY margin DESC, seconds
+LIMIT ?
+"""
+DIFFICULTY_STATS = """
+SELECT difficulty, COUNT(*), SUM(winner = 1), SUM(winner = 2), SUM(winner = 0), AVG(seconds),
+       SUM(hits) * 1.0 / MAX(SUM(rallies), 1), MAX(longest_rally), MAX(peak_ball_speed), SUM(powerups)
+FROM matches
+WHERE cabinet = ? AND winner IS NOT NULL
+GROUP BY difficulty
+"""
+
+
+def connect(path):
+    """Open the database, creating the tables and indexes if needed."""
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')  # Readers don't block the writer, commits append to the log
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def commit(conn, batch):
+    """Apply a batch of (kind, row) events in one transaction."""
+    rows = {kind: [] for kind in STATEMENTS}
+    for kind, row in batch:
+        rows[kind].append(row)
+    with conn:
+        for kind, statement in STATEMENTS.items():
+            if rows[kind]:
+                conn.executemany(statement, rows[kind])
+
+
+class StatsStore:
+    """Records matches from the game thread; a writer thread batches them into SQLite.
+
+    With background=False every event is committed on the calling thread
+    instead (only for comparison in the benchmark).
+    """
+
+    def __init__(self, path=STATS_PATH, cabinet=CABINET, flush_interval=1.0, background=True):
+        self.path = path
+        self.cabinet = cabinet
+        self.flush_interval = flush_interval
+        self.session = uuid.uuid4().hex[:12]
+        self.matches_started = 0
+        self.match = None
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.last_commit_ms = 0.0
+        self.max_commit_ms = 0.0
+        self.error = None
+        if background:
+            self.queue = queue.SimpleQueue()
+            self.closing = threading.Event()
+            self.conn = None
+            self.writer = threading.Thread(target=self._write, daemon=True)
+            self.writer.start()
+        else:
+            self.queue = None
+            self.conn = connect(path)
+            self.writer = None
+
+    def _emit(self, kind, row):
+        self.queued += 1
+        if self.queue is not None:
+            self.queue.put((kind, row))
+        else:
+            self._commit(self.conn, [(kind, row)])
+
+    # Game thread: counters and queue puts only
+
+    def start_match(self, mode, control, difficulty, game_time):
+        """Begin recording a match; a match still open is recorded as abandoned."""
+        if self.match is not None:
+            self.end_match(game_time, 0)  # Game time only runs during play, so this is when it was left
+        self.matches_started += 1
+        key = f"{self.session}-{self.matches_started}"
+        self.match = {'key': key, 'start_time': game_time, 'last_time': game_time, 'rally_start': game_time,
+                      'scores': [0, 0], 'rallies': 0, 'hits': 0, 'rally_hits': 0, 'longest_rally': 0,
+                      'peak_ball_speed': 0.0, 'powerups': 0}
+        self._emit('match', (key, self.cabinet, time.time(), mode, control, difficulty))
+
+    def hit(self):
+        """Count a paddle hit in the current rally."""
+        if self.match is not None:
+            self.match['rally_hits'] += 1
+
+    def powerup(self, game_time, player, powerup_type):
+        """Record a power-up collected by player ('player1' or 'player2')."""
+        match = self.match
+        if match is None:
+            return
+        match['powerups'] += 1
+        match['last_time'] = game_time
+        self._emit('powerup', (match['key'], game_time - match['start_time'], player, powerup_type))
+
+    def point(self, game_time, scorer, ball_speed):
+        """Record the end of a rally won by player 1 or 2, with the ball speed it reached."""
+        match = self.match
+        if match is None:
+            return
+        hits = match['rally_hits']
+        match['scores'][scorer - 1] += 1
+        match['rallies'] += 1
+        match['hits'] += hits
+        match['longest_rally'] = max(match['longest_rally'], hits)
+        match['peak_ball_speed'] = max(match['peak_ball_speed'], ball_speed)
+        self._emit('rally', (match['key'], match['rallies'], hits, game_time - match['rally_start'],
+                             ball_speed, scorer))
+        match['rally_hits'] = 0
+        match['rally_start'] = match['last_time'] = game_time
+
+    def end_match(self, game_time, winner):
+        """Record the final result; winner 0 means the match was abandoned."""
+        match = self.match
+        if match is None:
+            return
+        player1_score, player2_score = match['scores']
+        self._emit('end', (player1_score, player2_score, winner, player1_score - player2_score,
+                           game_time - match['start_time'], match['rallies'], match['hits'],
+                           match['longest_rally'], match['peak_ball_speed'], match['powerups'], match['key']))
+        self.match = None
+
+    # Writer thread
+
+    def _write(self):
+        if hasattr(os, 'setpriority') and hasattr(threading, 'get_native_id'):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), WRITER_NICENESS)
+            except OSError:
+                pass
+        conn = connect(self.path)
+        # Sleep through the whole interval rather than waking up for every event, then take
+        # everything that arrived; the game thread is never woken or made to wait
+        while not self.closing.wait(self.flush_interval):
+            self._drain(conn)
+        self._drain(conn)
+        conn.close()
+
+    def _drain(self, conn):
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) == MAX_BATCH:
+                self._commit(conn, batch)
+                batch = []
+        if batch:
+            self._commit(conn, batch)
+
+    def _commit(self, conn, batch):
+        start = time.perf_counter()
+        try:
+            commit(conn, batch)
+        except sqlite3.Error as error:
+            self.error = error  # Keep playing; the overlay shows it
+            return
+        self.last_commit_ms = (time.perf_counter() - start) * 1000
+        self.max_commit_ms = max(self.max_commit_ms, self.last_commit_ms)
+        self.written += len(batch)
+        self.batches += 1
+
+    def report(self):
+        """One-line summary for the FPS overlay."""
+        if self.error is not None:
+            return f"Stats: write failed ({self.error})"
+        return (f"Stats: {self.written}/{self.queued} events written in {self.batches} batches  "
+                f"last commit {self.last_commit_ms:.1f} ms")
+
+    def close(self, game_time=None):
+        """Record an open match as abandoned at game_time (default its last event) and wait
+        for everything to be written."""
+        if self.match is not None:
+            self.end_match(self.match['last_time'] if game_time is None else game_time, 0)
+        if self.writer is not None:
+            self.closing.set()
+            self.writer.join()
+        else:
+            self.conn.close()
+
+
+def leaderboard(path, cabinet=CABINET, difficulty='Medium', limit=10):
+    """Best wins against the AI on a cabinet: largest point margin first, then the quickest."""
+    with sqlite3.connect(path) as conn:
+        return conn.execute(LEADERBOARD, (cabinet, difficulty, limit)).fetchall()
+
+
+def difficulty_stats(path, cabinet=CABINET):
+    """Per-difficulty aggregates of the finished and abandoned matches on a cabinet."""
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute(DIFFICULTY_STATS, (cabinet,)).fetchall()
+    order = list(DIFFICULTY_SETTINGS)
+    return sorted(rows, key=lambda row: order.index(row[0]) if row[0] in order else len(order))
+
+
+def print_leaderboard(path, cabinet, difficulty, limit):
+    rows = leaderboard(path, cabinet, difficulty, limit)
+    print(f"Leaderboard for {cabinet}, {difficulty}:")
+    if not rows:
+        print("  no wins yet")
+    for rank, (started_at, _, player1_score, player2_score, seconds, longest_rally, peak_speed) in enumerate(rows, 1):
+        print(f"  {rank:2d}. {player1_score}-{player2_score} in {seconds:5.1f} s  longest rally {longest_rally:3d}  "
+              f"peak speed {peak_speed:5.2f}  ({time.strftime('%Y-%m-%d %H:%M', time.localtime(started_at))})")
+
+
+def print_difficulty_stats(path, cabinet):
+    print(f"Matches on {cabinet}:")
+    print(f"  {'difficulty':>10} {'matches':>7} {'P1 won':>6} {'P2 won':>6} {'left':>5} {'avg s':>6} "
+          f"{'hits/rally':>10} {'longest':>7} {'peak':>5} {'powerups':>8}")
+    for difficulty, matches, won1, won2, abandoned, seconds, hits, longest, peak, powerups in \
+            difficulty_stats(path, cabinet):
+        print(f"  {difficulty:>10} {matches:7d} {won1:6d} {won2:6d} {abandoned:5d} {seconds or 0:6.1f} "
+              f"{hits:10.1f} {longest:7d} {peak:5.2f} {powerups:8d}")
+
+
+def benchmark(path, events_per_second, seconds, work_ms, flush_interval):
+    """Run a 60 Hz loop with a fixed amount of work per frame and compare frame times
+    without recording, with the batched store and with a commit per event."""
+    def work(iterations):
+        total = 0
+        for i in range(iterations):
+            total += i * i
+        return total
+
+    # Calibrate the synthetic frame work
+    iterations = 10_000
+    start = time.perf_counter()
+    work(iterations)
+    iterations = max(1, round(iterations * work_ms / ((time.perf_counter() - start) * 1000)))
+
+    print(f"{seconds:g} s per mode at {FPS} frames/s, {work_ms:g} ms of work per frame, "
+          f"{events_per_second:g} events/s, flush every {flush_interval:g} s")
+    print(f"{'mode':>8}  {'frame p50':>9}  {'p95':>6}  {'p99':>6}  {'max':>6} ms  {'record us/frame':>15}  "
+          f"{'events':>7}  {'batches':>7}  {'max commit ms':>13}")
+    frames = round(seconds * FPS)
+    per_frame = events_per_second / FPS
+    for mode in ('off', 'batched', 'direct'):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+        store = None if mode == 'off' else StatsStore(path, 'benchmark', flush_interval, mode == 'batched')
+        frame_ms, record_us = [], []
+        due = 0.0
+        event = 0
+        game_time = 0.0
+        period = 1 / FPS
+        deadline = time.perf_counter()
+        if store:
+            store.start_match('ai', 'keyboard', 'Medium', game_time)
+        for _ in range(frames):
+            frame_start = time.perf_counter()
+            game_time += period
+            due += per_frame
+            while due >= 1:
+                due -= 1
+                event += 1
+                if store:
+                    # One match per 9 points, a power-up every 4th event, a paddle hit on every one
+                    store.hit()
+                    if event % 4 == 0:
+                        store.powerup(game_time, 'player1', POWERUP_TYPES[event % len(POWERUP_TYPES)])
+                    else:
+                        store.point(game_time, 1 + event % 2, 5.0 + event % 7)
+                    if event % 36 == 0:
+                        store.end_match(game_time, 1)
+                        store.start_match('ai', 'keyboard', 'Medium', game_time)
+            record_end = time.perf_counter()
+            work(iterations)
+            frame_end = time.perf_counter()
+            frame_ms.append((frame_end - frame_start) * 1000)
+            record_us.append((record_end - frame_start) * 1e6)
+            deadline += period
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+        if store:
+            store.close()
+        print(f"{mode:>8}  {percentile(frame_ms, 50):9.2f}  {percentile(frame_ms, 95):6.2f}  "
+              f"{percentile(frame_ms, 99):6.2f}  {max(frame_ms):6.2f}     {sum(record_us) / frames:15.1f}  "
+              f"{store.written if store else 0:7d}  {store.batches if store else 0:7d}  "
+              f"{store.max_commit_ms if store else 0:13.2f}", flush=True)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query or benchmark the match statistics store.")
+    parser.add_argument('--db', default=STATS_PATH, help="statistics database")
+    parser.add_argument('--cabinet', default=CABINET, help="cabinet to report on (default this host)")
+    parser.add_argument('--leaderboard', action='store_true', help="best wins against the AI")
+    parser.add_argument('--difficulty', choices=list(DIFFICULTY_SETTINGS), default='Medium')
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--difficulties', action='store_true', help="aggregates per difficulty")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="compare frame times without recording, with batched writes and with a "
+                             "commit per event")
+    parser.add_argument('--events-per-second', type=float, default=1000)
+    parser.add_argument('--seconds', type=float, default=5, help="benchmark time per mode")
+    parser.add_argument('--work-ms', type=float, default=4, help="synthetic work per benchmark frame")
+    parser.add_argument('--flush-interval', type=float, default=1.0, help="seconds between batched commits")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.db + '.bench', args.events_per_second, args.seconds, args.work_ms, args.flush_interval)
+        return
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} does not exist; record matches with python pong.py --stats")
+    if args.leaderboard or not args.difficulties:
+        print_leaderboard(args.db, args.cabinet, args.difficulty, args.limit)
+    if args.difficulties:
+        print_difficulty_stats(args.db, args.cabinet)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,271 @@
+"""Difficulty auto-balancing sweep over DIFFICULTY_SETTINGS.
+
+Simulates a grid of ball/AI settings for each difficulty level against a
+reference player model, in parallel and headlessly, and measures rally
+length, time until the ball reaches MAX_BALL_SPEED and the AI's win rate.
+Every evaluated parameter point is cached, so re-running with a larger grid
+only simulates the new points.
+
+Usage:
+    python pong_sweep.py
+    python pong_sweep.py --accel 0.00002 0.001 0.003 --ai-speed 4 5 6 7 --matches 40
+
+Writes points.csv (every point and its metrics) and tuned_settings.json to
+--out-dir and prints the tuned DIFFICULTY_SETTINGS table.
+
+Tuning uses the AI's point win rate by default (--metric point); its match
+win rate saturates near 1.0 over most of the grid.  The default grid is 324
+points of 20 matches each, at roughly 0.1-0.16 s per match: 10-20 minutes
+on one core, divided by --workers.
+"""
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+from pong_sim import (HEIGHT, DIFFICULTY_SETTINGS, FPS, WINNING_SCORE, PongSim, ai_profile)
+
+# Target share of points won by the AI; match win rates saturate quickly because
+# the AI only has to out-last the player in each rally
+DEFAULT_TARGETS = {'Easy': 0.4, 'Medium': 0.5, 'Hard': 0.6}
+METRICS = ('matches', 'points', 'ai_match_win_rate', 'ai_point_win_rate', 'avg_rally_hits',
+           'avg_point_seconds', 'max_speed_reached', 'time_to_max_speed')
+
+
+class ReferencePlayer:
+    """A simple model of a human on the left paddle.
+
+    The player sees the ball reaction_ticks late, aims with a Gaussian error
+    chosen once per approach, ignores small differences (deadzone) and drifts
+    back to the centre while the ball is moving away.
+    """
+
+    def __init__(self, rng, reaction_ticks=12, aim_error=25.0, deadzone=8.0):
+        self.rng = rng
+        self.reaction_ticks = reaction_ticks
+        self.aim_error = aim_error
+        self.deadzone = deadzone
+        self.history = [HEIGHT / 2] * (reaction_ticks + 1)
+        self.position = 0
+        self.offset = None
+
+    def action(self, sim):
+        """Return the paddle action (-1, 0 or 1) for this tick."""
+        history = self.history
+        history[self.position] = sim.ball_y + sim.ball_size / 2
+        self.position = (self.position + 1) % len(history)
+        seen_y = history[self.position]  # Oldest sample: what the player reacts to now
+
+        if sim.ball_speed_x < 0:
+            if self.offset is None:
+                self.offset = self.rng.gauss(0, self.aim_error)
+            target_y = seen_y + self.offset
+        else:
+            self.offset = None
+            target_y = HEIGHT / 2
+        paddle_centre = sim.paddle_y[0] + sim.paddle_h[0] / 2
+        if target_y < paddle_centre - self.deadzone:
+            return -1
+        if target_y > paddle_centre + self.deadzone:
+            return 1
+        return 0
+
+
+def point_key(point, config):
+    """Return the cache key for a parameter point under an evaluation config."""
+    return json.dumps({'point': point, 'eval': config}, sort_keys=True)
+
+
+def evaluate_point(task):
+    """Play the configured number of matches for one parameter point."""
+    key, point, config = task
+    settings = {name: point[name] for name in
+                ('INITIAL_BALL_SPEED', 'MAX_BALL_SPEED', 'BALL_ACCELERATION', 'AI_SPEED')}
+    ai = ai_profile(point['level'], settings)
+    ai_wins = ai_points = points = rally_hits = ticks = 0
+    max_speed_times = []
+    max_ticks = int(config['max_seconds'] * FPS)
+    for match in range(config['matches']):
+        rng = random.Random(f"{config['seed']}:{match}")
+        sim = PongSim(point['level'], settings=settings, ai=[ai, ai], seed=rng.getrandbits(63),
+                      powerups=config['powerups'], winning_score=config['winning_score'])
+        player = ReferencePlayer(rng, config['reaction_ticks'], config['aim_error'])
+        while not sim.game_over and sim.ticks < max_ticks:
+            sim.tick(player.action(sim), None)
+        ai_wins += sim.player2_score > sim.player1_score
+        ai_points += sim.player2_score
+        points += sim.player1_score + sim.player2_score
+        rally_hits += sum(sim.rally_lengths)
+        ticks += sim.ticks
+        max_speed_times.extend(sim.max_speed_times)
+
+    serves = points + config['matches']  # Every point starts with a serve, plus any unfinished rally
+    return key, {
+        'matches': config['matches'],
+        'points': points,
+        'ai_match_win_rate': ai_wins / config['matches'],
+        'ai_point_win_rate': ai_points / points if points else 0.0,
+        'avg_rally_hits': rally_hits / points if points else 0.0,
+        'avg_point_seconds': ticks / FPS / points if points else 0.0,
+        'max_speed_reached': len(max_speed_times) / serves,
+        'time_to_max_speed': sum(max_speed_times) / len(max_speed_times) if max_speed_times else None,
+    }
+
+
+def load_cache(path):
+    """Read cached point results, skipping lines an interrupted run left unreadable.
+
+    A partial last line is cut off, so the results appended next start on a
+    line of their own.
+    """
+    cache = {}
+    if not os.path.exists(path):
+        return cache
+    with open(path, 'rb+') as f:
+        lines = f.readlines()
+        if lines and not lines[-1].endswith(b'\n'):
+            f.truncate(sum(len(line) for line in lines[:-1]))
+            lines.pop()
+        for line in lines:
+            try:
+                record = json.loads(line)
+                cache[record['key']] = record['metrics']
+            except (ValueError, KeyError, TypeError):
+                continue  # That point is simulated again; later lines are still good
+    return cache
+
+
+def build_grid(args):
+    """Return every parameter point to evaluate, one set per difficulty level."""
+    grid = []
+    for level in args.levels:
+        base = DIFFICULTY_SETTINGS[level]
+        axes = [
+            args.initial or [base['INITIAL_BALL_SPEED']],
+            args.max or [base['MAX_BALL_SPEED']],
+            args.accel or [base['BALL_ACCELERATION']],
+            args.ai_speed or [base['AI_SPEED']],
+        ]
+        # Floats throughout, so a value gets the same cache key whether it came from a default or the CLI
+        axes = [[float(value) for value in axis] for axis in axes]
+        for initial, maximum, accel, ai_speed in itertools.product(*axes):
+            if maximum < initial:
+                continue
+            grid.append({'level': level, 'INITIAL_BALL_SPEED': initial, 'MAX_BALL_SPEED': maximum,
+                         'BALL_ACCELERATION': accel, 'AI_SPEED': ai_speed})
+    return grid
+
+
+def choose_settings(rows, metric, target, tolerance):
+    """Pick the point closest to the target AI win rate, preferring longer rallies.
+
+    Points within tolerance of the target are treated as equally balanced and
+    the one with the longest average rally wins; otherwise the nearest point
+    is used.
+    """
+    def error(row):
+        return abs(row[metric] - target)
+    balanced = [row for row in rows if error(row) <= tolerance]
+    if balanced:
+        return max(balanced, key=lambda row: (row['avg_rally_hits'], -error(row)))
+    return min(rows, key=error)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep difficulty settings against a reference player.")
+    parser.add_argument('--levels', nargs='+', choices=list(DIFFICULTY_SETTINGS), default=list(DIFFICULTY_SETTINGS))
+    parser.add_argument('--initial', nargs='+', type=float, default=[4.0, 5.0, 6.0])
+    parser.add_argument('--max', nargs='+', type=float, default=[8.0, 10.0, 12.0])
+    parser.add_argument('--accel', nargs='+', type=float, default=[0.00002, 0.002, 0.005])
+    parser.add_argument('--ai-speed', nargs='+', type=float, default=[4.0, 5.0, 6.0, 7.0])
+    parser.add_argument('--target', action='append', default=[],
+                        help="Level=rate, the AI win rate to aim for (default Easy=0.4 "
+                             "Medium=0.5 Hard=0.6)")
+    parser.add_argument('--metric', choices=('point', 'match'), default='point',
+                        help="tune on the share of points or of matches won by the AI")
+    parser.add_argument('--tolerance', type=float, default=0.05)
+    parser.add_argument('--matches', type=int, default=20, help="matches per parameter point")
+    parser.add_argument('--winning-score', type=int, default=WINNING_SCORE)
+    parser.add_argument('--max-seconds', type=float, default=600, help="simulated time limit per match")
+    parser.add_argument('--reaction-ticks', type=int, default=12, help="reference player reaction delay")
+    parser.add_argument('--aim-error', type=float, default=25.0, help="reference player aim error (px)")
+    parser.add_argument('--no-powerups', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--cache', default='sweep_cache.jsonl')
+    parser.add_argument('--out-dir', default='sweep_results')
+    args = parser.parse_args(argv)
+
+    targets = dict(DEFAULT_TARGETS)
+    for spec in args.target:
+        level, equals, rate = spec.partition('=')
+        if not equals or level not in DIFFICULTY_SETTINGS:
+            parser.error(f"bad --target {spec!r}: expected Level=rate with Level one of "
+                         f"{', '.join(DIFFICULTY_SETTINGS)}")
+        try:
+            targets[level] = float(rate)
+        except ValueError:
+            parser.error(f"bad --target {spec!r}: {rate!r} is not a number")
+        if not 0.0 <= targets[level] <= 1.0:
+            parser.error(f"bad --target {spec!r}: the AI win rate must be between 0 and 1")
+
+    config = {'matches': args.matches, 'winning_score': args.winning_score, 'max_seconds': args.max_seconds,
+              'reaction_ticks': args.reaction_ticks, 'aim_error': args.aim_error,
+              'powerups': not args.no_powerups, 'seed': args.seed}
+    grid = build_grid(args)
+    empty = [level for level in args.levels if not any(point['level'] == level for point in grid)]
+    if empty:
+        parser.error(f"no parameter points for {', '.join(empty)}: every --max value is below every --initial value")
+    cache = load_cache(args.cache)
+    keys = [point_key(point, config) for point in grid]
+    pending = [(key, point, config) for key, point in zip(keys, grid) if key not in cache]
+    print(f"{len(grid)} parameter points, {len(grid) - len(pending)} cached, {len(pending)} to simulate")
+
+    start = time.perf_counter()
+    if pending:
+        with open(args.cache, 'a') as cache_file, mp.Pool(args.workers) as pool:
+            for done, (key, metrics) in enumerate(pool.imap_unordered(evaluate_point, pending), 1):
+                cache[key] = metrics
+                cache_file.write(json.dumps({'key': key, 'metrics': metrics}) + '\n')
+                cache_file.flush()
+                if done % 10 == 0 or done == len(pending):
+                    elapsed = time.perf_counter() - start
+                    print(f"  {done}/{len(pending)} points, {elapsed:.0f}s elapsed", flush=True)
+
+    rows = [dict(point, **cache[key]) for key, point in zip(keys, grid)]
+    os.makedirs(args.out_dir, exist_ok=True)
+    with open(os.path.join(args.out_dir, 'points.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(grid[0]) + list(METRICS))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    metric = f'ai_{args.metric}_win_rate'
+    tuned = {}
+    evidence = {}
+    for level in args.levels:
+        best = choose_settings([row for row in rows if row['level'] == level], metric, targets[level],
+                               args.tolerance)
+        tuned[level] = {name: best[name] for name in
+                        ('INITIAL_BALL_SPEED', 'MAX_BALL_SPEED', 'BALL_ACCELERATION', 'AI_SPEED')}
+        evidence[level] = {'target_ai_win_rate': targets[level], **{m: best[m] for m in METRICS}}
+    with open(os.path.join(args.out_dir, 'tuned_settings.json'), 'w') as f:
+        json.dump({'DIFFICULTY_SETTINGS': tuned, 'metrics': evidence, 'eval': config}, f, indent=2)
+
+    print("\nDIFFICULTY_SETTINGS = " + json.dumps(tuned, indent=4))
+    for level, metrics in evidence.items():
+        ttm = metrics['time_to_max_speed']
+        print(f"{level}: AI {args.metric} win rate {metrics[metric]:.2f} "
+              f"(target {metrics['target_ai_win_rate']:.2f}), "
+              f"rally {metrics['avg_rally_hits']:.1f} hits, "
+              f"max speed reached in {metrics['max_speed_reached']:.0%} of rallies"
+              + (f" after {ttm:.1f}s" if ttm is not None else ""))
+    print(f"\nData written to {args.out_dir}/ in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
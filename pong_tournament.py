@@ -0,0 +1,383 @@
+"""Parallel AI tournament runner.
+
+Plays headless matches between AI profiles (the difficulty presets and any
+custom variants) across a process pool with fixed per-match seeds.  Each
+result is appended to a JSON-lines file as soon as it finishes, so an
+interrupted run picks up where it stopped when started again with the same
+output file.  The summary reports Elo ratings, win rates with 95% confidence
+intervals, average rally length and games per second.
+
+Two accurate AIs can return a slow ball indefinitely, so a rally longer than
+--max-rally-hits is expedited: the ball gets faster with every return until
+one side misses, and the rally still ends in a point.  A match that is
+level when --max-seconds runs out goes to sudden death (the next point wins;
+only a match still level at twice the limit is a draw).
+
+Usage:
+    python pong_tournament.py --games 200 --workers 8 --out tournament.jsonl
+    python pong_tournament.py --format swiss --rounds 6 --variant slow:4:0.2:70
+
+A variant is name:AI_SPEED:mistake_chance:mistake_amount.
+"""
+import argparse
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+from pong_sim import DIFFICULTY_SETTINGS, FPS, PADDLE_WIDTH, BALL_SIZE, PongSim, ai_profile
+
+INITIAL_RATING = 1500
+Z_95 = 1.959964  # Two-sided 95% normal quantile
+EXPEDITE_FACTOR = 1.1  # Ball speed-up per return once a rally passes --max-rally-hits
+EXPEDITE_MAX_SPEED = PADDLE_WIDTH + BALL_SIZE - 5  # Below this the ball can't step past a paddle in one tick
+
+
+def parse_variant(spec, mistake_mode):
+    """Turn 'name:speed:chance:amount' into (name, profile)."""
+    name, speed, chance, amount = spec.split(':')
+    profile = {'speed': float(speed), 'mistake_chance': float(chance),
+               'mistake_amount': int(amount), 'mistake_mode': mistake_mode}
+    return name, profile
+
+
+def match_seed(base_seed, match_id):
+    """Derive a fixed seed for a match from the tournament seed and match id."""
+    return random.Random(f"{base_seed}:{match_id}").getrandbits(63)
+
+
+def play_match(task):
+    """Play one headless match and return its result record."""
+    match_id, a, b, profiles, seed, config = task
+    # Alternate sides so neither entrant always plays the left paddle
+    swapped = int(match_id.rsplit(':', 1)[1]) % 2 == 1
+    left, right = (b, a) if swapped else (a, b)
+    sim = PongSim(config['ball'], ai=[profiles[left], profiles[right]], seed=seed,
+                  powerups=config['powerups'])
+    max_ticks = int(config['max_seconds'] * FPS)
+    max_rally = config['max_rally_hits']
+    stalls = 0
+    expedited_hits = 0  # Rally hit count the ball was last sped up at
+    # A match level at the time limit goes to sudden death: the next point wins it
+    while not sim.game_over and (sim.ticks < max_ticks or (sim.player1_score == sim.player2_score
+                                                           and sim.ticks < 2 * max_ticks)):
+        sim.tick(None, None)
+        hits = sim.rally_hits
+        if hits >= max_rally and hits > expedited_hits:
+            # Neither side is missing (two accurate AIs return a slow ball flat forever), so
+            # expedite the rally: every further return speeds the ball up until one side misses
+            if expedited_hits < max_rally:
+                stalls += 1
+            expedited_hits = hits
+            speed = min(sim.current_ball_speed * EXPEDITE_FACTOR, EXPEDITE_MAX_SPEED)
+            scale = speed / sim.current_ball_speed
+            sim.current_ball_speed = speed
+            sim.ball_speed_x *= scale
+            sim.ball_speed_y *= scale
+        elif hits < expedited_hits:
+            expedited_hits = 0
+
+    left_score, right_score = sim.player1_score, sim.player2_score
+    score_a, score_b = (right_score, left_score) if swapped else (left_score, right_score)
+    winner = a if score_a > score_b else b if score_b > score_a else None
+    # A rally cut off by the time limit still counts towards the rally statistics
+    rallies = (sim.rally_lengths + [sim.rally_hits]) if sim.rally_hits else sim.rally_lengths
+    return {
+        'id': match_id,
+        'a': a,
+        'b': b,
+        'winner': winner,
+        'score': [score_a, score_b],
+        'rallies': len(rallies),
+        'rally_hits': sum(rallies),
+        'stalls': stalls,
+        'ticks': sim.ticks,
+    }
+
+
+def round_robin_schedule(names, games):
+    """Every pair of entrants plays the given number of games."""
+    for a, b in itertools.combinations(names, 2):
+        for game in range(games):
+            yield f"rr:{a}:{b}:{game}", a, b
+
+
+def swiss_pairings(names, results):
+    """Pair entrants with similar points who have not met yet; the odd one out gets a bye."""
+    points = {name: 0.0 for name in names}
+    met = set()
+    for result in results:
+        met.add(frozenset((result['a'], result['b'])))
+        for name, score in match_points(result):
+            points[name] += score
+    ratings = fit_ratings(results, names)
+    order = sorted(names, key=lambda n: (-points[n], -ratings[n], n))
+    pairs = []
+    while len(order) > 1:
+        a = order.pop(0)
+        opponent = next((b for b in order if frozenset((a, b)) not in met), order[0])
+        order.remove(opponent)
+        pairs.append((a, opponent))
+    return pairs
+
+
+def match_points(result):
+    """Return [(entrant, points)] for a result: 1 for a win, 0.5 each for a draw."""
+    if result['winner'] is None:
+        return [(result['a'], 0.5), (result['b'], 0.5)]
+    loser = result['b'] if result['winner'] == result['a'] else result['a']
+    return [(result['winner'], 1.0), (loser, 0.0)]
+
+
+def fit_ratings(results, names, iterations=100):
+    """Fit Elo-scale ratings with a Bradley-Terry model.
+
+    Unlike sequential Elo updates this does not depend on the order results
+    arrive in, which matters when matches finish out of order across a pool.
+    Every entrant gets one virtual draw against a 1500-rated anchor so
+    unbeaten or winless entrants still get finite ratings.
+    """
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    score = [0.5] * n  # The virtual draw against the anchor
+    games = [[0] * n for _ in range(n)]
+    for result in results:
+        i, j = index[result['a']], index[result['b']]
+        games[i][j] += 1
+        games[j][i] += 1
+        for name, points in match_points(result):
+            score[index[name]] += points
+
+    strength = [1.0] * n
+    for _ in range(iterations):
+        new = []
+        for i in range(n):
+            denominator = 1.0 / (strength[i] + 1.0)  # Anchor with strength 1
+            for j in range(n):
+                if games[i][j]:
+                    denominator += games[i][j] / (strength[i] + strength[j])
+            new.append(score[i] / denominator)
+        strength = new
+    return {name: INITIAL_RATING + 400 * math.log10(strength[index[name]]) for name in names}
+
+
+def wilson_interval(points, games):
+    """95% Wilson score interval for a win rate (draws count as half a win)."""
+    if not games:
+        return 0.0, 1.0
+    p = points / games
+    denominator = 1 + Z_95 ** 2 / games
+    centre = (p + Z_95 ** 2 / (2 * games)) / denominator
+    margin = Z_95 * math.sqrt(p * (1 - p) / games + Z_95 ** 2 / (4 * games ** 2)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def summarize(results, names, elapsed, played):
+    """Build the per-entrant summary table."""
+    ratings = fit_ratings(results, names)
+    table = {name: {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'points': 0.0,
+                    'rally_hits': 0, 'rallies': 0, 'stalls': 0} for name in names}
+    for result in results:
+        for name in (result['a'], result['b']):
+            row = table[name]
+            row['games'] += 1
+            row['rally_hits'] += result['rally_hits']
+            row['rallies'] += result['rallies']
+            row['stalls'] += result['stalls']
+        for name, points in match_points(result):
+            row = table[name]
+            row['points'] += points
+            if points == 1.0:
+                row['wins'] += 1
+            elif points == 0.5:
+                row['draws'] += 1
+            else:
+                row['losses'] += 1
+
+    entrants = []
+    for name in sorted(names, key=lambda n: -ratings[n]):
+        row = table[name]
+        low, high = wilson_interval(row['points'], row['games'])
+        entrants.append({
+            'name': name,
+            'elo': round(ratings[name], 1),
+            'games': row['games'],
+            'wins': row['wins'],
+            'draws': row['draws'],
+            'losses': row['losses'],
+            'win_rate': row['points'] / row['games'] if row['games'] else 0.0,
+            'win_rate_ci95': [low, high],
+            'avg_rally_length': row['rally_hits'] / row['rallies'] if row['rallies'] else 0.0,
+            'stalled_rallies': row['stalls'],
+        })
+    return {
+        'games': len(results),
+        'games_this_run': played,
+        'games_per_sec': played / elapsed if elapsed > 0 else 0.0,
+        'entrants': entrants,
+    }
+
+
+def print_summary(summary):
+    """Print the summary as a plain-text table."""
+    print(f"\n{'Entrant':<16}{'Elo':>8}{'Games':>8}{'W':>7}{'D':>7}{'L':>7}"
+          f"{'Win rate (95% CI)':>26}{'Rally':>8}")
+    for e in summary['entrants']:
+        low, high = e['win_rate_ci95']
+        print(f"{e['name']:<16}{e['elo']:>8.1f}{e['games']:>8}{e['wins']:>7}{e['draws']:>7}{e['losses']:>7}"
+              f"{e['win_rate']:>10.3f} ({low:.3f}-{high:.3f}){e['avg_rally_length']:>8.1f}")
+    print(f"\n{summary['games']} games total, {summary['games_this_run']} this run "
+          f"at {summary['games_per_sec']:.1f} games/sec")
+
+
+class ResultLog:
+    """Append-only JSON-lines file of match results, with a config header for resuming."""
+
+    def __init__(self, path, config):
+        self.path = path
+        self.results = []
+        header = {'tournament': config}
+        valid_bytes = 0
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                lines = f.readlines()
+            try:
+                # A header cut off by an interrupted run makes the log empty: it is written again
+                existing = json.loads(lines[0]) if lines and lines[0].endswith(b'\n') else None
+            except ValueError:
+                existing = None
+            if existing is not None:
+                if existing != header:
+                    raise SystemExit(f"{path} was written by a tournament with different settings")
+                valid_bytes = len(lines[0])
+                for line in lines[1:]:
+                    try:
+                        if not line.endswith(b'\n'):
+                            raise ValueError
+                        self.results.append(json.loads(line))
+                    except ValueError:
+                        break  # Partial line left by an interrupted run
+                    valid_bytes += len(line)
+        self.file = open(path, 'a' if valid_bytes else 'w')
+        if valid_bytes:
+            self.file.truncate(valid_bytes)
+        else:
+            self.write(header)
+        self.done = {result['id'] for result in self.results}
+        self.last_flush = time.perf_counter()
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + '\n')
+
+    def add(self, result):
+        """Record a finished match; the file is flushed at most once a second."""
+        self.results.append(result)
+        self.done.add(result['id'])
+        self.write(result)
+        now = time.perf_counter()
+        if now - self.last_flush > 1.0:
+            self.file.flush()
+            self.last_flush = now
+
+    def close(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+
+def run_matches(pool, workers, tasks, log, progress):
+    """Play tasks on the pool, streaming each result into the log."""
+    chunksize = max(1, min(64, len(tasks) // (4 * workers)))
+    for result in pool.imap_unordered(play_match, tasks, chunksize=chunksize):
+        log.add(result)
+        progress(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a headless AI tournament.")
+    parser.add_argument('--format', choices=('round-robin', 'swiss'), default='round-robin')
+    parser.add_argument('--games', type=int, default=100, help="games per pairing")
+    parser.add_argument('--rounds', type=int, default=5, help="Swiss rounds")
+    parser.add_argument('--entrants', nargs='*', default=list(DIFFICULTY_SETTINGS),
+                        help="difficulty presets to enter")
+    parser.add_argument('--variant', action='append', default=[], help="name:speed:chance:amount")
+    parser.add_argument('--ball', choices=list(DIFFICULTY_SETTINGS), default='Medium',
+                        help="difficulty whose ball speeds are used")
+    parser.add_argument('--mistakes', choices=('approach', 'frame'), default='approach',
+                        help="'frame' rolls AI mistakes every frame like pong.py, which rarely "
+                             "makes an AI miss; 'approach' holds one aiming error per approach")
+    parser.add_argument('--no-powerups', action='store_true')
+    parser.add_argument('--max-seconds', type=float, default=600,
+                        help="simulated time limit per match; a level match then plays on to the next point")
+    parser.add_argument('--max-rally-hits', type=int, default=100,
+                        help="expedite rallies longer than this: each further return makes the ball "
+                             f"{EXPEDITE_FACTOR - 1:.0%} faster until one side misses")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', default='tournament.jsonl')
+    args = parser.parse_args(argv)
+
+    profiles = {name: ai_profile(name, mistake_mode=args.mistakes) for name in args.entrants}
+    for spec in args.variant:
+        try:
+            name, profile = parse_variant(spec, args.mistakes)
+        except ValueError:
+            parser.error(f"bad variant {spec!r}, expected name:speed:chance:amount")
+        profiles[name] = profile
+    names = list(profiles)
+    if len(names) < 2:
+        parser.error("a tournament needs at least two entrants")
+
+    config = {
+        'format': args.format, 'games': args.games, 'rounds': args.rounds, 'profiles': profiles,
+        'ball': args.ball, 'powerups': not args.no_powerups, 'max_seconds': args.max_seconds,
+        'max_rally_hits': args.max_rally_hits, 'expedite_factor': EXPEDITE_FACTOR, 'seed': args.seed,
+    }
+    match_config = {key: config[key] for key in ('ball', 'powerups', 'max_seconds', 'max_rally_hits')}
+    log = ResultLog(args.out, config)
+    if log.results:
+        print(f"Resuming: {len(log.results)} games already in {args.out}")
+
+    played = 0
+    start = time.perf_counter()
+    last_report = [start]
+
+    def progress(count):
+        nonlocal played
+        played += count
+        now = time.perf_counter()
+        if now - last_report[0] > 5:
+            last_report[0] = now
+            print(f"  {len(log.results)} games, {played / (now - start):.1f} games/sec", flush=True)
+
+    def tasks_for(schedule):
+        return [(match_id, a, b, profiles, match_seed(args.seed, match_id), match_config)
+                for match_id, a, b in schedule if match_id not in log.done]
+
+    with mp.Pool(args.workers) as pool:
+        try:
+            if args.format == 'round-robin':
+                run_matches(pool, args.workers, tasks_for(round_robin_schedule(names, args.games)), log, progress)
+            else:
+                for round_number in range(args.rounds):
+                    prefix = f"sw{round_number}:"
+                    earlier = [r for r in log.results if int(r['id'].split(':')[0][2:]) < round_number]
+                    pairs = swiss_pairings(names, earlier)
+                    schedule = [(f"{prefix}{a}:{b}:{game}", a, b) for a, b in pairs for game in range(args.games)]
+                    run_matches(pool, args.workers, tasks_for(schedule), log, progress)
+        finally:
+            log.close()
+
+    summary = summarize(log.results, names, time.perf_counter() - start, played)
+    with open(os.path.splitext(args.out)[0] + '.summary.json', 'w') as f:
+        json.dump(summary, f, indent=2)
+    print_summary(summary)
+    return summary
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
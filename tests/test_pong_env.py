@@ -0,0 +1,80 @@
+"""Tests for the gym-style environment in pong_env.py."""
+import math
+import random
+
+import pytest
+
+from pong_env import OBSERVATION_SIZE, PongEnv
+
+
+def rollout(env, steps, action_seed=0):
+    """Play random actions and return every (obs, reward, terminated, truncated, info)."""
+    rng = random.Random(action_seed)
+    env.reset()
+    trajectory = []
+    for _ in range(steps):
+        result = env.step(rng.randrange(env.action_count))
+        trajectory.append(result)
+        if result[2] or result[3]:
+            env.reset()
+    return trajectory
+
+
+def test_same_seed_same_trajectory():
+    # Sticky actions draw from their own generator, which the seed must cover too
+    first = rollout(PongEnv(seed=7, repeat_action_probability=0.25), 3000)
+    second = rollout(PongEnv(seed=7, repeat_action_probability=0.25), 3000)
+    assert first == second
+
+
+def test_different_seeds_differ():
+    assert rollout(PongEnv(seed=1), 500) != rollout(PongEnv(seed=2), 500)
+
+
+@pytest.mark.parametrize('sticky', [0.0, 0.25])
+def test_frame_skip_equals_single_steps(sticky):
+    # Sticky actions are rolled every tick, not every step, so k single steps with
+    # the same chosen action replay exactly what one frame-skipped step does
+    k = 4
+    skipped = PongEnv(frame_skip=k, repeat_action_probability=sticky, seed=3)
+    single = PongEnv(frame_skip=1, repeat_action_probability=sticky, seed=3)
+    skipped.reset()
+    single.reset()
+    rng = random.Random(0)
+    for _ in range(2000):
+        action = rng.randrange(skipped.action_count)
+        obs, reward, terminated, _, info = skipped.step(action)
+        total = 0
+        for _ in range(k):
+            single_obs, single_reward, single_terminated, _, single_info = single.step(action)
+            total += single_reward
+            if single_terminated:
+                break
+        assert (obs, reward, terminated) == (single_obs, total, single_terminated)
+        assert info['ticks'] == single_info['ticks']
+        if terminated:
+            skipped.reset()
+            single.reset()
+
+
+def test_observation_shape_and_bounds():
+    env = PongEnv(seed=11)
+    obs, _ = env.reset()
+    assert len(obs) == OBSERVATION_SIZE == env.observation_size
+    for obs, _, _, _, _ in rollout(env, 5000):
+        assert len(obs) == OBSERVATION_SIZE
+        assert all(isinstance(value, float) and math.isfinite(value) for value in obs)
+        # Ball centre (it can end a match just past the goal line) and paddle centres
+        assert -0.05 <= obs[0] <= 1.05 and 0.0 <= obs[1] <= 1.0
+        assert 0.0 <= obs[4] <= 1.0 and 0.0 <= obs[5] <= 1.0
+        # Velocities are scaled by the maximum ball speed
+        assert -1.0 <= obs[2] <= 1.0 and -1.0 <= obs[3] <= 1.0
+        # Remaining power-up time fractions
+        assert all(0.0 <= value <= 1.0 for value in obs[6:])
+
+
+def test_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        PongEnv(frame_skip=0)
+    with pytest.raises(ValueError):
+        PongEnv(repeat_action_probability=1.0)
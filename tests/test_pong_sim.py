@@ -0,0 +1,41 @@
+"""Tests for the game rules in pong_sim.py."""
+import pytest
+
+from pong_sim import PongSim
+
+
+def play_rallies(fps, action1, action2, seed):
+    """Play a match with fixed paddle actions; return (scorer, hits, ball path) per point.
+
+    The path samples the ball every 1/60 s from the serve.  Points end on the tick
+    that crosses the goal line, so serves, and the match clock, fall on tick boundaries
+    and drift apart between tick rates; comparing each rally from its serve avoids that.
+    """
+    sim = PongSim('Medium', seed=seed, fps=fps, powerups=False)
+    per_frame = fps // 60
+    rallies, path, ticks = [], [], 0
+    while not sim.game_over:
+        scorer = sim.tick(action1, action2)
+        ticks += 1
+        if scorer:
+            rallies.append((scorer, sim.rally_lengths[-1], path))
+            path, ticks = [], 0
+        elif ticks % per_frame == 0:
+            path.append((sim.ball_x, sim.ball_y))
+    return rallies, (sim.player1_score, sim.player2_score)
+
+
+@pytest.mark.parametrize('actions', [(-1, 1), (1, -1), (1, 0), (-1, 0)])
+def test_tick_rate_gives_the_same_match(actions):
+    # Fixed actions keep the AI (and its per-tick mistake rolls) out of it, and without
+    # power-ups the random generator is only drawn from at serves, the same at any rate
+    rallies_60, score_60 = play_rallies(60, *actions, seed=1)
+    rallies_240, score_240 = play_rallies(240, *actions, seed=1)
+    assert score_60 == score_240
+    assert [rally[:2] for rally in rallies_60] == [rally[:2] for rally in rallies_240]
+    assert sum(hits for _, hits, _ in rallies_60) > 0
+    for (_, _, path_60), (_, _, path_240) in zip(rallies_60, rallies_240):
+        assert len(path_60) == pytest.approx(len(path_240), abs=1)
+        for (x_60, y_60), (x_240, y_240) in zip(path_60, path_240):
+            assert x_60 == pytest.approx(x_240, abs=1)
+            assert y_60 == pytest.approx(y_240, abs=1)
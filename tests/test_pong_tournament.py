@@ -0,0 +1,116 @@
+"""Tests for the rating, interval and result-log helpers in pong_tournament.py."""
+import json
+import math
+
+import pytest
+
+from pong_tournament import (ResultLog, ai_profile, fit_ratings, match_seed, play_match, swiss_pairings,
+                             wilson_interval)
+
+
+def result(match_id, a, b, winner):
+    return {'id': match_id, 'a': a, 'b': b, 'winner': winner, 'score': [0, 0],
+            'rallies': 0, 'rally_hits': 0, 'stalls': 0, 'ticks': 0}
+
+
+@pytest.mark.parametrize('points, games, expected', [
+    (5, 10, (0.2366, 0.7634)),
+    (0, 10, (0.0, 0.2775)),
+    (10, 10, (0.7225, 1.0)),
+    (81, 263, (0.2553, 0.3662)),
+])
+def test_wilson_interval_known_values(points, games, expected):
+    assert wilson_interval(points, games) == pytest.approx(expected, abs=1e-4)
+
+
+def test_wilson_interval_without_games():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_fit_ratings_ranks_dominant_player_first():
+    names = ['Easy', 'Medium', 'Hard']
+    results = []
+    for game in range(10):
+        results.append(result(f'hm{game}', 'Hard', 'Medium', 'Hard'))
+        results.append(result(f'he{game}', 'Hard', 'Easy', 'Hard'))
+        results.append(result(f'me{game}', 'Medium', 'Easy', 'Medium' if game < 7 else 'Easy'))
+    ratings = fit_ratings(results, names)
+    assert sorted(names, key=ratings.get, reverse=True) == ['Hard', 'Medium', 'Easy']
+    # Unbeaten still gets a finite rating thanks to the virtual draw against the anchor
+    assert math.isfinite(ratings['Hard'])
+
+
+def test_fit_ratings_ignores_result_order():
+    names = ['A', 'B']
+    results = [result('1', 'A', 'B', 'A'), result('2', 'A', 'B', 'B'), result('3', 'A', 'B', 'A')]
+    assert fit_ratings(results, names) == pytest.approx(fit_ratings(results[::-1], names))
+
+
+# The tournament defaults: approach mistakes, Medium ball, power-ups, 600 s and 100-hit rallies
+PROFILES = {name: ai_profile(name, mistake_mode='approach') for name in ('Easy', 'Medium', 'Hard')}
+MATCH_CONFIG = {'ball': 'Medium', 'powerups': True, 'max_seconds': 600, 'max_rally_hits': 100}
+
+
+def play(a, b, games):
+    return [play_match((f'rr:{a}:{b}:{game}', a, b, PROFILES, match_seed(0, f'rr:{a}:{b}:{game}'), MATCH_CONFIG))
+            for game in range(games)]
+
+
+def test_play_match_hard_beats_easy():
+    # Short timed-out matches can go either way, so judge the entrants over several
+    matches = play('Easy', 'Hard', 8)
+    assert sum(match['winner'] == 'Hard' for match in matches) >= 7
+    assert sum(match['score'][1] for match in matches) > 4 * sum(match['score'][0] for match in matches)
+
+
+def test_play_match_medium_against_hard_is_decided():
+    # Both AIs return the slow ball flat; expedited rallies and sudden death still settle it
+    for match in play('Medium', 'Hard', 4):
+        assert match['winner'] is not None
+        assert match['score'] != [0, 0]
+        # Expedited rallies end in a point, so they count towards the rally statistics
+        assert match['rallies'] >= sum(match['score'])
+        assert match['rally_hits'] >= 100 * match['stalls']
+
+
+def test_swiss_pairings_puts_the_strongest_first():
+    results = play('Easy', 'Hard', 8) + play('Medium', 'Hard', 2)
+    pairs = swiss_pairings(['Easy', 'Medium', 'Hard'], results)
+    # Hard has met both, so it plays the next best; the odd one out gets the bye
+    assert len(pairs) == 1 and pairs[0][0] == 'Hard'
+
+
+def test_result_log_resumes_and_drops_partial_line(tmp_path):
+    path = str(tmp_path / 'tournament.jsonl')
+    config = {'format': 'round-robin', 'games': 2}
+    log = ResultLog(path, config)
+    log.add(result('rr:A:B:0', 'A', 'B', 'A'))
+    log.add(result('rr:A:B:1', 'A', 'B', None))
+    log.close()
+    with open(path, 'a') as f:
+        f.write('{"id": "rr:A:B:2", "a": "A"')  # Cut off by an interrupted run
+
+    log = ResultLog(path, config)
+    assert log.done == {'rr:A:B:0', 'rr:A:B:1'}
+    log.add(result('rr:A:B:2', 'A', 'B', 'B'))
+    log.close()
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[0] == {'tournament': config}
+    assert [line['id'] for line in lines[1:]] == ['rr:A:B:0', 'rr:A:B:1', 'rr:A:B:2']
+
+
+def test_result_log_rewrites_cut_off_header(tmp_path):
+    path = tmp_path / 'tournament.jsonl'
+    path.write_text('{"tournament": {"form')
+    log = ResultLog(str(path), {'games': 1})
+    assert log.results == []
+    log.close()
+    assert path.read_text() == '{"tournament": {"games": 1}}\n'
+
+
+def test_result_log_refuses_other_settings(tmp_path):
+    path = str(tmp_path / 'tournament.jsonl')
+    ResultLog(path, {'games': 1}).close()
+    with pytest.raises(SystemExit):
+        ResultLog(path, {'games': 2})